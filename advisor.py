@@ -0,0 +1,263 @@
+"""
+Index advisor for generated SQL.
+
+Each translated statement is run through EXPLAIN QUERY PLAN against an
+empty in-memory copy of the schema (tables, existing indexes and, when
+available, ANALYZE statistics). Filter and join columns of tables that are
+fully scanned are aggregated over a window of recent translations; each
+candidate index is then created in the copy and the affected statements are
+explained again, so only indexes that actually remove a scan are suggested.
+
+    python advisor.py questions.txt --format text --db shop.db --top 10
+"""
+import argparse
+import sqlite3
+import sys
+from collections import Counter, deque, namedtuple
+
+from batch import read_questions, _guess_format
+from conditions import Pred, BoolOp
+from dialects import get_dialect
+from schema import SQLiteSchemaProvider
+from texttosql import TranslationLimitError, parse_query, resolve_schema
+
+Recommendation = namedtuple("Recommendation", "table columns statement scans improved benefit")
+
+_EQUALITY_OPS = {"=", "IN"}
+_RANGE_OPS = {"<", ">", "<=", ">=", "BETWEEN"}
+_MAX_INDEX_COLUMNS = 3
+
+_sqlite = get_dialect("sqlite")
+
+def _conjuncts(node):
+    """Predicates ANDed at the top level; OR / NOT branches cannot use a single index."""
+    if isinstance(node, Pred):
+        return [node]
+    if isinstance(node, BoolOp) and node.op == "AND":
+        return [p for item in node.items for p in _conjuncts(item)]
+    return []
+
+def scanned_tables(plan_rows):
+    """Tables the plan reads with a full SCAN (including full covering-index scans)."""
+    out = set()
+    for row in plan_rows:
+        words = row[-1].split()
+        if len(words) >= 2 and words[0] == "SCAN":
+            # SQLite < 3.36 writes "SCAN TABLE <name>"
+            name = words[2] if words[1] == "TABLE" and len(words) > 2 else words[1]
+            out.add(name.strip('"'))
+    return out
+
+class IndexAdvisor:
+    """
+    Feed translations with observe(text); read full_scans() and recommend().
+    `db_path` copies the real schema (and its indexes/statistics); otherwise
+    tables are created from the schema snapshot. Not thread-safe.
+    """
+
+    def __init__(self, schema=None, db_path=None, window=1000):
+        if schema is None and db_path:
+            schema = SQLiteSchemaProvider(db_path)
+        self.schema = resolve_schema(schema)
+        self.window = deque(maxlen=window)  # (sql, scanned tables, [(table, cols), ...])
+        self.errors = 0
+        self.rows = {}  # table -> estimated row count (1 when unknown)
+        self.conn = sqlite3.connect(":memory:")
+        if db_path:
+            self._copy_database(db_path)
+        else:
+            self._create_from_snapshot()
+
+    # ---- schema copy ----
+    def _create_from_snapshot(self):
+        for table, columns in self.schema.tables.items():
+            types = self.schema.column_types.get(table, {})
+            defs = []
+            for c in columns:
+                if c == "id":
+                    defs.append(f"{_sqlite.ident(c)} INTEGER PRIMARY KEY")
+                else:
+                    defs.append(f"{_sqlite.ident(c)} {types.get(c, '')}".rstrip())
+            self.conn.execute(f"CREATE TABLE {_sqlite.ident(table)} ({', '.join(defs)})")
+            self.rows[table] = 1
+
+    def _copy_database(self, path):
+        src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            ddl = src.execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL"
+                " AND type IN ('table', 'index', 'view') AND name NOT LIKE 'sqlite_%'"
+                " ORDER BY type = 'index', rowid"
+            ).fetchall()
+            for kind, name, sql in ddl:
+                self.conn.execute(sql)
+                if kind == "table":
+                    self.rows[name] = self._estimate_rows(src, name)
+            stats = []
+            if src.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+                stats = src.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+        finally:
+            src.close()
+        if stats:
+            # the planner reads sqlite_stat1 on load; create it, then fill in the real numbers
+            self.conn.execute("ANALYZE")
+            self.conn.execute("DELETE FROM sqlite_stat1")
+            self.conn.executemany("INSERT INTO sqlite_stat1 VALUES (?, ?, ?)", stats)
+            self.conn.execute("ANALYZE sqlite_master")
+
+    @staticmethod
+    def _estimate_rows(src, table):
+        try:
+            # largest rowid: an O(log n) estimate, unlike COUNT(*)
+            n = src.execute(f"SELECT MAX(rowid) FROM {_sqlite.ident(table)}").fetchone()[0]
+        except sqlite3.Error:  # WITHOUT ROWID table
+            n = None
+        return max(1, n or 1)
+
+    # ---- observation ----
+    def _explain(self, sql):
+        return self.conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+
+    def observe(self, text):
+        """Translate `text` and record its plan; returns the set of fully scanned tables."""
+        try:
+            query = parse_query(text, self.schema)
+        except TranslationLimitError:  # e.g. over the input length limit
+            self.errors += 1
+            return set()
+        return self.observe_query(query) if query is not None else set()
+
+    def observe_query(self, query):
+        sql = _sqlite.render(query)
+        try:
+            scans = scanned_tables(self._explain(sql))
+        except sqlite3.Error:  # e.g. a condition on a column that does not exist
+            self.errors += 1
+            return set()
+        self.window.append((sql, scans, self._candidates(query, scans)))
+        return scans
+
+    def _resolve(self, query, column):
+        if "." in column:
+            table, col = column.rsplit(".", 1)
+            return (table, col) if table in self.schema.tables else (None, None)
+        for table in query.tables():
+            if column in self.schema.tables.get(table, ()):
+                return table, column
+        return None, None
+
+    def _candidates(self, query, scans):
+        """[(table, columns)] that could replace each full scan in this statement."""
+        equality, ranges = {}, {}
+        for pred in _conjuncts(query.where):
+            table, col = self._resolve(query, pred.column)
+            if table not in scans:
+                continue
+            if pred.op in _EQUALITY_OPS:
+                equality.setdefault(table, [])
+                if col not in equality[table]:
+                    equality[table].append(col)
+            elif pred.op in _RANGE_OPS:
+                ranges.setdefault(table, col)
+        out = []
+        for table in scans:
+            # equality columns first, then at most one range column
+            cols = equality.get(table, [])[:_MAX_INDEX_COLUMNS]
+            if table in ranges and ranges[table] not in cols and len(cols) < _MAX_INDEX_COLUMNS:
+                cols = cols + [ranges[table]]
+            if cols:
+                out.append((table, tuple(cols)))
+        for j in query.joins:
+            if j.edge is None:
+                continue
+            f_table, f_col, t_table, t_col = j.edge
+            for table, col in ((f_table, f_col), (t_table, t_col)):
+                if table in scans and col != "id":
+                    out.append((table, (col,)))
+        return out
+
+    # ---- reporting ----
+    def full_scans(self):
+        """{table: statements in the window that scan it}"""
+        counts = Counter()
+        for _, scans, _ in self.window:
+            counts.update(scans)
+        return dict(counts.most_common())
+
+    def recommend(self, top=10):
+        """
+        Candidate indexes ranked by estimated benefit: the number of windowed
+        statements whose scan of the table disappears with the index,
+        weighted by the table's estimated row count. An index is also tried
+        on the statements its leading columns serve, and indexes that are a
+        prefix of another recommended one are left out.
+        """
+        usage = {}
+        for i, (_, _, candidates) in enumerate(self.window):
+            for cand in candidates:
+                usage.setdefault(cand, set()).add(i)
+        served = {}
+        for (table, cols), idxs in usage.items():
+            # (status, amount) also serves the statements that only need (status)
+            served[(table, cols)] = sorted(idxs.union(*(
+                more for (t, other), more in usage.items()
+                if t == table and len(other) < len(cols) and cols[:len(other)] == other)))
+        ranked = sorted(served.items(), key=lambda kv: len(kv[1]), reverse=True)[:top * 3]
+
+        out = []
+        for (table, cols), idxs in ranked:
+            name = "idx_" + "_".join((table,) + cols)
+            statement = (f"CREATE INDEX {_sqlite.ident(name)} ON {_sqlite.ident(table)}"
+                         f" ({', '.join(_sqlite.ident(c) for c in cols)});")
+            try:
+                self.conn.execute(statement)
+            except sqlite3.Error:
+                continue
+            try:
+                improved = sum(1 for i in idxs
+                               if table not in scanned_tables(self._explain(self.window[i][0])))
+            finally:
+                self.conn.execute(f"DROP INDEX {_sqlite.ident(name)}")
+            if improved:
+                out.append(Recommendation(table, cols, statement, len(idxs), improved,
+                                          improved * self.rows.get(table, 1)))
+        out = [r for r in out if not any(
+            o.table == r.table and len(o.columns) > len(r.columns) and o.columns[:len(r.columns)] == r.columns
+            for o in out)]
+        out.sort(key=lambda r: (r.benefit, r.improved), reverse=True)
+        return out[:top]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Recommend indexes for generated SQL.")
+    p.add_argument("input", help="questions file, or - for stdin")
+    p.add_argument("--format", choices=["jsonl", "csv", "text"], help="input format (default: from extension)")
+    p.add_argument("--field", default="text", help="JSON key / CSV column holding the question")
+    p.add_argument("--db", help="SQLite database whose schema, indexes and statistics to use")
+    p.add_argument("--window", type=int, default=1000, help="most recent translations to consider")
+    p.add_argument("--top", type=int, default=10)
+    args = p.parse_args(argv)
+
+    fmt = args.format or _guess_format(None if args.input == "-" else args.input)
+    advisor = IndexAdvisor(db_path=args.db, window=args.window)
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    try:
+        for text in read_questions(src, fmt, args.field):
+            if isinstance(text, str) and text.strip():  # not the error rows of malformed input
+                advisor.observe(text)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+    print(f"{len(advisor.window)} statements analysed, {advisor.errors} could not be translated or explained")
+    print("\nfull table scans:")
+    for table, n in advisor.full_scans().items():
+        print(f"  {table}: {n}")
+    recs = advisor.recommend(args.top)
+    print("\nrecommended indexes (statements fixed / using the columns):")
+    for r in recs:
+        print(f"  {r.statement}  -- {r.improved}/{r.scans}")
+    if not recs:
+        print("  none")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Request/response handling for the JSON translation API, shared by the
+Flask app (app.py) and the async server (asgi.py).
+
+Request body:  {"text": "..."}  or  {"texts": ["...", ...]}
+Response body: {"schema_version": ..., "results": [{"text", "sql", "error"[, "code"]}], "elapsed_ms": ...}
+               (single requests get the one result's fields at the top level)
+"""
+import gzip
+import json
+
+MAX_BATCH = 1000
+# responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+class BadRequest(ValueError):
+    pass
+
+def parse_payload(payload):
+    """Return (texts, single) from a decoded JSON body, or raise BadRequest."""
+    if not isinstance(payload, dict):
+        raise BadRequest("expected a JSON object")
+    if "texts" in payload:
+        texts = payload["texts"]
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise BadRequest("'texts' must be a list of strings")
+        if len(texts) > MAX_BATCH:
+            raise BadRequest(f"at most {MAX_BATCH} texts per request")
+        return texts, False
+    text = payload.get("text")
+    if not isinstance(text, str):
+        raise BadRequest("'text' must be a string")
+    return [text], True
+
+def build_response(results, single, schema_version, elapsed_ms):
+    """results: iterable of texttosql.BatchResult"""
+    items = []
+    for r in results:
+        item = {"text": r.text, "sql": r.sql, "error": r.error}
+        if r.code:
+            item["code"] = r.code  # machine-readable reason, e.g. "input_too_long"
+        items.append(item)
+    body = {"schema_version": schema_version, "elapsed_ms": round(elapsed_ms, 3)}
+    if single:
+        body.update(items[0])
+    else:
+        body["results"] = items
+    return body
+
+def encode_body(body, accept_encoding="", force_gzip=False):
+    """Serialize to JSON; gzip it when the client accepts it and it is big enough."""
+    data = json.dumps(body).encode()
+    wants_gzip = force_gzip or "gzip" in (accept_encoding or "").lower()
+    if wants_gzip and (force_gzip or len(data) >= COMPRESS_MIN_BYTES):
+        return gzip.compress(data, compresslevel=5), "gzip"
+    return data, None
@@ -1,17 +1,117 @@
-from flask import Flask, render_template, request
-from texttosql import text_to_sql
+from flask import Flask, Response, jsonify, render_template, request
+from texttosql import (text_to_sql, text_to_sql_batch, set_translation_cache, set_value_index, resolve_schema,
+                       TranslationLimitError)
+from schema import SQLiteSchemaProvider
+from values import ValueIndexer
+import precompiled
+from cache import TranslationCache, MemoryBackend, SQLiteBackend
+from api import BadRequest, parse_payload, build_response, encode_body
+from metrics import registry as metrics
+from executor import QueryExecutor, ExecutionError
+from tenants import TranslatorRegistry, sqlite_loader
+from capture import CaptureLog
 import os
+import time
 
 app = Flask(__name__)
 
+# Optional: translate against a live SQLite database instead of the built-in demo schema
+_db_path = os.environ.get("TEXT_TO_SQL_DB")
+schema_provider = SQLiteSchemaProvider(_db_path) if _db_path else None
+
+# Optional: precompiled translator state (python precompiled.py) for a fast worker start
+_precompiled_path = os.environ.get("TEXT_TO_SQL_PRECOMPILED")
+if _precompiled_path:
+    precompiled.load(_precompiled_path, schema_provider)
+
+# Optional: bare values filter their column ("pending orders" -> status = 'pending')
+if _db_path and os.environ.get("TEXT_TO_SQL_VALUE_INDEX") == "1":
+    set_value_index(ValueIndexer(_db_path, schema_provider,
+                                 max_bytes=int(os.environ.get("TEXT_TO_SQL_VALUE_INDEX_MB", 4)) << 20))
+
+# Translation cache: per-process by default, or a SQLite file shared by all workers
+_cache_path = os.environ.get("TEXT_TO_SQL_CACHE")
+set_translation_cache(TranslationCache(
+    SQLiteBackend(_cache_path) if _cache_path else MemoryBackend(maxsize=4096)
+))
+
+# Optional: one SQLite database per tenant for the JSON API, chosen by the X-Tenant header
+_tenant_db = os.environ.get("TEXT_TO_SQL_TENANT_DB")  # e.g. /srv/tenants/{tenant}.db
+tenants = TranslatorRegistry(
+    sqlite_loader(_tenant_db),
+    max_bytes=int(os.environ.get("TEXT_TO_SQL_TENANT_CACHE_MB", 256)) << 20,
+    refresh=60.0,
+) if _tenant_db else None
+
+# Optional: run the generated SQL on the same database (read-only, one page at a time)
+executor = QueryExecutor(_db_path, timeout=float(os.environ.get("TEXT_TO_SQL_TIMEOUT", 5))) if _db_path else None
+RESULT_PAGE_SIZE = 50
+
+# Optional: sampled log of incoming questions for replay.py (TEXT_TO_SQL_CAPTURE=path)
+capture = CaptureLog.from_env()
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     sql_query = ""
     user_text = ""
+    run = False
+    result = None
+    error = None
     if request.method == "POST":
         user_text = request.form["text"]
-        sql_query = text_to_sql(user_text)
-    return render_template("index.html", sql=sql_query, text=user_text)
+        if capture is not None:
+            capture.record(user_text, "web")
+        try:
+            sql_query = text_to_sql(user_text, schema_provider)
+        except TranslationLimitError as e:
+            error = str(e)
+        run = executor is not None and "run" in request.form and error is None
+        if run:
+            try:
+                page = max(0, int(request.form.get("page", 0)))
+                result = executor.page(sql_query, page, RESULT_PAGE_SIZE)
+            except (ValueError, ExecutionError) as e:
+                error = str(e)
+    return render_template("index.html", sql=sql_query, text=user_text,
+                           can_run=executor is not None, run=run, result=result, error=error)
+
+@app.route("/api/translate", methods=["POST"])
+def api_translate():
+    """JSON API: {"text": ...} or {"texts": [...]}; add ?compress=1 to force gzip."""
+    start = time.perf_counter()
+    try:
+        texts, single = parse_payload(request.get_json(silent=True))
+    except BadRequest as e:
+        return jsonify(error=str(e)), 400
+    if capture is not None:
+        for t in texts:
+            capture.record(t, "api")
+    tenant = request.headers.get("X-Tenant")
+    if tenants is not None and tenant:
+        try:
+            translator = tenants.get(tenant)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        except KeyError:
+            return jsonify(error=f"unknown tenant {tenant!r}"), 404
+        # the tenant's own Translator: its schema, options and (no) value index
+        schema = translator.schema
+        results = translator.translate_batch(texts)
+    else:
+        schema = resolve_schema(schema_provider)
+        results = list(text_to_sql_batch(texts, schema, workers=1))
+    body = build_response(results, single, schema.version, (time.perf_counter() - start) * 1000)
+    data, encoding = encode_body(body, request.headers.get("Accept-Encoding", ""),
+                                 force_gzip=request.args.get("compress") == "1")
+    resp = Response(data, mimetype="application/json")
+    resp.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    return resp
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
@@ -0,0 +1,186 @@
+"""
+Async (ASGI) serving mode for the JSON translation API.
+
+Concurrent requests are gathered into small batches by MicroBatcher and
+translated together off the event loop, so one slow burst of traffic
+costs one hop to the worker thread per batch instead of per request.
+
+    pip install uvicorn
+    uvicorn asgi:app --workers 4
+
+Routes: POST /api/translate (same contract as app.py), GET /metrics, GET /healthz.
+Environment: TEXT_TO_SQL_DB, TEXT_TO_SQL_CACHE, TEXT_TO_SQL_PRECOMPILED (as for app.py),
+TEXT_TO_SQL_BATCH (max texts per batch, default 64),
+TEXT_TO_SQL_BATCH_WAIT_MS (max wait to fill a batch, default 2).
+"""
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from texttosql import text_to_sql_batch, set_translation_cache, resolve_schema
+from schema import SQLiteSchemaProvider
+import precompiled
+from cache import TranslationCache, MemoryBackend, SQLiteBackend
+from api import BadRequest, parse_payload, build_response, encode_body
+from metrics import registry as metrics
+
+_db_path = os.environ.get("TEXT_TO_SQL_DB")
+schema_provider = SQLiteSchemaProvider(_db_path) if _db_path else None
+
+# Optional: precompiled translator state (python precompiled.py) for a fast worker start
+_precompiled_path = os.environ.get("TEXT_TO_SQL_PRECOMPILED")
+if _precompiled_path:
+    precompiled.load(_precompiled_path, schema_provider)
+
+_cache_path = os.environ.get("TEXT_TO_SQL_CACHE")
+set_translation_cache(TranslationCache(
+    SQLiteBackend(_cache_path) if _cache_path else MemoryBackend(maxsize=4096)
+))
+
+MAX_BODY_BYTES = 1 << 20
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent callers for up to `max_wait_ms` (or until
+    `max_batch` texts are queued) and translates them in one executor call.
+    """
+
+    def __init__(self, max_batch=64, max_wait_ms=2.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def translate(self, texts, schema):
+        self._ensure_started()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, schema, fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            try:
+                results = await loop.run_in_executor(None, self._translate_batch, batch)
+            except Exception as e:
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, _, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+    @staticmethod
+    def _translate_batch(batch):
+        # callers may use different schema snapshots; translate each group together
+        by_schema = {}
+        for i, (texts, schema, _) in enumerate(batch):
+            by_schema.setdefault(schema, []).append(i)
+        out = [None] * len(batch)
+        for schema, idxs in by_schema.items():
+            flat = [t for i in idxs for t in batch[i][0]]
+            results = list(text_to_sql_batch(flat, schema, workers=1))
+            pos = 0
+            for i in idxs:
+                n = len(batch[i][0])
+                out[i] = results[pos:pos + n]
+                pos += n
+        return out
+
+batcher = MicroBatcher(
+    max_batch=int(os.environ.get("TEXT_TO_SQL_BATCH", 64)),
+    max_wait_ms=float(os.environ.get("TEXT_TO_SQL_BATCH_WAIT_MS", 2)),
+)
+
+async def _read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BadRequest("request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+async def _send(send, status, data, headers=(), content_type=b"application/json"):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), *headers],
+    })
+    await send({"type": "http.response.body", "body": data})
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if path == "/healthz":
+        await _send(send, 200, b'{"ok": true}')
+        return
+    if path == "/metrics":
+        await _send(send, 200, metrics.render_prometheus().encode(),
+                    content_type=b"text/plain; version=0.0.4")
+        return
+    if path != "/api/translate":
+        await _send(send, 404, b'{"error": "not found"}')
+        return
+    if method != "POST":
+        await _send(send, 405, b'{"error": "method not allowed"}')
+        return
+
+    start = time.perf_counter()
+    try:
+        raw = await _read_body(receive)
+        try:
+            payload = json.loads(raw or b"null")
+        except ValueError:
+            raise BadRequest("invalid JSON")
+        texts, single = parse_payload(payload)
+    except BadRequest as e:
+        await _send(send, 400, json.dumps({"error": str(e)}).encode())
+        return
+
+    schema = resolve_schema(schema_provider)
+    results = await batcher.translate(texts, schema)
+    body = build_response(results, single, schema.version, (time.perf_counter() - start) * 1000)
+    headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+    query = parse_qs(scope.get("query_string", b"").decode())
+    data, encoding = encode_body(body, headers.get("accept-encoding", ""),
+                                 force_gzip=query.get("compress") == ["1"])
+    extra = [(b"vary", b"Accept-Encoding")]
+    if encoding:
+        extra.append((b"content-encoding", encoding.encode()))
+    await _send(send, 200, data, extra)
@@ -0,0 +1,95 @@
+"""
+Bulk text -> SQL translation with streaming JSONL / CSV input and output.
+
+    python batch.py questions.jsonl -o translated.jsonl --workers 8
+    python batch.py questions.csv --field question -o out.csv
+    cat questions.txt | python batch.py - --format text > out.jsonl
+
+Input rows are JSON objects (the question is read from --field), bare JSON
+strings, CSV rows with a --field column, or plain lines (--format text).
+Output rows carry text, sql, error and code. A JSONL line that is not valid
+JSON becomes an error row (code "invalid_row", the line number in the
+message) instead of stopping the run. Memory use is constant: rows are
+read, translated and written as a stream.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+from texttosql import BatchResult, text_to_sql_batch
+from schema import SQLiteSchemaProvider
+
+def _guess_format(path, default="jsonl"):
+    for ext in ("jsonl", "csv", "txt"):
+        if path and path.endswith("." + ext):
+            return "text" if ext == "txt" else ext
+    return default
+
+def read_questions(stream, fmt, field):
+    """Questions from `stream`; malformed JSONL lines are yielded as BatchResult error rows."""
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row.get(field, "")
+    elif fmt == "text":
+        for line in stream:
+            yield line.rstrip("\n")
+    else:
+        for n, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                yield BatchResult(line.rstrip("\n"), None, f"line {n}: invalid JSON: {e}", "invalid_row")
+                continue
+            yield obj.get(field, "") if isinstance(obj, dict) else obj
+
+def write_results(stream, fmt, results):
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(["text", "sql", "error", "code"])
+        for r in results:
+            writer.writerow([r.text, r.sql or "", r.error or "", r.code or ""])
+            count += 1
+    else:
+        for r in results:
+            stream.write(json.dumps({"text": r.text, "sql": r.sql, "error": r.error, "code": r.code}) + "\n")
+            count += 1
+    return count
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Translate questions to SQL in bulk.")
+    p.add_argument("input", help="input file, or - for stdin")
+    p.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    p.add_argument("--format", choices=["jsonl", "csv", "text"], help="input format (default: from extension)")
+    p.add_argument("--output-format", choices=["jsonl", "csv"], help="output format (default: from extension)")
+    p.add_argument("--field", default="text", help="JSON key / CSV column holding the question")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    p.add_argument("--chunksize", type=int, default=256, help="questions per worker task")
+    p.add_argument("--db", help="SQLite database to introspect instead of the built-in schema")
+    args = p.parse_args(argv)
+
+    in_fmt = args.format or _guess_format(None if args.input == "-" else args.input)
+    out_fmt = args.output_format or _guess_format(None if args.output == "-" else args.output)
+    schema = SQLiteSchemaProvider(args.db).snapshot() if args.db else None
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        results = text_to_sql_batch(read_questions(src, in_fmt, args.field), schema,
+                                    workers=args.workers, chunksize=args.chunksize)
+        count = write_results(dst, out_fmt, results)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    print(f"translated {count} questions in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f}/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
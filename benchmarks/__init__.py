@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for the text-to-SQL translator.
+
+Run each one from the repository root, e.g.:
+
+    python -m benchmarks.normalize
+"""
@@ -0,0 +1,17 @@
+import time
+
+def per_call_us(fn, inputs, repeat=5):
+    """Best-of-`repeat` average time per call of fn over inputs, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for x in inputs:
+            fn(x)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+def print_table(headers, rows):
+    widths = [max([len(str(h))] + [len(str(r[i])) for r in rows]) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(r, widths)))
@@ -0,0 +1,42 @@
+"""
+text_to_sql_batch throughput from 1 to N worker processes.
+
+    python -m benchmarks.batch [--items 200000]
+"""
+import argparse
+import itertools
+import os
+import time
+
+from benchmarks._util import print_table
+from texttosql import text_to_sql_batch
+
+QUESTIONS = [
+    "Show employees with salary >= 50000 and department equals sales",
+    "List products where price between 100 and 500 and category equals toys",
+    "Show customers with age greater than 25 and city equals delhi",
+    "Get orders where amount > 2000 and status = pending",
+    "show name of customers and products where amount > 100",
+]
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--items", type=int, default=100_000)
+    args = p.parse_args(argv)
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    rows = []
+    base = None
+    for workers in counts:
+        # unique suffixes keep any installed translation cache from helping
+        items = (f"{q} {i}" for i, q in zip(range(args.items), itertools.cycle(QUESTIONS)))
+        start = time.perf_counter()
+        n = sum(1 for _ in text_to_sql_batch(items, workers=workers, chunksize=512))
+        rate = n / (time.perf_counter() - start)
+        base = base or rate
+        rows.append((workers, f"{rate:,.0f}", f"{rate / base:.2f}x"))
+    print(f"{args.items} questions, {cores} CPUs")
+    print_table(["workers", "questions/s", "speedup"], rows)
+
+if __name__ == "__main__":
+    main()
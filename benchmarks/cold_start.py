@@ -0,0 +1,85 @@
+"""
+Import-to-first-translation time of a fresh worker process, with and
+without a precompiled file (see precompiled.py), against a SQLite schema of
+growing size. Each measurement runs in a new interpreter.
+
+    python -m benchmarks.cold_start [--tables 50 500 3000]
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._util import print_table
+from benchmarks.workload import synthetic_schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import sys, time
+start = time.perf_counter()
+import texttosql, precompiled
+from schema import SQLiteSchemaProvider
+db, engine, question = sys.argv[1:4]
+schema = SQLiteSchemaProvider(db)
+if engine != "-":
+    schema = precompiled.load(engine, schema, rebuild=False)
+texttosql.text_to_sql(question, schema)
+print((time.perf_counter() - start) * 1000)
+"""
+
+def build_db(path, n_tables):
+    snap = synthetic_schema(n_tables=n_tables, n_cols=20, fk_ratio=1.5, seed=1)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    for table, cols in snap.tables.items():
+        defs = []
+        for c in cols:
+            ref = snap.foreign_keys.get((table, c))
+            if c == "id":
+                defs.append("id INTEGER PRIMARY KEY")
+            elif ref:
+                defs.append(f"{c} INTEGER REFERENCES {ref[0]}({ref[1]})")
+            else:
+                defs.append(c)
+        conn.execute(f"CREATE TABLE {table} ({', '.join(defs)})")
+    conn.commit()
+    conn.close()
+    return snap
+
+def run(db, engine, question, repeat=3):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", WORKER, db, engine, question],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout))
+    return min(times)
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--tables", type=int, nargs="+", default=[50, 500, 3000])
+    args = p.parse_args(argv)
+    tmp = tempfile.mkdtemp(prefix="texttosql_cold_")
+    rows = []
+    for n in args.tables:
+        db = os.path.join(tmp, f"schema_{n}.db")
+        engine = os.path.join(tmp, f"engine_{n}.bin")
+        snap = build_db(db, n)
+        names = list(snap.tables)
+        col = [c for c in snap.tables[names[-1]] if c != "id"][0]
+        exact = f"show {col} of {names[-1]} and {names[0]} where {col} > 5"
+        typo = f"show {col} of {names[-1][:2] + names[-1][3:]} where {col} > 5"
+        subprocess.run([sys.executable, "precompiled.py", engine, "--db", db],
+                       cwd=ROOT, capture_output=True, check=True)
+        rows.append((n, n * 20,
+                     f"{run(db, '-', exact):.0f}", f"{run(db, engine, exact):.0f}",
+                     f"{run(db, '-', typo):.0f}", f"{run(db, engine, typo):.0f}",
+                     f"{os.path.getsize(engine) / 1024:,.0f}"))
+    print_table(["tables", "columns", "rebuild ms", "precompiled ms",
+                 "rebuild ms (typo)", "precompiled ms (typo)", "file KiB"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Condition parsing cost for 1-50 conditions: the fragment-based regex cascade
+(split_conditions + parse_single_condition with table-name stripping retry)
+versus the single-pass lexer and recursive-descent parser.
+
+    python -m benchmarks.conditions
+"""
+import random
+import re
+
+from benchmarks._util import per_call_us, print_table
+from conditions import parse_conditions
+from dialects import get_dialect
+from texttosql import normalize_text, split_conditions, parse_single_condition, tables
+
+COLUMNS = tables["orders"] + tables["customers"]
+TEMPLATES = [
+    "amount greater than {n}",
+    "age between {n} and {m}",
+    "status equals pending",
+    "city = delhi",
+    "order_date after {d}",
+    "amount at most {m}",
+]
+
+def question(k, rng):
+    parts = []
+    for _ in range(k):
+        t = rng.choice(TEMPLATES)
+        parts.append(t.format(n=rng.randrange(100), m=rng.randrange(100, 1000),
+                              d=f"2023-0{rng.randrange(1, 10)}-1{rng.randrange(10)}"))
+    text = parts[0]
+    for p in parts[1:]:
+        text += f" {rng.choice(['and', 'or'])} {p}"
+    return normalize_text("show orders and customers where " + text).split(" where ", 1)[1]
+
+def legacy(cond_text, mentioned=("orders", "customers")):
+    conds, connectors = split_conditions(cond_text)
+    out = []
+    for c in conds:
+        parsed = parse_single_condition(c, default_date_col="order_date")
+        if not parsed:
+            c2 = c
+            for t in mentioned:
+                c2 = re.sub(r"\b" + re.escape(t) + r"\b", "", c2).strip()
+            parsed = parse_single_condition(c2, default_date_col="order_date")
+        if parsed:
+            out.append(parsed)
+    return out
+
+def recursive_descent(cond_text, columns=frozenset(COLUMNS)):
+    tree, _ = parse_conditions(cond_text, columns, tables, default_date_col="order_date")
+    return get_dialect("sqlite").condition(tree) if tree is not None else ""
+
+def main():
+    rng = random.Random(3)
+    rows = []
+    for k in (1, 2, 5, 10, 20, 50):
+        inputs = [question(k, rng) for _ in range(100)]
+        rows.append((k, f"{per_call_us(legacy, inputs):.1f}", f"{per_call_us(recursive_descent, inputs):.1f}"))
+    print_table(["conditions", "regex cascade (us)", "lexer + RD parser (us)"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+SQL for three dialects: three full translations versus one parse and three
+renders of the shared query IR.
+
+    python -m benchmarks.dialects
+"""
+from benchmarks._util import per_call_us, print_table
+from texttosql import text_to_sql, text_to_sql_dialects, parse_query, set_translation_cache, set_query_cache
+from dialects import get_dialect
+
+DIALECTS = ("sqlite", "postgres", "mysql")
+QUESTIONS = [
+    "Show employees with salary >= 50000 and department equals sales",
+    "List products where price between 100 and 500 and category equals toys",
+    "Show customers with age greater than 25 and city equals delhi",
+    "Get orders where amount > 2000 and status = pending",
+    "show name of customers and products where amount > 100",
+] * 100
+
+def separate(q):
+    return [text_to_sql(q, dialect=d) for d in DIALECTS]
+
+def render_only(query):
+    return [get_dialect(d).render(query) for d in DIALECTS]
+
+def main():
+    set_translation_cache(None)
+    set_query_cache(None)
+    rows = [("3 x text_to_sql, no IR cache", f"{per_call_us(separate, QUESTIONS):.1f}"),
+            ("text_to_sql_dialects, no IR cache", f"{per_call_us(text_to_sql_dialects, QUESTIONS):.1f}")]
+    queries = [parse_query(q) for q in QUESTIONS]
+    rows.append(("3 renders of a parsed IR", f"{per_call_us(render_only, queries):.1f}"))
+    print_table(["SQLite + PostgreSQL + MySQL", "us / question"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Executing a generated SELECT * on a multi-million-row SQLite table:
+time to first row and peak Python memory for fetchall() versus the paged
+QueryExecutor.
+
+    python -m benchmarks.execution [--rows 2000000] [--db /tmp/bench_orders.db]
+
+The database is built once and reused on later runs.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks._util import print_table
+from executor import QueryExecutor
+from schema import SQLiteSchemaProvider
+from texttosql import set_default_limit, text_to_sql
+
+def build_db(path, rows):
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        n = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+        conn.close()
+        if n == rows:
+            return
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, amount REAL,"
+                 " status TEXT, order_date TEXT)")
+    statuses = ("pending", "shipped", "delivered", "cancelled")
+    conn.executemany(
+        "INSERT INTO orders (customer_id, amount, status, order_date) VALUES (?, ?, ?, ?)",
+        ((i % 5000, (i * 37) % 10000 / 3, statuses[i % 4], f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+         for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+def measure(fn):
+    """(seconds to first row, seconds total, peak traced KiB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = fn(start)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak / 1024
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "texttosql_bench_orders.db"))
+    p.add_argument("--page-size", type=int, default=1000)
+    args = p.parse_args(argv)
+    build_db(args.db, args.rows)
+    set_default_limit(None)  # measure the whole table, not the first 1000 rows
+    sql = text_to_sql("show all orders", SQLiteSchemaProvider(args.db))
+    ex = QueryExecutor(args.db, timeout=600)
+
+    def fetchall(start):
+        conn = sqlite3.connect(args.db)
+        rows = conn.execute(sql).fetchall()
+        first = time.perf_counter() - start
+        assert len(rows) == args.rows
+        conn.close()
+        return first
+
+    def stream(start):
+        first = None
+        n = 0
+        for _, rows in ex.stream(sql, args.page_size):
+            if first is None:
+                first = time.perf_counter() - start
+            n += len(rows)
+        assert n == args.rows
+        return first
+
+    def first_page(start):
+        ex.page(sql, 0, args.page_size)
+        return time.perf_counter() - start
+
+    def deep_page(start):
+        ex.page(sql, args.rows // args.page_size - 1, args.page_size)
+        return time.perf_counter() - start
+
+    rows = []
+    for name, fn in [("fetchall()", fetchall), ("stream(): all pages", stream),
+                     ("page(): first page", first_page), ("page(): last page", deep_page)]:
+        first, total, peak = measure(fn)
+        rows.append((name, f"{first * 1000:.1f}", f"{total * 1000:.1f}", f"{peak:,.0f}"))
+    print(sql)
+    print_table([f"{args.rows:,} rows", "first row ms", "total ms", "peak KiB"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Approximate name lookup ("emplyees", "custmer_emial") as the schema grows:
+FuzzyNameIndex.lookup versus difflib.get_close_matches over every name.
+
+    python -m benchmarks.fuzzy
+"""
+import difflib
+import random
+import re
+
+from benchmarks._util import per_call_us, print_table
+from schema import FuzzyNameIndex
+
+_PARTS = ["customer", "order", "invoice", "employee", "product", "payment", "shipment",
+          "account", "address", "phone", "email", "status", "amount", "salary", "region",
+          "manager", "created", "updated", "number", "code", "name", "date", "total", "price"]
+
+def vocabulary(n, seed=0):
+    """`n` distinct snake_case names built from 1-3 parts and a numeric suffix."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        name = "_".join(rng.sample(_PARTS, rng.randint(1, 3)))
+        if rng.random() < 0.7:
+            name += str(rng.randrange(n))
+        names.add(name)
+    return sorted(names)
+
+def typo(word, rng):
+    """One dropped, swapped or doubled letter inside the word's longest part."""
+    part = max(re.findall(r"[a-z]+", word), key=len)
+    start = word.index(part)
+    i = start + rng.randrange(1, len(part) - 1)
+    op = rng.choice(["drop", "swap", "double"])
+    if op == "drop":
+        return word[:i] + word[i + 1:]
+    if op == "swap":
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+def main():
+    rng = random.Random(1)
+    rows = []
+    for n in (100, 1_000, 10_000, 60_000):
+        names = vocabulary(n)
+        index = FuzzyNameIndex(names)
+        targets = [rng.choice(names) for _ in range(200)]
+        queries = [typo(w, rng) for w in targets]
+        found = sum(1 for q, w in zip(queries, targets) if w in [c for c, _ in index.lookup(q, limit=3)])
+        tri = per_call_us(lambda q: index.lookup(q, limit=3), queries)
+        if n <= 10_000:
+            sample = queries[:20]
+            diff = f"{per_call_us(lambda q: difflib.get_close_matches(q, names, 3, 0.6), sample, 1):,.0f}"
+            diff_found = sum(1 for q, w in zip(sample, targets) if w in difflib.get_close_matches(q, names, 3, 0.6))
+            diff_found = f"{diff_found / len(sample):.0%}"
+        else:
+            diff = diff_found = "-"
+        rows.append((f"{n:,}", f"{tri:.1f}", diff, f"{found / len(queries):.0%}", diff_found))
+    print_table(["names", "FuzzyNameIndex (us)", "difflib (us)", "found (index)", "found (difflib)"], rows)
+
+if __name__ == "__main__":
+    main()
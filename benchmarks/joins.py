@@ -0,0 +1,65 @@
+"""
+Join planning cost on a schema with several hundred foreign-key edges.
+
+Compares the previous adjacent-only FK scan (which CROSS JOINs anything not
+directly linked to the previous table) with ForeignKeyGraph planning, cold
+and memoized.
+
+    python -m benchmarks.joins
+"""
+import random
+
+from benchmarks._util import per_call_us, print_table
+from schema import ForeignKeyGraph
+
+def synthetic_schema(n_tables=300, n_edges=600, seed=0):
+    rng = random.Random(seed)
+    tables = {f"t{i}": ["id", "name"] for i in range(n_tables)}
+    fks = {}
+    # a random spanning tree keeps everything reachable, extra edges add cycles
+    for i in range(1, n_tables):
+        j = rng.randrange(i)
+        tables[f"t{i}"].append(f"fk{j}")
+        fks[(f"t{i}", f"fk{j}")] = (f"t{j}", "id")
+    while len(fks) < n_edges:
+        a, b = rng.sample(range(n_tables), 2)
+        if (f"t{a}", f"fk{b}") not in fks:
+            tables[f"t{a}"].append(f"fk{b}")
+            fks[(f"t{a}", f"fk{b}")] = (f"t{b}", "id")
+    return tables, fks
+
+def legacy_plan(tables, fks, selected):
+    used = [selected[0]]
+    cross = 0
+    for t in selected[1:]:
+        joined = False
+        for (f_table, _), (t_table, _) in fks.items():
+            if (f_table == used[-1] and t_table == t) or (f_table == t and t_table == used[-1]):
+                joined = True
+                break
+        if not joined:
+            cross += 1
+        used.append(t)
+    return cross
+
+def main():
+    tables, fks = synthetic_schema()
+    rng = random.Random(1)
+    names = list(tables)
+    rows = []
+    for k in (2, 3, 5, 8):
+        queries = [tuple(rng.sample(names, k)) for _ in range(200)]
+        graph = ForeignKeyGraph(tables, fks)
+        legacy_cross = sum(legacy_plan(tables, fks, q) for q in queries)
+        cold = per_call_us(graph.plan, queries, repeat=1)
+        warm = per_call_us(graph.plan, queries)
+        graph_cross = sum(edge is None for q in queries for _, edge in graph.plan(q)[1:])
+        bridges = sum(len(graph.plan(q)) - k for q in queries) / len(queries)
+        rows.append((k, f"{per_call_us(lambda q: legacy_plan(tables, fks, q), queries):.1f}",
+                     f"{cold:.1f}", f"{warm:.2f}", legacy_cross, graph_cross, f"{bridges:.1f}"))
+    print(f"schema: {len(tables)} tables, {len(fks)} FK edges, 200 random table sets per row")
+    print_table(["tables", "legacy (us)", "graph cold (us)", "graph memo (us)",
+                 "legacy cross joins", "graph cross joins", "avg bridges"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-keystroke cost of the live preview: every prefix of each question is
+sent as if typed one character at a time, with a typo fixed by backspacing
+halfway through. LivePreview.update (incremental) is compared with a full
+translation with caches off (what text_to_sql costs for a new question). The
+SQL must match the full translation for every keystroke.
+
+    python -m benchmarks.live [--questions 200]
+"""
+import argparse
+import time
+
+from benchmarks._util import print_table
+from benchmarks.workload import generate_questions
+from live import LivePreview
+from texttosql import Translator, resolve_schema
+
+def keystrokes(question):
+    """Editor contents after each key: typing, a two-letter typo fixed halfway, then the rest."""
+    half = len(question) // 2
+    states = [question[:i] for i in range(1, half + 1)]
+    states += [question[:half] + "xq"[:i] for i in (1, 2)] + [question[:half] + "x", question[:half]]
+    states += [question[:i] for i in range(half + 1, len(question) + 1)]
+    return states
+
+def _summary(us):
+    s = sorted(us)
+    return (f"{sum(s) / len(s):.1f}", f"{s[len(s) // 2]:.1f}", f"{s[int(len(s) * 0.99)]:.1f}", f"{s[-1]:.1f}")
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--questions", type=int, default=200)
+    args = p.parse_args(argv)
+
+    schema = resolve_schema()
+    questions = generate_questions(schema, args.questions, max_conditions=4, seed=7)
+    full = Translator(schema, cache=None, query_cache=None)
+    full_us, live_us, reused, mismatches = [], [], 0, 0
+    for q in questions:
+        preview = LivePreview(schema)  # one session per question
+        for text in keystrokes(q):
+            start = time.perf_counter()
+            expected = full.translate(text)
+            full_us.append((time.perf_counter() - start) * 1e6)
+            start = time.perf_counter()
+            got = preview.update(text)
+            live_us.append((time.perf_counter() - start) * 1e6)
+            reused += got.reused is not None
+            mismatches += got.sql != expected
+    print(f"{len(questions)} questions, {len(live_us):,} keystrokes; "
+          f"{reused / len(live_us):.0%} answered without translating")
+    print_table(["per keystroke (us)", "mean", "p50", "p99", "max"],
+                [("full translation", *_summary(full_us)), ("LivePreview.update", *_summary(live_us))])
+    if mismatches:
+        print(f"\n{mismatches} keystrokes differ from the full translation")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
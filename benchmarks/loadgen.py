@@ -0,0 +1,109 @@
+"""
+Local load generator: p50/p99 latency and requests per second for the HTML
+form route versus the JSON API.
+
+Start a server first (python app.py, or uvicorn asgi:app --port 5000), then:
+
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --concurrency 16 --seconds 10
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --only api --batch 16
+
+The form route is skipped automatically for servers that do not serve it (asgi.py).
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from benchmarks._util import print_table
+
+QUESTIONS = [
+    "Show employees with salary >= 50000 and department equals sales",
+    "List products where price between 100 and 500 and category equals toys",
+    "Show customers with age greater than 25 and city equals delhi",
+    "Get orders where amount > 2000 and status = pending",
+]
+
+def _form_request(base, text, batch):
+    data = urllib.parse.urlencode({"text": text}).encode()
+    return urllib.request.Request(base + "/", data=data)
+
+def _api_request(base, text, batch):
+    payload = {"text": text} if batch == 1 else {"texts": [text] * batch}
+    return urllib.request.Request(base + "/api/translate", data=json.dumps(payload).encode(),
+                                  headers={"Content-Type": "application/json"})
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def run(make_request, base, concurrency, seconds, batch):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+    counter = itertools.count()
+
+    def worker():
+        nonlocal errors
+        local, local_errors = [], 0
+        while time.perf_counter() < stop_at:
+            text = QUESTIONS[next(counter) % len(QUESTIONS)]
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(make_request(base, text, batch), timeout=30) as resp:
+                    resp.read()
+                local.append(time.perf_counter() - start)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+    }
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--url", default="http://127.0.0.1:5000")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--seconds", type=float, default=10)
+    p.add_argument("--batch", type=int, default=1, help="texts per API request")
+    p.add_argument("--only", choices=["form", "api"])
+    args = p.parse_args(argv)
+    base = args.url.rstrip("/")
+
+    routes = [("form /", _form_request), ("api /api/translate", _api_request)]
+    rows = []
+    for name, make in routes:
+        if args.only and not name.startswith(args.only):
+            continue
+        res = run(make, base, args.concurrency, args.seconds, args.batch if make is _api_request else 1)
+        if res["requests"] == 0:
+            print(f"{name}: no successful requests ({res['errors']} errors), skipped")
+            continue
+        per = args.batch if make is _api_request else 1
+        rows.append((name, res["requests"], res["errors"], f"{res['rps']:.0f}",
+                     f"{res['rps'] * per:.0f}", f"{res['p50']:.2f}", f"{res['p99']:.2f}"))
+    print(f"concurrency={args.concurrency} seconds={args.seconds} batch={args.batch}")
+    print_table(["route", "requests", "errors", "req/s", "texts/s", "p50 ms", "p99 ms"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Cost of stage metrics: text_to_sql per-call time with collection on and off,
+and the cost of one request's metric calls on their own (a timer, one mark
+per stage, finish() and the request counter).
+
+    python -m benchmarks.metrics_overhead
+
+On and off runs alternate and the median of each is reported: the end-to-end
+difference is small next to run-to-run noise, so read it together with the
+isolated figure.
+"""
+import statistics
+import timeit
+
+import metrics
+from benchmarks._util import per_call_us, print_table
+from texttosql import text_to_sql, set_translation_cache, set_query_cache
+
+QUESTIONS = [
+    "Show all students",
+    "Show employees with salary >= 50000 and department equals sales",
+    "List products where price between 100 and 500 and category equals toys",
+    "Show customers with age greater than 25 and city equals delhi",
+    "Get orders where amount > 2000 and status = pending",
+    "show name of customers and products where amount > 100",
+] * 100
+
+STAGES = ("normalize", "table_detection", "field_detection", "join_inference", "condition_parse", "render")
+ROUNDS = 6
+
+def _request_metrics():
+    registry = metrics.registry
+    timer = registry.timer()
+    registry.inc("texttosql_requests_total")
+    for stage in STAGES:
+        timer.mark(stage)
+    timer.finish()
+
+def main():
+    set_translation_cache(None)
+    set_query_cache(None)
+    results = {False: [], True: []}
+    for i in range(ROUNDS):
+        for enabled in ((False, True) if i % 2 == 0 else (True, False)):
+            metrics.enable(enabled)
+            results[enabled].append(per_call_us(text_to_sql, QUESTIONS, repeat=3))
+    metrics.enable(True)
+    n = 20000
+    alone = min(timeit.repeat(_request_metrics, number=n, repeat=5)) / n * 1e6
+    off, on = statistics.median(results[False]), statistics.median(results[True])
+    rows = [
+        ("disabled", f"{off:.1f}", ""),
+        ("enabled", f"{on:.1f}", f"+{on - off:.2f} us ({(on - off) / off * 100:.1f}%)"),
+        ("metric calls alone", f"{alone:.2f}", f"{len(STAGES)} marks + finish + 1 counter"),
+    ]
+    print_table(["metrics", "us / call", "overhead"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Per-call normalize_text cost as the phrase rule table grows.
+
+Compares the single-pass PhraseRewriter with the previous approach of one
+re.sub per phrase.
+
+    python -m benchmarks.normalize
+"""
+import random
+import re
+
+from benchmarks._util import per_call_us, print_table
+from texttosql import PHRASE_RULES, PhraseRewriter
+
+QUERIES = [
+    "Show employees with salary greater than 50000 and department equals sales",
+    "List products where price is between 100 and 500 and stock is at least 10",
+    "Show customers with age more than 25 and city equals delhi or age below 60",
+    "Get orders where amount is at most 2000 and status is pending",
+] * 50
+
+def synthetic_rules(n, seed=0):
+    rng = random.Random(seed)
+    ops = [">", "<", ">=", "<=", "="]
+    words = ["higher", "lower", "bigger", "smaller", "exceeds", "under", "over",
+             "beyond", "within", "upto", "past", "beneath", "atop", "around"]
+    rules = list(PHRASE_RULES)
+    seen = {p for p, _ in rules}
+    while len(rules) < n:
+        phrase = " ".join(rng.choice(words) + str(rng.randrange(1000)) for _ in range(rng.randint(1, 3)))
+        if phrase not in seen:
+            seen.add(phrase)
+            rules.append((phrase, rng.choice(ops)))
+    return rules
+
+def sequential_normalizer(rules):
+    def normalize(t):
+        t = t.lower().strip()
+        for phrase, repl in rules:
+            t = re.sub(r"\b" + re.escape(phrase) + r"\b", repl, t)
+        return t
+    return normalize
+
+def main():
+    rows = []
+    for n in (11, 50, 100, 200, 400, 800):
+        rules = synthetic_rules(n)
+        rewriter = PhraseRewriter(rules)
+        single = lambda t: rewriter.rewrite(t.lower().strip())
+        rows.append((n,
+                     f"{per_call_us(sequential_normalizer(rules), QUERIES):.1f}",
+                     f"{per_call_us(single, QUERIES):.1f}"))
+    print_table(["rules", "sequential re.sub (us)", "single pass (us)"], rows)
+
+if __name__ == "__main__":
+    main()
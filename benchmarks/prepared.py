@@ -0,0 +1,75 @@
+"""
+Repeated execution on SQLite: SQL with inlined literals versus parameterized
+templates, with and without prepared-statement reuse.
+
+Every question differs only in its values. Inlined SQL is a new statement each
+time and must be parsed and planned again; the parameterized template has one
+shape fingerprint, so sqlite3's statement cache prepares it once.
+
+    python -m benchmarks.prepared [--rows 200000] [--questions 5000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks._util import print_table
+from schema import SQLiteSchemaProvider
+from texttosql import text_to_sql, text_to_sql_params
+
+STATUSES = ("pending", "shipped", "delivered", "cancelled")
+
+def build_db(path, rows):
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER,"
+                 " order_date TEXT, amount REAL, status TEXT)")
+    conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", (
+        (i, rng.randrange(rows // 10), rng.randrange(1000), f"2023-{rng.randint(1, 12):02d}-01",
+         rng.randint(1, 5000), rng.choice(STATUSES)) for i in range(rows)))
+    conn.execute("CREATE INDEX idx_orders_customer_id ON orders (customer_id)")
+    conn.commit()
+    conn.close()
+
+def run(conn, statements):
+    start = time.perf_counter()
+    for sql, params in statements:
+        conn.execute(sql, params).fetchall()
+    return time.perf_counter() - start
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--questions", type=int, default=5000)
+    p.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "texttosql_bench_prepared.db"))
+    args = p.parse_args(argv)
+    build_db(args.db, args.rows)
+    schema = SQLiteSchemaProvider(args.db)
+
+    rng = random.Random(11)
+    questions = [f"get orders where customer_id = {rng.randrange(args.rows // 10)}"
+                 f" and status = {rng.choice(STATUSES)}" for _ in range(args.questions)]
+    inline = [(text_to_sql(q, schema), ()) for q in questions]
+    bound = [text_to_sql_params(q, schema) for q in questions]
+    templated = [(b.sql, b.params) for b in bound]
+
+    rows = []
+    for label, statements, cached in (("inlined literals", inline, 128),
+                                      ("parameterized, no reuse", templated, 0),
+                                      ("parameterized, reused", templated, 128)):
+        conn = sqlite3.connect(args.db, cached_statements=cached)
+        run(conn, statements[:200])  # warm the page cache
+        elapsed = run(conn, statements)
+        conn.close()
+        distinct = len({sql for sql, _ in statements})
+        rows.append((label, f"{distinct:,}", f"{elapsed / len(statements) * 1e6:.1f}",
+                     f"{len(statements) / elapsed:,.0f}"))
+    print(f"{len(questions):,} questions, {len({b.fingerprint for b in bound})} shape fingerprint(s)")
+    print_table(["execution", "statements", "us / query", "q/s"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Regression benchmark for text_to_sql over seeded synthetic workloads.
+
+Each scenario measures throughput, latency percentiles and peak memory, and
+hashes the generated SQL so behaviour changes are caught as well. Results are
+compared against a baseline file; the run fails (exit code 1) when a metric
+regresses by more than its tolerance or the output hash changes.
+
+    python -m benchmarks.regression --save          # record benchmarks/baseline.json
+    python -m benchmarks.regression                 # compare against it
+    python -m benchmarks.regression --allow-output-change --save   # accept new SQL output
+
+Every metric is the median of --repeat timed passes (after one warm-up pass),
+times are scaled by a reference workload timed alongside (_reference_pass),
+and each metric has its own tolerance: tail latencies vary far more between
+runs than the median does. Timings are only compared with a baseline recorded on
+the same machine (see machine()) from at least MIN_TIMED_QUESTIONS questions;
+otherwise only the output hashes are compared. The committed
+benchmarks/baseline.json is the reference for the output hashes; record a
+local one for timings with --save on the machine that runs the gate, e.g.
+from the target branch before testing a change.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks._util import print_table
+from benchmarks.workload import synthetic_schema, generate_questions
+from texttosql import text_to_sql, set_translation_cache, set_query_cache
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> (schema kwargs, question kwargs)
+SCENARIOS = {
+    "small-simple": ({"n_tables": 5, "n_cols": 6}, {"max_conditions": 1}),
+    "small-conditions": ({"n_tables": 5, "n_cols": 10}, {"max_conditions": 6}),
+    "wide-schema": ({"n_tables": 500, "n_cols": 30}, {"max_conditions": 3}),
+    "joins": ({"n_tables": 60, "n_cols": 10, "fk_ratio": 2.0}, {"max_conditions": 2, "multi_table": 0.8}),
+    "no-between-dates": ({"n_tables": 20, "n_cols": 10}, {"max_conditions": 4, "between": False, "dates": False}),
+}
+
+def _timed_pass(questions, schema):
+    digest = hashlib.sha1()
+    latencies = []
+    start = time.perf_counter()
+    for q in questions:
+        t0 = time.perf_counter()
+        sql = text_to_sql(q, schema)
+        latencies.append(time.perf_counter() - t0)
+        digest.update(sql.encode() + b"\n")
+    return time.perf_counter() - start, sorted(latencies), digest.hexdigest()
+
+_WORDS = [f"customer_{i % 97} where amount > {i}" for i in range(400)]
+
+def _reference_pass(rounds=20):
+    """
+    Time a fixed pure-Python workload (string, regex and dict work, like a
+    translation) that does not depend on this repo: timings are scaled by it
+    so a machine that is slower right now is not reported as a regression.
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        counts = {}
+        for w in " ".join(_WORDS).split():
+            counts[w.lower()] = counts.get(w, 0) + 1
+        re.findall(r"(\w+) > (\d+)", "\n".join(sorted(_WORDS)))
+    return (time.perf_counter() - start) * 1e6
+
+def run_scenario(schema_kwargs, question_kwargs, n, seed, repeat=5):
+    schema = synthetic_schema(seed=seed, **schema_kwargs)
+    questions = generate_questions(schema, n, seed=seed, **question_kwargs)
+    # warm-up pass: lazily built indexes and memo caches are not billed to the timed ones
+    _timed_pass(questions, schema)
+
+    passes, reference = [], []
+    for _ in range(repeat):
+        reference.append(_reference_pass())
+        passes.append(_timed_pass(questions, schema))
+    digest = passes[0][2]
+
+    tracemalloc.start()
+    for q in questions[:500]:
+        text_to_sql(q, schema)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # median over passes: one pass disturbed by the scheduler moves it little
+    pct = lambda lat, p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1e6
+    med = lambda values: statistics.median(values)
+    return {
+        "qps": med([n / elapsed for elapsed, _, _ in passes]),
+        "p50_us": med([pct(lat, 0.50) for _, lat, _ in passes]),
+        "p95_us": med([pct(lat, 0.95) for _, lat, _ in passes]),
+        "p99_us": med([pct(lat, 0.99) for _, lat, _ in passes]),
+        "peak_kib": peak / 1024,
+        "reference_us": med(reference),
+        "output_sha1": digest,
+    }
+
+# metric -> (True when higher is better, allowed relative regression, scaled by machine speed)
+METRICS = {
+    "qps": (True, 0.25, True),
+    "p50_us": (False, 0.25, True),
+    "p95_us": (False, 0.50, True),
+    "p99_us": (False, 1.00, True),
+    "peak_kib": (False, 0.25, False),
+}
+# fewer questions give percentiles too coarse to gate on
+MIN_TIMED_QUESTIONS = 1000
+
+def machine():
+    """What timings depend on; baselines from another machine are only compared for output."""
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "system": platform.system(), "processor": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(current, baseline, threshold=None, timings=True):
+    """
+    Return a list of human-readable regressions. `threshold` overrides every
+    metric's tolerance; timings=False only compares the generated SQL. Times
+    are scaled by the reference workload's speed then and now.
+    """
+    problems = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slowdown = cur["reference_us"] / base["reference_us"] if base.get("reference_us") else 1.0
+        for metric, (higher_better, tolerance, scaled) in METRICS.items() if timings else ():
+            tolerance = tolerance if threshold is None else threshold
+            b, c = base[metric], cur[metric]
+            if b <= 0:
+                continue
+            if scaled:
+                c = c * slowdown if higher_better else c / slowdown
+            change = (c - b) / b
+            if (higher_better and change < -tolerance) or (not higher_better and change > tolerance):
+                problems.append(f"{name}: {metric} {b:.1f} -> {c:.1f} ({change:+.0%}, allowed {tolerance:.0%})")
+        if base.get("output_sha1") != cur["output_sha1"]:
+            problems.append(f"{name}: generated SQL changed")
+    return problems
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    p.add_argument("--save", action="store_true", help="write results as the new baseline")
+    p.add_argument("--threshold", type=float,
+                   help="allowed relative regression for every metric (default: per metric, see METRICS)")
+    p.add_argument("--allow-output-change", action="store_true")
+    p.add_argument("--questions", type=int, default=3000)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--repeat", type=int, default=5, help="timed passes per scenario; the median counts")
+    p.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    args = p.parse_args(argv)
+
+    set_translation_cache(None)
+    set_query_cache(None)
+    results = {}
+    rows = []
+    for name in args.scenario or SCENARIOS:
+        schema_kwargs, question_kwargs = SCENARIOS[name]
+        r = results[name] = run_scenario(schema_kwargs, question_kwargs, args.questions, args.seed, args.repeat)
+        rows.append((name, f"{r['qps']:,.0f}", f"{r['p50_us']:.1f}", f"{r['p95_us']:.1f}",
+                     f"{r['p99_us']:.1f}", f"{r['peak_kib']:.0f}", r["output_sha1"][:10]))
+    print_table(["scenario", "q/s", "p50 us", "p95 us", "p99 us", "peak KiB", "output"], rows)
+
+    status = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("questions") != args.questions or baseline.get("seed") != args.seed:
+            print("baseline was recorded with different --questions/--seed; not comparing")
+        else:
+            timings = baseline.get("machine") == machine() and args.questions >= MIN_TIMED_QUESTIONS
+            if not timings:
+                print(f"\nbaseline is from another machine or has fewer than {MIN_TIMED_QUESTIONS} questions:"
+                      " comparing generated SQL only")
+            problems = compare(results, baseline["scenarios"], args.threshold, timings)
+            if args.allow_output_change:
+                problems = [x for x in problems if not x.endswith("generated SQL changed")]
+            if problems:
+                print("\nREGRESSIONS:")
+                for x in problems:
+                    print("  " + x)
+                status = 1
+            else:
+                print("\nno regressions")
+    elif not args.save:
+        print(f"\nno baseline at {args.baseline}; run with --save to record one")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"questions": args.questions, "seed": args.seed, "machine": machine(),
+                       "scenarios": results}, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        status = 0
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Table/column detection cost as the schema grows.
+
+Compares SchemaIndex.scan with building one \\b...\\b regex per table and
+per column on every request.
+
+    python -m benchmarks.schema_index
+"""
+import re
+
+from benchmarks._util import per_call_us, print_table
+from schema import SchemaIndex
+
+QUERIES = [
+    "show name and phone_number of t17 with age > 30 and city = delhi",
+    "get c3_1 and c3_2 of t3 where c3_4 between 10 and 20",
+    "list manager_id of t250 and t1999 where salary >= 5000",
+]
+
+def synthetic_schema(n_tables, n_cols=20):
+    tables = {}
+    for t in range(n_tables):
+        cols = ["id", "name", "age", "city", "phone_number", "manager_id", "salary"]
+        cols += [f"c{t}_{c}" for c in range(n_cols - len(cols))]
+        tables[f"t{t}"] = cols
+    return tables
+
+def regex_detect(tables, text):
+    found = [t for t in tables if re.search(r"\b" + re.escape(t) + r"\b", text)]
+    return {t: [f for f in tables[t] if re.search(r"\b" + re.escape(f) + r"\b", text)] for t in found}
+
+def index_detect(index, text):
+    hits = index.scan(text)
+    return {t: hits.fields(t) for t in hits.tables()}
+
+def main():
+    rows = []
+    for n in (5, 50, 300, 1000, 3000):
+        tables = synthetic_schema(n)
+        index = SchemaIndex(tables)
+        for q in QUERIES:
+            assert regex_detect(tables, q) == index_detect(index, q), q
+        repeat = 3 if n <= 300 else 1
+        rows.append((n, n * 20,
+                     f"{per_call_us(lambda q: regex_detect(tables, q), QUERIES, repeat):.0f}",
+                     f"{per_call_us(lambda q: index_detect(index, q), QUERIES):.1f}"))
+    print_table(["tables", "columns", "per-name regex (us)", "SchemaIndex (us)"], rows)
+
+if __name__ == "__main__":
+    main()
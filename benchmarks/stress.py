@@ -0,0 +1,101 @@
+"""
+Worst-case latency on adversarial questions.
+
+Each case is built up to the input limit (TEXT_TO_SQL_MAX_CHARS, default 2000)
+and translated with caches off; the slowest of `--repeat` runs must stay under
+`--bound-ms`, and a case may only fail with a TranslationLimitError. The same
+inputs must also stay under the bound with every limit switched off (the
+matching itself is linear), and inputs ten times over the limit must be
+rejected just as fast. The legacy split_conditions / parse_single_condition
+helpers have no input limit, so they are checked on 100k characters.
+Exits 1 on a violation.
+
+    python -m benchmarks.stress [--bound-ms 50]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from benchmarks._util import print_table
+from texttosql import (Translator, TranslationLimitError, input_limits,
+                       parse_single_condition, split_conditions)
+
+def _fill(unit, n, prefix="show orders where "):
+    body = unit * (max(0, n - len(prefix)) // len(unit) + 1)
+    return (prefix + body)[:n]
+
+def _random_words(n, seed=3):
+    rng = random.Random(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < n:
+        words.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))))
+    return " ".join(words)[:n]
+
+def cases(n):
+    return {
+        "many and-fragments": _fill("amount > 1 and ", n),
+        "and without predicates": _fill("and ", n),
+        "nested parentheses": _fill("(", n // 2 - 5) + "amount > 1" + ")" * (n // 2 - 5),
+        "not not not": _fill("not ", n - 11) + " amount > 1",
+        "one long word": "orders " + "a" * (n - 7),
+        "unknown words (typo lookups)": "orders " + _random_words(n - 7),
+        "near-miss names": _fill("custmer emplyee prodcts ordr ", n, "show "),
+        "operator runs": _fill("> < = >= <= ", n),
+        "unclosed quotes": _fill("status = 'x ", n),
+        "between chains": _fill("amount between 1 and ", n),
+        "aggregate phrases": _fill("average amount per status sorted by ", n),
+        "phrase rules": _fill("greater than less than at least ", n),
+    }
+
+def _time(fn, arg, repeat):
+    worst, outcome = 0.0, "ok"
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            fn(arg)
+        except TranslationLimitError as e:
+            outcome = e.code
+        except Exception as e:  # anything else is a bug
+            outcome = f"CRASH {type(e).__name__}"
+        worst = max(worst, time.perf_counter() - start)
+    return worst * 1000, outcome
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--bound-ms", type=float, default=50.0, help="worst-case latency allowed per question")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+
+    max_chars = input_limits.max_chars or 2000
+    # time budget off: this measures the pipeline itself, not how quickly it gives up
+    translator = Translator(cache=None, query_cache=None,
+                            limits=input_limits._replace(time_budget_ms=None))
+    unlimited = Translator(cache=None, query_cache=None, limits=(None, None, None))
+    rows, failed = [], False
+    for label, fn, size in (("at limit", translator.translate, max_chars),
+                            ("at limit, no limits", unlimited.translate, max_chars),
+                            ("10x limit", translator.translate, max_chars * 10)):
+        for name, text in cases(size).items():
+            ms, outcome = _time(fn, text, args.repeat)
+            bad = ms > args.bound_ms or outcome.startswith("CRASH")
+            failed |= bad
+            rows.append((name, label, f"{len(text):,}", outcome, f"{ms:.2f}", "FAIL" if bad else ""))
+
+    legacy = {"split_conditions": split_conditions, "parse_single_condition": parse_single_condition}
+    for name, text in (("one long word", "a" * 100_000), ("many and-fragments", _fill("amount > 1 and ", 100_000))):
+        for fn_name, fn in legacy.items():
+            ms, outcome = _time(fn, text, 1)
+            bad = ms > args.bound_ms * 10 or outcome.startswith("CRASH")
+            failed |= bad
+            rows.append((name, fn_name, f"{len(text):,}", outcome, f"{ms:.2f}", "FAIL" if bad else ""))
+
+    print_table(["case", "run", "chars", "outcome", "worst ms", ""], rows)
+    if failed:
+        print(f"\nlatency bound of {args.bound_ms:g} ms violated")
+        sys.exit(1)
+    print(f"\nall cases within {args.bound_ms:g} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Cost of bare-value filters ("pending orders" -> status = 'pending'): the
+value lookup alone and a whole translation, with and without a ValueIndex of
+growing size, plus the index's memory estimate.
+
+    python -m benchmarks.values
+"""
+import random
+import string
+
+from benchmarks._util import per_call_us, print_table
+from texttosql import Translator
+from values import ValueIndex
+
+QUESTIONS = [
+    "customers in delhi",
+    "pending orders",
+    "orders of customers in new delhi with amount > 100",
+    "Show employees where salary > 50000 and age < 40",
+    "average salary per department",
+    "top 5 customers by age",
+]
+
+def column_values(n, seed=0):
+    """`n` random values spread over 40 columns of the demo schema, plus the demo values."""
+    rng = random.Random(seed)
+    cols = [("customers", "city"), ("orders", "status"), ("employees", "department"),
+            ("products", "category")]
+    cols += [(t, f"attr{i}") for i in range(36) for t in ("customers",)]
+    out = {c: [] for c in cols}
+    for _ in range(n):
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        out[rng.choice(cols)].append(word.title())
+    out[("customers", "city")] += ["Delhi", "New Delhi", "Mumbai"]
+    out[("orders", "status")] += ["pending", "shipped"]
+    return out
+
+def main():
+    plain = Translator(cache=None, query_cache=None, values=None)
+    base = per_call_us(plain.translate, QUESTIONS * 50)
+    rows = [("none", "-", "-", f"{base:.1f}", "-")]
+    for n in (100, 10_000, 100_000):
+        index = ValueIndex(column_values(n))
+        translator = Translator(cache=None, query_cache=None, values=index)
+        find = per_call_us(lambda q: list(index.find(q)), QUESTIONS * 50)
+        us = per_call_us(translator.translate, QUESTIONS * 50)
+        rows.append((f"{len(index):,}", f"{index.nbytes / 1024:,.0f}", f"{find:.1f}", f"{us:.1f}",
+                     f"{us - base:+.1f}"))
+    print_table(["values", "index KiB", "find (us)", "translate (us)", "vs. none (us)"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Seeded synthetic schemas and natural-language questions for benchmarks.
+
+    from benchmarks.workload import synthetic_schema, generate_questions
+    schema = synthetic_schema(n_tables=50, n_cols=12, seed=1)
+    questions = generate_questions(schema, 1000, max_conditions=4, seed=1)
+"""
+import random
+
+from schema import SchemaSnapshot
+
+_NOUNS = ["account", "invoice", "shipment", "ticket", "vendor", "region", "device",
+          "plan", "claim", "course", "booking", "asset", "payment", "review", "supplier"]
+_TEXT_COLS = ["name", "city", "status", "category", "department", "country", "type", "email"]
+_NUM_COLS = ["age", "amount", "price", "score", "quantity", "salary", "rating", "stock"]
+_DATE_COLS = ["created_date", "order_date", "due_date"]
+_WORDS = ["delhi", "pending", "sales", "toys", "active", "closed", "mumbai", "gold", "hr"]
+_OPERATORS = ["greater than", "more than", "above", "less than", "below", "at least",
+              "at most", "equals", ">", "<", ">=", "<=", "="]
+_VERBS = ["show", "list", "get", "find"]
+
+def synthetic_schema(n_tables=20, n_cols=10, fk_ratio=1.0, seed=0) -> SchemaSnapshot:
+    """
+    `n_tables` tables named <noun>s / <noun><i>s with an id, a mix of text,
+    numeric and date columns, and about `fk_ratio` foreign keys per table.
+    """
+    rng = random.Random(seed)
+    tables, fks = {}, {}
+    names = []
+    for i in range(n_tables):
+        noun = _NOUNS[i % len(_NOUNS)] + (str(i // len(_NOUNS)) if i >= len(_NOUNS) else "")
+        names.append(noun + "s")
+    for i, table in enumerate(names):
+        pool = _TEXT_COLS + _NUM_COLS + _DATE_COLS
+        cols = ["id"] + rng.sample(pool, min(len(pool), max(1, n_cols - 1)))
+        cols += [f"attr{c}" for c in range(len(cols), n_cols)]
+        tables[table] = cols
+    for i, table in enumerate(names[1:], start=1):
+        for _ in range(int(fk_ratio) + (rng.random() < fk_ratio % 1)):
+            target = names[rng.randrange(i)]
+            col = target[:-1] + "_id"
+            if col not in tables[table]:
+                tables[table].append(col)
+                fks[(table, col)] = (target, "id")
+    return SchemaSnapshot(tables, fks)
+
+def _condition(rng, cols, allow_between, allow_dates):
+    numeric = [c for c in cols if c in _NUM_COLS]
+    text = [c for c in cols if c in _TEXT_COLS]
+    dates = [c for c in cols if c in _DATE_COLS]
+    kinds = ["num"] * bool(numeric) + ["text"] * bool(text)
+    if allow_between and numeric:
+        kinds.append("between")
+    if allow_dates and dates:
+        kinds.append("date")
+    kind = rng.choice(kinds or ["implied"])
+    if kind == "num":
+        return f"{rng.choice(numeric)} {rng.choice(_OPERATORS)} {rng.randrange(1, 100000)}"
+    if kind == "text":
+        return f"{rng.choice(text)} {rng.choice(['equals', 'is', '='])} {rng.choice(_WORDS)}"
+    if kind == "between":
+        lo = rng.randrange(1, 1000)
+        return f"{rng.choice(numeric)} between {lo} and {lo + rng.randrange(1, 1000)}"
+    if kind == "date":
+        day = f"20{rng.randrange(18, 25)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+        return f"{rng.choice(['after', 'before', 'on'])} {day}"
+    return f"{rng.choice(cols)} {rng.randrange(100)}"
+
+def generate_questions(schema, n, max_conditions=3, connectors=("and", "or"),
+                       between=True, dates=True, multi_table=0.2, seed=0):
+    """Return `n` questions over `schema` (a SchemaSnapshot), deterministic for a seed."""
+    rng = random.Random(seed)
+    names = list(schema.tables)
+    out = []
+    for _ in range(n):
+        table = rng.choice(names)
+        cols = [c for c in schema.tables[table] if c != "id" and not c.endswith("_id")]
+        subject = table
+        if len(names) > 1 and rng.random() < multi_table:
+            other = rng.choice([t for t in names if t != table])
+            subject = f"{table} and {other}"
+        parts = [rng.choice(_VERBS)]
+        if cols and rng.random() < 0.5:
+            parts.append(" and ".join(rng.sample(cols, min(len(cols), rng.randint(1, 2)))) + " of")
+        elif rng.random() < 0.3:
+            parts.append("all")
+        parts.append(subject)
+        k = rng.randint(0, max_conditions)
+        if k and cols:
+            conds = [_condition(rng, cols, between, dates) for _ in range(k)]
+            clause = conds[0]
+            for c in conds[1:]:
+                clause += f" {rng.choice(connectors)} {c}"
+            parts.append(rng.choice(["where", "with"]) + " " + clause)
+        out.append(" ".join(parts))
+    return out
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --------------------------
+# Cache backends
+# --------------------------
+# A backend stores str -> str with bounded size (LRU) and optional TTL.
+# get() returns None on a miss; `evictions` counts entries dropped for size or age.
+
+class MemoryBackend:
+    """In-process LRU/TTL store. Thread-safe; private to one process."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteBackend:
+    """
+    LRU/TTL store in a SQLite file, shared by every process that opens the
+    same path (e.g. all gunicorn workers serving app.py). Uses WAL so
+    readers never block on the single writer. Recency is tracked with a
+    last-used timestamp; trimming to `maxsize` runs every `trim_every` writes.
+
+    Hits stay read-only: a hit only queues a new last-used time, and only when
+    the stored one is more than `touch_interval` seconds old. Queued times are
+    written in one transaction per `touch_batch` keys, or with the next set().
+    """
+
+    def __init__(self, path, maxsize=100_000, ttl=None, trim_every=256, touch_interval=60.0, touch_batch=64):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.trim_every = trim_every
+        self.touch_interval = touch_interval
+        self.touch_batch = touch_batch
+        self.evictions = 0
+        self._writes = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS translation_cache_used ON translation_cache (used_at)")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.touched = {}  # key -> last-used time not yet written
+        return conn
+
+    def _flush_touched(self, conn):
+        touched = self._local.touched
+        if not touched:
+            return
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("UPDATE translation_cache SET used_at = MAX(used_at, ?) WHERE key = ?",
+                             [(t, k) for k, t in touched.items()])
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        touched.clear()
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, stored_at, used_at FROM translation_cache WHERE key = ?",
+                           (key,)).fetchone()
+        if row is None:
+            return None
+        value, stored_at, used_at = row
+        now = time.time()
+        if self.ttl is not None and now - stored_at > self.ttl:
+            conn.execute("DELETE FROM translation_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            return None
+        if now - used_at > self.touch_interval:
+            touched = self._local.touched
+            touched[key] = now
+            if len(touched) >= self.touch_batch:
+                self._flush_touched(conn)
+        return value
+
+    def set(self, key, value):
+        conn = self._conn()
+        now = time.time()
+        self._flush_touched(conn)  # already writing: a good time to record recency
+        conn.execute(
+            "INSERT OR REPLACE INTO translation_cache (key, value, stored_at, used_at) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        self._writes += 1
+        if self._writes % self.trim_every == 0:
+            self._trim(conn, now)
+
+    def _trim(self, conn, now):
+        removed = 0
+        if self.ttl is not None:
+            removed += conn.execute("DELETE FROM translation_cache WHERE stored_at < ?", (now - self.ttl,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM translation_cache WHERE key IN ("
+            " SELECT key FROM translation_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        ).rowcount
+        self.evictions += removed
+
+    def clear(self):
+        self._conn().execute("DELETE FROM translation_cache")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+
+# --------------------------
+# Translation cache
+# --------------------------
+class TranslationCache:
+    """
+    Caches translations keyed on (schema version, normalized text), so a
+    schema change can never serve SQL compiled against the old schema.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(schema_version, normalized_text, variant=None):
+        key = f"{schema_version}\x1f{normalized_text}"
+        return key if variant is None else f"{key}\x1f{variant}"
+
+    def get_or_compute(self, schema_version, normalized_text, compute, variant=None):
+        """`variant` separates outputs of the same question, e.g. the SQL dialect."""
+        key = self.key(schema_version, normalized_text, variant)
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    def invalidate(self):
+        """Drop every entry, e.g. after deploying a new translator version."""
+        self.backend.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "size": len(self.backend),
+        }
@@ -0,0 +1,164 @@
+"""
+Sampled capture of incoming questions, for replay against a new translator
+(see replay.py).
+
+    TEXT_TO_SQL_CAPTURE=/var/log/text2sql/capture-{pid}.log   # enable
+    TEXT_TO_SQL_CAPTURE_SAMPLE=0.1                             # keep 10% (default)
+
+The log is one compact JSON object per line: {"t": unix time, "q": question,
+"src": where it came from}. record() only samples and appends to an
+in-memory queue; a background thread writes the queue out in batches, so a
+request never waits on disk. When the file passes `max_bytes` it is rotated
+to <path>.1.gz (gzip-compressed), <path>.2.gz, ... keeping `backups` files.
+Give every process its own file with "{pid}" in the path.
+
+The file and the writer thread are created by the first record() in each
+process, so a log created before a fork (gunicorn --preload) gets a writer,
+and its own "{pid}" file, in every worker.
+"""
+import atexit
+import collections
+import gzip
+import json
+import os
+import random
+import shutil
+import threading
+import time
+import weakref
+
+class CaptureLog:
+    """Append-only, sampled, rotating question log. Thread-safe; one writer thread per log and process."""
+
+    def __init__(self, path, sample_rate=0.1, max_bytes=64 << 20, backups=5,
+                 flush_interval=1.0, batch_size=512):
+        self.path_template = path
+        self.path = None  # set when this process starts writing
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._closed = False
+        self._reset()
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._reset())
+        atexit.register(self.close)
+
+    def _reset(self):
+        # a fresh process: nothing started, and nothing inherited from the parent's queue or lock
+        self.dropped = 0
+        self.written = 0
+        self._queue = collections.deque()  # append/popleft are atomic: no lock on record()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.path = self.path_template.format(pid=os.getpid())
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._thread = threading.Thread(target=self._run, name="capture-log", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """A CaptureLog when TEXT_TO_SQL_CAPTURE is set, else None."""
+        path = environ.get("TEXT_TO_SQL_CAPTURE")
+        if not path:
+            return None
+        return cls(path, sample_rate=float(environ.get("TEXT_TO_SQL_CAPTURE_SAMPLE", 0.1)),
+                   max_bytes=int(environ.get("TEXT_TO_SQL_CAPTURE_MB", 64)) << 20)
+
+    def record(self, question, source=""):
+        """Queue `question` for writing with probability `sample_rate`; returns whether it was kept."""
+        if self._closed or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            return False
+        if len(self._queue) >= self.batch_size * 64:
+            # the writer cannot keep up (slow disk): shed load rather than grow without bound
+            self.dropped += 1
+            return False
+        if self._pid != os.getpid():
+            self._start()
+        self._queue.append((time.time(), question, source))
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    # ---- writer thread ----
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write out everything queued so far (normally done by the writer thread)."""
+        queue = self._queue
+        if self._file is None:
+            return
+        while queue:
+            lines = []
+            while queue and len(lines) < self.batch_size:
+                t, q, src = queue.popleft()
+                lines.append(json.dumps({"t": round(t, 3), "q": q, "src": src},
+                                        ensure_ascii=False, separators=(",", ":")))
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(lines)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}.gz"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}.gz")
+        if self.backups > 0:
+            with open(self.path, "rb") as f, gzip.open(f"{self.path}.1.gz.tmp", "wb", compresslevel=6) as out:
+                shutil.copyfileobj(f, out)
+            os.replace(f"{self.path}.1.gz.tmp", f"{self.path}.1.gz")
+        self._file = open(self.path, "wb")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._pid != os.getpid():  # never written to from this process
+            return
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self._file.close()
+
+def log_files(path):
+    """Existing files of a capture log, oldest first: <path>.N.gz ... <path>.1.gz, <path>."""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}.gz"):
+        rotated.append(f"{path}.{i}.gz")
+        i += 1
+    files = rotated[::-1]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+def read_capture(path):
+    """Yield (timestamp, question, source) from a capture log and its rotated files, oldest first."""
+    for name in log_files(path):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:  # a line cut short by a crash
+                    continue
+                yield rec.get("t"), rec.get("q", ""), rec.get("src", "")
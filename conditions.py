@@ -0,0 +1,353 @@
+import re
+
+# --------------------------
+# Lexer
+# --------------------------
+# One findall pass over the (normalized) condition text. Every alternative is a
+# literal or a single character class, so matching never backtracks; other
+# punctuation (?, ;, ...) is simply not matched and therefore dropped.
+_TOKEN_RE = re.compile(r"""'[^']*'|"[^"]*"|>=|<=|!=|<>|[=<>(),]|[\w\-:@.]+""")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?")
+
+KEYWORDS = {"and", "or", "not", "between", "in", "after", "before", "on", "since", "until"}
+_PUNCT = {"(": "LPAREN", ")": "RPAREN", ",": "COMMA"}
+
+# date keyword -> operator applied to the default date column
+_DATE_OPS = {"AFTER": ">", "BEFORE": "<", "ON": "=", "SINCE": ">=", "UNTIL": "<="}
+
+# raw token -> (kind, text); questions reuse a small vocabulary, so most lookups hit
+_KIND_CACHE = {}
+_KIND_CACHE_MAX = 65536
+
+def _classify(tok):
+    c = tok[0]
+    if c in "'\"":
+        return ("STRING", tok)
+    if c in "<>=!":
+        return ("OP", tok)
+    if c in _PUNCT:
+        return (_PUNCT[c], tok)
+    word = tok.rstrip(".") or tok  # sentence-final period: "price > 500."
+    if _DATE_RE.fullmatch(word):
+        return ("DATE", word)
+    if _NUMBER_RE.fullmatch(word):
+        return ("NUMBER", word)
+    if word.lower() in KEYWORDS:
+        return (word.upper(), word)
+    return ("WORD", word)
+
+def tokenize(text: str):
+    """Return [(kind, text), ...]; keywords get their upper-cased word as kind."""
+    cache = _KIND_CACHE
+    tokens = []
+    for tok in _TOKEN_RE.findall(text):
+        kt = cache.get(tok)
+        if kt is None:
+            kt = _classify(tok)
+            if kt[0] != "STRING" and len(cache) < _KIND_CACHE_MAX:
+                cache[tok] = kt
+        tokens.append(kt)
+    return tokens
+
+# --------------------------
+# Condition tree
+# --------------------------
+class Pred:
+    """column <op> value(s); op is a comparison, BETWEEN, NOT BETWEEN, IN or NOT IN."""
+
+    __slots__ = ("column", "op", "values")
+
+    def __init__(self, column, op, values):
+        self.column = column
+        self.op = op
+        self.values = tuple(values)
+
+    def __repr__(self):
+        return f"Pred({self.column!r}, {self.op!r}, {self.values!r})"
+
+class Not:
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def __repr__(self):
+        return f"Not({self.item!r})"
+
+class BoolOp:
+    """AND / OR over two or more items."""
+
+    __slots__ = ("op", "items")
+
+    def __init__(self, op, items):
+        self.op = op
+        self.items = tuple(items)
+
+    def __repr__(self):
+        return f"BoolOp({self.op!r}, {list(self.items)!r})"
+
+def _join(op, items):
+    """One BoolOp over the non-empty items, flattening nested nodes of the same op."""
+    flat = []
+    for item in items:
+        if item is None:
+            continue
+        if isinstance(item, BoolOp) and item.op == op:
+            flat.extend(item.items)
+        else:
+            flat.append(item)
+    if not flat:
+        return None
+    return flat[0] if len(flat) == 1 else BoolOp(op, flat)
+
+# --------------------------
+# Parser
+# --------------------------
+_COMPARISONS = {"=", "!=", "<>", "<", ">", "<=", ">="}
+_VALUE_KINDS = {"STRING", "DATE", "NUMBER", "WORD"}
+_LITERAL_KINDS = {"STRING", "DATE", "NUMBER"}
+# tokens that show a segment was meant to be a condition (for failure counting)
+_CONDITION_HINTS = {"OP", "BETWEEN", "IN", "DATE"} | set(_DATE_OPS)
+# tokens that can start a date predicate on the default date column
+_DATE_START_KINDS = {"OP", "DATE"} | set(_DATE_OPS)
+# tokens a predicate never spans past
+_STOP_KINDS = {"AND", "OR", "NOT", "RPAREN", "LPAREN"}
+
+class ConditionParser:
+    """
+    Recursive-descent parser over the token stream, a few tokens of
+    lookahead and no backtracking:
+
+        or_expr   := and_expr (OR and_expr)*
+        and_expr  := unary ([AND] unary)*          -- adjacent conditions are ANDed
+        unary     := NOT unary | '(' or_expr ')' | predicate
+        predicate := col [NOT] BETWEEN value AND value
+                   | col [NOT] IN ['('] value (',' value)* [')']
+                   | col OP [OP] [NOT] value       -- "is greater than" -> "= >" -> ">"
+                   | col value <end>               -- implied equality: "age 25", "status pending"
+                   | [AFTER|BEFORE|ON|SINCE|UNTIL|OP] ['date'] DATE
+
+    `col` must be one of `columns` when any are given, so "orders placed in
+    2023" does not become a condition on a column "placed". An implied
+    equality with a bare word value must end its segment ("with city delhi",
+    not "name of customers"). Tokens that cannot start a predicate (verbs,
+    table names, filler words) are skipped as noise; `failures` counts
+    segments that looked like a condition but could not be parsed.
+    """
+
+    _PAD = 8  # sentinel slots so lookahead never needs a bounds check
+    # NOT / '(' nesting beyond this is flattened instead of recursing further
+    MAX_DEPTH = 32
+
+    def __init__(self, tokens, columns=(), tables=(), default_date_col=None):
+        self.kinds = [k for k, _ in tokens] + [None] * self._PAD
+        self.texts = [t for _, t in tokens] + [None] * self._PAD
+        self.end = len(tokens)
+        self.pos = 0
+        self.columns = columns if isinstance(columns, (set, frozenset)) else set(columns)
+        self.tables = tables  # anything supporting `in`, e.g. a schema's table mapping
+        self.default_date_col = default_date_col
+        self.failures = 0
+        self.skipped = 0
+        self.depth = 0
+
+    def parse(self):
+        items = [self._or_expr()]
+        # stray closing parens at the top level: keep going with what follows
+        while self.pos < self.end:
+            self.pos += 1
+            items.append(self._or_expr())
+        return _join("AND", items)
+
+    def _or_expr(self):
+        items = [self._and_expr()]
+        while self.kinds[self.pos] == "OR":
+            self.pos += 1
+            items.append(self._and_expr())
+        return _join("OR", items)
+
+    def _and_expr(self):
+        items = [self._unary()]
+        kinds = self.kinds
+        while True:
+            kind = kinds[self.pos]
+            if kind == "AND":
+                self.pos += 1
+            elif kind is None or kind == "OR" or kind == "RPAREN":
+                return _join("AND", items)
+            items.append(self._unary())
+
+    def _unary(self):
+        kind = self.kinds[self.pos]
+        if self.depth >= self.MAX_DEPTH and (kind == "NOT" or kind == "LPAREN"):
+            # "not not not ..." / "((((...": treat the extra nesting as noise
+            self.failures += 1
+            while kind == "NOT" or kind == "LPAREN":
+                self.pos += 1
+                self.skipped += 1
+                kind = self.kinds[self.pos]
+            return self._predicate()
+        if kind == "NOT":
+            self.pos += 1
+            self.depth += 1
+            inner = self._unary()
+            self.depth -= 1
+            return Not(inner) if inner is not None else None
+        if kind == "LPAREN":
+            self.pos += 1
+            self.depth += 1
+            inner = self._or_expr()
+            self.depth -= 1
+            if self.kinds[self.pos] == "RPAREN":
+                self.pos += 1
+            return inner
+        return self._predicate()
+
+    def _predicate(self):
+        kinds = self.kinds
+        hinted = False
+        while True:
+            kind = kinds[self.pos]
+            if kind is None or kind in _STOP_KINDS:
+                if hinted:
+                    self.failures += 1
+                return None
+            if kind == "WORD" or kind in _DATE_START_KINDS:
+                pred = self._try_predicate(kind)
+                if pred is not None:
+                    return pred
+                hinted = hinted or kind in _CONDITION_HINTS
+            else:
+                hinted = hinted or kind in _CONDITION_HINTS
+            self.pos += 1
+            self.skipped += 1
+
+    def _is_column(self, word, known_only=False):
+        if word in self.columns or ("." in word and word.rsplit(".", 1)[1] in self.columns):
+            return True
+        if known_only:
+            return False
+        return word not in self.tables and not word[0].isdigit()
+
+    def _try_predicate(self, kind):
+        kinds, texts, p = self.kinds, self.texts, self.pos
+
+        # date forms use the default date column: "after 2023-01-01", "> date 2023-01-01"
+        if kind != "WORD":
+            op = _DATE_OPS.get(kind) or (texts[p] if kind == "OP" else "=")
+            i = p if kind == "DATE" else p + 1
+            if kinds[i] == "WORD" and texts[i] == "date":
+                i += 1
+            if kinds[i] == "DATE" and self.default_date_col:
+                self.pos = i + 1
+                return Pred(self.default_date_col, op, (texts[i],))
+            return None
+
+        col = texts[p]
+        if not self._is_column(col, known_only=bool(self.columns)):
+            return None
+        j = p + 1
+        negate = kinds[j] == "NOT"
+        if negate:
+            j += 1
+        nxt = kinds[j]
+
+        if nxt == "BETWEEN":
+            if kinds[j + 1] in _VALUE_KINDS and kinds[j + 2] == "AND" and kinds[j + 3] in _VALUE_KINDS:
+                self.pos = j + 4
+                return Pred(col, "NOT BETWEEN" if negate else "BETWEEN", (texts[j + 1], texts[j + 3]))
+            return None
+
+        if nxt == "IN":
+            values = self._value_list(j + 1)
+            if values:
+                return Pred(col, "NOT IN" if negate else "IN", values)
+            return None
+
+        if negate:
+            return None
+
+        if nxt == "OP":
+            # collapse operator runs left by normalization: "= >" -> ">", "= not x" -> "!= x"
+            while kinds[j + 1] == "OP":
+                j += 1
+            op = texts[j]
+            if op == "=" and kinds[j + 1] == "NOT":
+                op = "!="
+                j += 1
+            elif op == "<>":
+                op = "!="
+            if kinds[j + 1] in _VALUE_KINDS and op in _COMPARISONS:
+                self.pos = j + 2
+                return Pred(col, op, (texts[j + 1],))
+            return None
+
+        if self._is_column(col, known_only=True) and (nxt in _LITERAL_KINDS or (
+                nxt == "WORD" and (kinds[j + 1] is None or kinds[j + 1] in _STOP_KINDS)
+                and not self._is_column(texts[j], known_only=True) and texts[j] not in self.tables)):
+            self.pos = j + 1
+            return Pred(col, "=", (texts[j],))
+        return None
+
+    def _value_list(self, i):
+        """Parse `[(] v (, v)* [)]` from token index `i`; consume it on success."""
+        kinds, texts = self.kinds, self.texts
+        paren = kinds[i] == "LPAREN"
+        if paren:
+            i += 1
+        values = []
+        while kinds[i] in _VALUE_KINDS:
+            values.append(texts[i])
+            i += 1
+            if kinds[i] != "COMMA":
+                break
+            i += 1
+        if paren:
+            if kinds[i] != "RPAREN":
+                return None
+            i += 1
+        if values:
+            self.pos = i
+        return values
+
+def parse_fragments(tokens, columns=(), tables=(), default_date_col=None, cache=None):
+    """
+    The same tree as ConditionParser(tokens, ...).parse(), built one top-level
+    AND/OR separated fragment at a time so fragments found in `cache` are not
+    parsed again (e.g. the unchanged part of a question being typed). `cache`
+    is a dict kept by the caller for one set of columns / date column.
+    Returns (tree or None, failures).
+
+    This holds because no predicate spans a top-level OR, or an AND other than
+    BETWEEN's; input with parentheses is parsed whole.
+    """
+    kinds = [k for k, _ in tokens]
+    if cache is None or "LPAREN" in kinds or "RPAREN" in kinds:
+        parser = ConditionParser(tokens, columns, tables, default_date_col)
+        return parser.parse(), parser.failures
+    groups, group, start, failures = [], [], 0, 0
+    for i in range(len(tokens) + 1):
+        kind = kinds[i] if i < len(tokens) else "OR"
+        if kind != "OR" and (kind != "AND" or (i >= 2 and kinds[i - 2] == "BETWEEN")):
+            continue
+        fragment = tuple(tokens[start:i])
+        hit = cache.get(fragment)
+        if hit is None:
+            parser = ConditionParser(fragment, columns, tables, default_date_col)
+            hit = cache[fragment] = (parser.parse(), parser.failures)
+        group.append(hit[0])
+        failures += hit[1]
+        start = i + 1
+        if kind == "OR":
+            groups.append(_join("AND", group))
+            group = []
+    return _join("OR", groups), failures
+
+def parse_conditions(text, columns=(), tables=(), default_date_col=None):
+    """
+    Tokenize and parse condition text in one pass.
+    Returns (tree or None, parser) so callers can read failure/skip counts.
+    """
+    parser = ConditionParser(tokenize(text), columns, tables, default_date_col)
+    return parser.parse(), parser
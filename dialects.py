@@ -0,0 +1,193 @@
+import hashlib
+import re
+from collections import namedtuple
+
+from conditions import Pred, Not
+
+# --------------------------
+# SQL dialects
+# --------------------------
+# Each dialect renders the same query.Query IR. The differences that matter
+# for the SQL we generate are identifier quoting and string literal escaping.
+
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?")
+
+# words that must be quoted when used as identifiers (common to all three dialects)
+_RESERVED = {
+    "all", "and", "as", "asc", "between", "by", "case", "check", "column", "create",
+    "default", "delete", "desc", "distinct", "drop", "else", "end", "exists", "from",
+    "group", "having", "in", "index", "insert", "into", "is", "join", "key", "like",
+    "limit", "not", "null", "on", "or", "order", "primary", "references", "select",
+    "set", "table", "then", "to", "union", "unique", "update", "user", "values",
+    "when", "where",
+}
+
+# A SQL template with bound parameters; fingerprint identifies the query shape,
+# so every question differing only in values shares one prepared statement.
+ParameterizedSQL = namedtuple("ParameterizedSQL", "sql params fingerprint")
+
+class _Binder:
+    """Collects bound values while a query renders; style is "qmark" (?) or "named" (:p1)."""
+
+    __slots__ = ("named", "params")
+
+    def __init__(self, style):
+        if style not in ("qmark", "named"):
+            raise ValueError(f"unknown paramstyle {style!r}; expected 'qmark' or 'named'")
+        self.named = style == "named"
+        self.params = {} if self.named else []
+
+    def __call__(self, value):
+        if self.named:
+            name = f"p{len(self.params) + 1}"
+            self.params[name] = value
+            return ":" + name
+        self.params.append(value)
+        return "?"
+
+class Dialect:
+    name = "sqlite"
+    ident_quote = '"'
+    # identifiers matching this are left bare
+    plain_ident = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+    reserved = _RESERVED
+
+    def __init__(self):
+        self._idents = {}  # schema names repeat constantly; quote each one once
+
+    def ident(self, name):
+        out = self._idents.get(name)
+        if out is None:
+            if self.plain_ident.fullmatch(name) and name.lower() not in self.reserved:
+                out = name
+            else:
+                q = self.ident_quote
+                out = q + name.replace(q, q + q) + q
+            if len(self._idents) < 65536:
+                self._idents[name] = out
+        return out
+
+    def column(self, name):
+        """Identifier that may be qualified as table.column."""
+        if "." not in name:
+            return name if name == "*" else self.ident(name)
+        return ".".join(self.ident(part) for part in name.split("."))
+
+    def string(self, value):
+        return "'" + value.replace("'", "''") + "'"
+
+    def literal(self, token):
+        """Render a value token: numbers stay bare, everything else becomes a string literal."""
+        token = token.strip()
+        if len(token) >= 2 and token[0] in "'\"" and token[-1] == token[0]:
+            return self.string(token[1:-1])
+        if _NUMBER_RE.fullmatch(token):
+            return token
+        return self.string(token)
+
+    def value(self, token):
+        """The Python value a token binds to: the same reading as literal(), unquoted."""
+        token = token.strip()
+        if len(token) >= 2 and token[0] in "'\"" and token[-1] == token[0]:
+            return token[1:-1]
+        if _NUMBER_RE.fullmatch(token):
+            return float(token) if "." in token else int(token)
+        return token
+
+    def condition(self, node, parent=None, bind=None):
+        """
+        SQL text for a condition tree; parenthesizes only where precedence needs it.
+        With `bind` (a _Binder), values become placeholders instead of literals.
+        """
+        if isinstance(node, Pred):
+            col = self.column(node.column)
+            if bind is None:
+                vals = [self.literal(v) for v in node.values]
+            else:
+                vals = [bind(self.value(v)) for v in node.values]
+            if node.op.endswith("BETWEEN"):
+                return f"{col} {node.op} {vals[0]} AND {vals[1]}"
+            if node.op.endswith("IN"):
+                return f"{col} {node.op} ({', '.join(vals)})"
+            return f"{col} {node.op} {vals[0]}"
+        if isinstance(node, Not):
+            return f"NOT ({self.condition(node.item, None, bind)})"
+        sql = f" {node.op} ".join(self.condition(i, node.op, bind) for i in node.items)
+        # AND binds tighter than OR, so only an OR inside an AND needs parentheses
+        return f"({sql})" if parent == "AND" and node.op == "OR" else sql
+
+    def select_item(self, col):
+        if col.table is None:
+            sql = self.column(col.name)
+        else:
+            sql = f"{self.ident(col.table)}.{self.column(col.name)}"
+        return f"{col.func}({sql})" if col.func else sql
+
+    def from_clause(self, query):
+        sql = self.ident(query.from_table)
+        for j in query.joins:
+            if j.edge is None:
+                sql += f", {self.ident(j.table)}"
+            else:
+                f_table, f_col, t_table, t_col = j.edge
+                sql += (f" JOIN {self.ident(j.table)} ON {self.ident(f_table)}.{self.ident(f_col)}"
+                        f" = {self.ident(t_table)}.{self.ident(t_col)}")
+        return sql
+
+    def render(self, query, default_limit=None, bind=None):
+        """SQL for `query`; `default_limit` caps non-aggregate queries without an explicit limit."""
+        select = ", ".join(self.select_item(c) for c in query.select)
+        sql = f"SELECT {select} FROM {self.from_clause(query)}"
+        if query.where is not None:
+            sql += f" WHERE {self.condition(query.where, None, bind)}"
+        if query.group_by:
+            sql += " GROUP BY " + ", ".join(self.select_item(c) for c in query.group_by)
+        order_by = query.order_by
+        if query.is_aggregate():
+            # on an aggregate, a key that is neither grouped nor aggregated is invalid SQL
+            order_by = [(c, desc) for c, desc in order_by if c.func or c in query.group_by]
+        if order_by:
+            sql += " ORDER BY " + ", ".join(
+                self.select_item(c) + (" DESC" if desc else "") for c, desc in order_by)
+        limit = query.limit
+        if limit is None and default_limit and not query.is_aggregate():
+            limit = default_limit
+        if limit is not None:
+            sql += f" LIMIT {int(limit) if bind is None else bind(int(limit))}"
+        return sql + ";"
+
+    def parameterize(self, query, style="qmark", default_limit=None):
+        """
+        ParameterizedSQL for `query`: the SQL with every value (and the LIMIT)
+        as a placeholder, the values to bind (a list for "qmark", a dict for
+        "named") and a fingerprint of the template.
+        """
+        bind = _Binder(style)
+        sql = self.render(query, default_limit, bind)
+        fingerprint = hashlib.sha1(f"{self.name}:{sql}".encode()).hexdigest()[:16]
+        return ParameterizedSQL(sql, bind.params, fingerprint)
+
+class SQLiteDialect(Dialect):
+    name = "sqlite"
+
+class PostgresDialect(Dialect):
+    name = "postgres"
+    # unquoted identifiers fold to lower case, so anything with capitals needs quotes
+    plain_ident = re.compile(r"[a-z_][a-z0-9_]*")
+
+class MySQLDialect(Dialect):
+    name = "mysql"
+    ident_quote = "`"
+
+    def string(self, value):
+        # backslash is an escape character in MySQL string literals by default
+        return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+DIALECTS = {d.name: d for d in (SQLiteDialect(), PostgresDialect(), MySQLDialect())}
+DIALECTS["postgresql"] = DIALECTS["postgres"]
+
+def get_dialect(name="sqlite"):
+    try:
+        return DIALECTS[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown SQL dialect {name!r}; expected one of {sorted(DIALECTS)}") from None
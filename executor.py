@@ -0,0 +1,176 @@
+"""
+Optional execution of generated SQL against a local SQLite database.
+
+Connections are pooled, opened read-only (and guarded by an authorizer that
+only allows reads), and every fetch runs under a time budget. Results are
+never loaded whole: page() returns one page via LIMIT/OFFSET, stream()
+yields pages from fetchmany().
+
+    ex = QueryExecutor("shop.db", timeout=5.0)
+    page = ex.page(text_to_sql("show all orders"), page=0, page_size=50)
+    for rows in ex.stream(sql, page_size=1000): ...
+"""
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+class ExecutionError(Exception):
+    """The SQL could not be executed."""
+
+class ReadOnlyError(ExecutionError):
+    """The statement would modify the database."""
+
+class QueryTimeout(ExecutionError):
+    """The statement exceeded its time budget."""
+
+Page = namedtuple("Page", "columns rows page page_size has_more elapsed_ms")
+
+# authorizer actions a read-only query needs; everything else is denied
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION}
+_ALLOWED_ACTIONS.add(getattr(sqlite3, "SQLITE_RECURSIVE", 33))
+
+def _authorize(action, *args):
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+# --------------------------
+# Connection pool
+# --------------------------
+class _PooledConnection:
+    """A read-only connection plus the deadline its progress handler enforces."""
+
+    __slots__ = ("conn", "deadline")
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.execute("PRAGMA query_only = ON")
+        self.conn.set_authorizer(_authorize)
+        self.deadline = None
+        # called every 1000 VM instructions; a truthy return interrupts the statement
+        self.conn.set_progress_handler(self._expired, 1000)
+
+    def _expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+class ConnectionPool:
+    """Up to `size` connections to one database file, opened on first use."""
+
+    def __init__(self, path, size=4, acquire_timeout=10.0):
+        self.path = path
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        pc = self._acquire()
+        try:
+            yield pc
+        finally:
+            pc.deadline = None
+            self._idle.put(pc)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return _PooledConnection(self.path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise ExecutionError("no database connection available") from None
+
+# --------------------------
+# Executor
+# --------------------------
+class QueryExecutor:
+    """
+    Runs SELECT statements with a per-statement `timeout` (seconds). For
+    stream(), the budget applies to each fetch so slow consumers are not
+    penalized.
+    """
+
+    def __init__(self, path, pool_size=4, timeout=5.0, page_size=100):
+        self.pool = ConnectionPool(path, pool_size)
+        self.timeout = timeout
+        self.page_size = page_size
+
+    @staticmethod
+    def _statement(sql):
+        stmt = sql.strip().rstrip(";").strip()
+        if not stmt.split(None, 1) or stmt.split(None, 1)[0].upper() not in ("SELECT", "WITH"):
+            raise ReadOnlyError("only SELECT statements can be executed")
+        return stmt
+
+    def _run(self, pc, fn):
+        pc.deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            return fn()
+        except sqlite3.DatabaseError as e:
+            msg = str(e)
+            if "interrupted" in msg:
+                raise QueryTimeout(f"query exceeded {self.timeout:g}s") from None
+            if "not authorized" in msg or "readonly" in msg:
+                raise ReadOnlyError("statement is not allowed in read-only mode") from None
+            raise ExecutionError(msg) from None
+        finally:
+            pc.deadline = None
+
+    @staticmethod
+    def _paged(sql, params, limit, offset):
+        """The paging wrapper plus its parameters, in the style `params` uses."""
+        if isinstance(params, dict):
+            return (f"SELECT * FROM ({sql}) LIMIT :_limit OFFSET :_offset",
+                    dict(params, _limit=limit, _offset=offset))
+        return f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?", (*params, limit, offset)
+
+    def page(self, sql, page=0, page_size=None, params=()):
+        """
+        One page of results; reads at most page_size + 1 rows from SQLite.
+        `params` binds the placeholders of a parameterized statement (list or dict).
+        """
+        page_size = page_size or self.page_size
+        stmt, args = self._paged(self._statement(sql), params, page_size + 1, page * page_size)
+        start = time.perf_counter()
+        with self.pool.connection() as pc:
+            def fetch():
+                cur = pc.conn.execute(stmt, args)
+                try:
+                    return [d[0] for d in cur.description], cur.fetchall()
+                finally:
+                    cur.close()
+            columns, rows = self._run(pc, fetch)
+        return Page(columns, rows[:page_size], page, page_size, len(rows) > page_size,
+                    (time.perf_counter() - start) * 1000)
+
+    def stream(self, sql, page_size=None, params=()):
+        """
+        Yield (columns, rows) pages of up to `page_size` rows until the result
+        is exhausted. The connection is held until the generator finishes or
+        is closed.
+        """
+        page_size = page_size or self.page_size
+        stmt = self._statement(sql)
+        with self.pool.connection() as pc:
+            cur = self._run(pc, lambda: pc.conn.execute(stmt, params))
+            try:
+                columns = [d[0] for d in cur.description]
+                while True:
+                    rows = self._run(pc, lambda: cur.fetchmany(page_size))
+                    if not rows:
+                        return
+                    yield columns, rows
+            finally:
+                cur.close()
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+
+# --------------------------
+# Query history store
+# --------------------------
+class HistoryStore:
+    """
+    Bounded query history persisted in a SQLite file, kept per session.
+
+    Every method takes a `session` id (e.g. one per browser session) and
+    only sees that session's entries. Each session keeps at most `capacity`
+    entries and the file at most `max_total` (oldest are dropped on insert).
+    Entries are served newest-first in pages, with an FTS5 full-text index
+    over the query text for search (falling back to LIKE when SQLite lacks
+    FTS5).
+    """
+
+    def __init__(self, path="history.db", capacity=1000, max_total=100_000):
+        self.path = path
+        self.capacity = capacity
+        self.max_total = max_total
+        self._lock = threading.Lock()
+        # Streamlit reruns scripts on different threads; access is serialized by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " query TEXT NOT NULL, sql TEXT NOT NULL, created_at REAL NOT NULL,"
+            " session TEXT NOT NULL DEFAULT '')"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(history)")}
+        if "session" not in columns:  # a file from before sessions: its rows belong to no session
+            self._conn.execute("ALTER TABLE history ADD COLUMN session TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_session ON history (session, id)")
+        self.fts = self._create_fts()
+
+    def _create_fts(self):
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                " query, content='history', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+                INSERT INTO history_fts (rowid, query) VALUES (new.id, new.query);
+            END;
+            CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+                INSERT INTO history_fts (history_fts, rowid, query) VALUES ('delete', old.id, old.query);
+            END;
+        """)
+        return True
+
+    def add(self, session, query, sql):
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO history (query, sql, created_at, session) VALUES (?, ?, ?, ?)",
+                (query, sql, time.time(), session),
+            )
+            new_id = cur.lastrowid
+            self._conn.execute(
+                "DELETE FROM history WHERE session = ? AND id < ("
+                " SELECT id FROM history WHERE session = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (session, session, self.capacity - 1),
+            )
+            self._conn.execute("DELETE FROM history WHERE id <= ?", (new_id - self.max_total,))
+            return new_id
+
+    def count(self, session):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history WHERE session = ?", (session,)).fetchone()[0]
+
+    def page(self, session, page=0, page_size=20):
+        """Entries newest first: [{"id", "query", "sql"}, ...]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, query, sql FROM history WHERE session = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                (session, page_size, page * page_size),
+            ).fetchall()
+        return [{"id": i, "query": q, "sql": s} for i, q, s in rows]
+
+    def search(self, session, term, limit=20):
+        """Entries whose query matches every word of `term`, newest first."""
+        words = term.split()
+        if not words:
+            return []
+        with self._lock:
+            if self.fts:
+                # quote each word so user input is never parsed as FTS syntax; '*' allows prefixes
+                match = " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+                rows = self._conn.execute(
+                    "SELECT h.id, h.query, h.sql FROM history_fts f JOIN history h ON h.id = f.rowid"
+                    " WHERE history_fts MATCH ? AND h.session = ? ORDER BY h.id DESC LIMIT ?",
+                    (match, session, limit),
+                ).fetchall()
+            else:
+                clause = " AND ".join("query LIKE ?" for _ in words)
+                rows = self._conn.execute(
+                    f"SELECT id, query, sql FROM history WHERE session = ? AND {clause}"
+                    " ORDER BY id DESC LIMIT ?",
+                    (session, *(f"%{w}%" for w in words), limit),
+                ).fetchall()
+        return [{"id": i, "query": q, "sql": s} for i, q, s in rows]
+
+    def clear(self, session):
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE session = ?", (session,))
@@ -0,0 +1,69 @@
+"""
+As-you-type translation for live previews (see streamlit_app.py).
+
+    preview = LivePreview(schema_provider)
+    p = preview.update("orders where amount > 10")   # on every (debounced) keystroke
+    p.sql, p.us, p.reused
+
+Each update reuses what earlier keystrokes of the session computed. An edit
+that leaves the normalized question unchanged (case, a trailing space) returns the
+previous SQL. A question seen earlier in the session (after backspacing)
+comes from a small per-session history. Anything else is translated with
+Translator.translate_incremental, which only re-parses the condition
+fragments that changed. Partial questions never reach the shared caches.
+"""
+import time
+from collections import OrderedDict, namedtuple
+
+from texttosql import Translator, TranslationLimitError
+
+# us: time spent on this update; reused: "unchanged", "history" or None
+Preview = namedtuple("Preview", "sql error us reused")
+
+class LivePreview:
+    """Incremental translator for one editing session (one browser tab); not thread-safe."""
+
+    def __init__(self, schema=None, history=256, max_fragments=4096, **translator_options):
+        # partial questions would only crowd real ones out of the shared caches
+        self.translator = Translator(schema, cache=None, query_cache=None, **translator_options)
+        self.history = history
+        self.max_fragments = max_fragments
+        self.updates = 0
+        self.reused = 0
+        self._history = OrderedDict()  # normalized question -> sql
+        self._fragments = {}  # tables -> (columns, date column, {fragment tokens: (tree, failures)})
+        self._last = None  # (normalized question, Preview)
+
+    def update(self, text):
+        """Preview(sql, error, us, reused) for the current text of the editor."""
+        start = time.perf_counter()
+        self.updates += 1
+        translator = self.translator
+        norm = translator.normalize(text)
+        if self._last is not None and self._last[0] == norm:
+            self.reused += 1
+            return self._last[1]._replace(us=(time.perf_counter() - start) * 1e6, reused="unchanged")
+        sql = self._history.get(norm)
+        reused = None
+        if sql is not None:
+            self._history.move_to_end(norm)
+            reused = "history"
+            self.reused += 1
+        else:
+            try:
+                sql = translator.translate_incremental(text, self._fragments)
+            except TranslationLimitError as e:
+                preview = Preview(None, str(e), (time.perf_counter() - start) * 1e6, None)
+                self._last = (norm, preview)
+                return preview
+            self._remember(norm, sql)
+        preview = Preview(sql, None, (time.perf_counter() - start) * 1e6, reused)
+        self._last = (norm, preview)
+        return preview
+
+    def _remember(self, norm, sql):
+        self._history[norm] = sql
+        if len(self._history) > self.history:
+            self._history.popitem(last=False)
+        if sum(len(ctx[2]) for ctx in self._fragments.values()) > self.max_fragments:
+            self._fragments.clear()
@@ -0,0 +1,240 @@
+"""
+Low-overhead counters and latency histograms for the translator.
+
+Disable collection with TEXT_TO_SQL_METRICS=0 or metrics.enable(False);
+instrumented code then only pays for a no-op call per stage.
+Read values with registry.snapshot() or registry.render_prometheus().
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds: 1us .. ~1s, roughly x2.5 apart
+DEFAULT_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+class _PerThread:
+    """
+    One shard per thread, written without a lock; readers merge them. The
+    shards of threads that have exited are folded into one when a new thread
+    registers or a reader merges, so thread-per-request servers do not grow it.
+    """
+
+    def __init__(self, new, fold):
+        self._new = new  # () -> empty shard
+        self._fold = fold  # (into, shard): add shard to into
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = []  # (thread, shard)
+        self._retired = new()
+
+    def get(self):
+        """This thread's shard."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._new()
+            with self._lock:
+                self._collect()
+                self._live.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _collect(self):
+        live = []
+        for thread, shard in self._live:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._fold(self._retired, shard)
+        self._live = live
+
+    def merged(self):
+        out = self._new()
+        with self._lock:
+            self._collect()
+            self._fold(out, self._retired)
+            for _, shard in self._live:
+                self._fold(out, shard)
+        return out
+
+def _add_cell(into, cell):
+    into[0] += cell[0]
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._cells = _PerThread(lambda: [0], _add_cell)
+
+    def inc(self, n=1):
+        self._cells.get()[0] += n
+
+    @property
+    def value(self):
+        return self._cells.merged()[0]
+
+    def reset(self):
+        self._cells = _PerThread(lambda: [0], _add_cell)
+
+class Histogram:
+    """
+    Fixed-bucket histogram, one series per label value (e.g. per stage).
+    Each thread records into its own series, so observe() takes no lock.
+    """
+
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        # per thread: label value -> [bucket counts..., +Inf count, sum]
+        self._series = _PerThread(dict, self._add_series)
+
+    def _add_series(self, into, shard):
+        for label_value, series in list(shard.items()):
+            total = into.get(label_value)
+            if total is None:
+                into[label_value] = list(series)
+            else:
+                into[label_value] = [a + b for a, b in zip(total, series)]
+
+    def _new_series(self, shard, label_value):
+        series = shard[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+        return series
+
+    def observe(self, label_value, seconds):
+        shard = self._series.get()
+        series = shard.get(label_value) or self._new_series(shard, label_value)
+        series[bisect_left(self.buckets, seconds)] += 1
+        series[-1] += seconds
+
+    def series(self):
+        return self._series.merged()
+
+class Registry:
+    def __init__(self):
+        self.enabled = os.environ.get("TEXT_TO_SQL_METRICS", "1") != "0"
+        self.stage_seconds = Histogram(
+            "texttosql_stage_seconds", "Time spent in each translation stage.", "stage")
+        self.counters = {}
+
+    def counter(self, name, help_text):
+        c = self.counters.get(name)
+        if c is None:
+            c = self.counters[name] = Counter(name, help_text)
+        return c
+
+    def inc(self, name, n=1):
+        """Increment a registered counter if collection is enabled."""
+        if self.enabled:
+            self.counters[name].inc(n)
+
+    def timer(self):
+        """Per-request stage timer; a shared no-op when collection is disabled."""
+        return StageTimer(self.stage_seconds) if self.enabled else _NULL_TIMER
+
+    def reset(self):
+        for c in self.counters.values():
+            c.reset()
+        self.stage_seconds = Histogram(
+            self.stage_seconds.name, self.stage_seconds.help, self.stage_seconds.label,
+            self.stage_seconds.buckets)
+
+    def snapshot(self):
+        """{"counters": {name: value}, "stages": {stage: {"count", "sum", "p50", "p99"}}}"""
+        stages = {}
+        buckets = self.stage_seconds.buckets
+        for stage, series in self.stage_seconds.series().items():
+            counts, total = series[:-1], series[-1]
+            n = sum(counts)
+            stages[stage] = {
+                "count": n,
+                "sum": total,
+                "p50": _bucket_quantile(buckets, counts, n, 0.50),
+                "p99": _bucket_quantile(buckets, counts, n, 0.99),
+            }
+        return {"counters": {c.name: c.value for c in self.counters.values()}, "stages": stages}
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for c in self.counters.values():
+            lines.append(f"# HELP {c.name} {c.help}")
+            lines.append(f"# TYPE {c.name} counter")
+            lines.append(f"{c.name} {c.value}")
+        h = self.stage_seconds
+        lines.append(f"# HELP {h.name} {h.help}")
+        lines.append(f"# TYPE {h.name} histogram")
+        for value, series in sorted(h.series().items()):
+            label = f'{h.label}="{value}"'
+            cumulative = 0
+            for le, count in zip(h.buckets, series):
+                cumulative += count
+                lines.append(f'{h.name}_bucket{{{label},le="{le:g}"}} {cumulative}')
+            cumulative += series[len(h.buckets)]
+            lines.append(f'{h.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f"{h.name}_sum{{{label}}} {series[-1]:.9f}")
+            lines.append(f"{h.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+def _bucket_quantile(buckets, counts, n, q):
+    """Upper bound of the bucket holding the q-quantile (inf if in the overflow bucket)."""
+    if n == 0:
+        return 0.0
+    rank = q * n
+    seen = 0
+    for le, count in zip(buckets, counts):
+        seen += count
+        if seen >= rank:
+            return le
+    return float("inf")
+
+_clock = time.perf_counter
+
+class StageTimer:
+    """
+    Call mark(stage) at the end of each stage to record the time since the
+    previous mark, and finish() once to record the whole request as "total".
+    """
+
+    __slots__ = ("_hist", "_buckets", "_series", "_start", "_last")
+
+    def __init__(self, hist):
+        self._hist = hist
+        self._buckets = hist.buckets
+        self._series = hist._series.get()  # this thread's series: marks take no lock
+        self._start = self._last = _clock()
+
+    def mark(self, stage):
+        now = _clock()
+        seconds = now - self._last
+        self._last = now
+        series = self._series.get(stage)
+        if series is None:
+            series = self._hist._new_series(self._series, stage)
+        series[bisect_left(self._buckets, seconds)] += 1
+        series[-1] += seconds
+
+    def finish(self):
+        self._last = self._start
+        self.mark("total")
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def finish(self):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+registry = Registry()
+
+def enable(flag=True):
+    registry.enabled = flag
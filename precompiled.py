@@ -0,0 +1,140 @@
+"""
+Precompiled translator state on disk, for fast worker start-up.
+
+A precompiled file holds everything text_to_sql derives from a schema: the
+name index (including the typo index) and the foreign-key join graph with its
+memoized plans, plus a digest of the phrase rules in effect when it was built. For a
+schema provider it also holds the introspected catalog, so a new worker
+checks one cheap fingerprint instead of re-reading every table.
+
+    python precompiled.py engine.bin [--db shop.db]      # build
+    schema = precompiled.load("engine.bin", provider)     # at start-up
+
+The file is read through mmap and checked against a small header first; when
+it is missing, from another format or Python version, or built for a
+different schema or different phrase rules, load() falls back to building
+the state (and rewrites the file unless rebuild=False). The file never adds
+phrase rules: install deployment rules (add_phrase_rules) before load().
+
+Loading unpickles into the process heap, so the mapped file pages are not
+shared. Under gunicorn --preload the master loads it once and workers inherit
+the objects by fork; that saves each worker the load, not memory, as
+reference counting soon copies the pages a worker touches.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+
+import texttosql
+from schema import SQLiteSchemaProvider
+
+MAGIC = b"T2SQLPC\0"
+# bump whenever SchemaIndex / ForeignKeyGraph internals change
+FORMAT_VERSION = 2
+
+_HEADER_LEN = struct.Struct("<I")
+
+def _rules_digest(rules):
+    return hashlib.sha1(repr(sorted(rules.items())).encode()).hexdigest()[:16]
+
+def _is_provider(schema):
+    return hasattr(schema, "fingerprint") and hasattr(schema, "restore_state")
+
+def save(path, schema=None):
+    """Build the full translator state for `schema` and write it to `path` atomically."""
+    provider = schema if _is_provider(schema) else None
+    snap = texttosql.resolve_schema(schema)
+    snap.index.fuzzy()
+    rules = texttosql._phrase_rewriter.rules
+    state = provider.export_state() if provider is not None else None
+    payload = pickle.dumps((snap.index, snap.fk_graph, state), protocol=pickle.HIGHEST_PROTOCOL)
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "python": list(sys.version_info[:2]),
+        "schema_version": snap.version,
+        "catalog": list(provider.fingerprint()) if provider is not None else None,
+        "rules": _rules_digest(rules),
+        "tables": len(snap.tables),
+    }).encode()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp, path)
+    return snap
+
+def read_header(path):
+    """The header dict of a precompiled file, or None if it is missing or not one."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (n,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            return json.loads(f.read(n))
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _usable(header):
+    # a file built under other phrase rules is stale: rules are never restored from it
+    return (header is not None
+            and header.get("format") == FORMAT_VERSION
+            and tuple(header.get("python", ())) == tuple(sys.version_info[:2])
+            and header.get("rules") == _rules_digest(texttosql._phrase_rewriter.rules))
+
+def _read_payload(path):
+    # mmap saves a read() buffer; pickle.loads still builds private objects
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offset = len(MAGIC) + _HEADER_LEN.size + _HEADER_LEN.unpack_from(mm, len(MAGIC))[0]
+        with memoryview(mm)[offset:] as view:
+            return pickle.loads(view)
+
+def load(path, schema=None, rebuild=True):
+    """
+    Return the SchemaSnapshot for `schema` (None for the built-in schema, a
+    SchemaSnapshot or a provider) with its index and join graph loaded from
+    `path`. Stale or unreadable files fall back to a rebuild.
+    """
+    header = read_header(path)
+    if _usable(header):
+        provider = schema if _is_provider(schema) else None
+        if provider is not None and header.get("catalog") is not None:
+            # unchanged catalog: skip introspection entirely
+            fresh = list(provider.fingerprint()) == header["catalog"]
+            snap = None
+        else:
+            snap = texttosql.resolve_schema(schema)
+            fresh = snap.version == header.get("schema_version")
+        if fresh:
+            try:
+                index, fk_graph, state = _read_payload(path)
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                pass
+            else:
+                if snap is None:
+                    snap = provider.restore_state(state)
+                snap.adopt(index, fk_graph)
+                return snap
+    if rebuild:
+        return save(path, schema)
+    return texttosql.resolve_schema(schema)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Precompile translator state for fast start-up.")
+    p.add_argument("output", help="file to write, e.g. engine.bin")
+    p.add_argument("--db", help="SQLite database to introspect instead of the built-in schema")
+    args = p.parse_args(argv)
+    start = time.perf_counter()
+    schema = save(args.output, SQLiteSchemaProvider(args.db) if args.db else None)
+    print(f"wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB, "
+          f"{len(schema.tables)} tables, schema {schema.version}) in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# --------------------------
+# Query IR
+# --------------------------
+# A parsed question, independent of SQL dialect. Nodes use __slots__ so a
+# cached IR stays small; render with dialects.get_dialect(name).render(query).
+# Conditions reuse the conditions.Pred / Not / BoolOp nodes.
+
+class Column:
+    """
+    A selected column; table is set when the name must be qualified. name '*'
+    selects all. func wraps it in an aggregate: COUNT, SUM, AVG, MIN or MAX.
+    """
+
+    __slots__ = ("table", "name", "func")
+
+    def __init__(self, table, name, func=None):
+        self.table = table
+        self.name = name
+        self.func = func
+
+    def __eq__(self, other):
+        return (isinstance(other, Column)
+                and (self.table, self.name, self.func) == (other.table, other.name, other.func))
+
+    def __hash__(self):
+        return hash((self.table, self.name, self.func))
+
+    def __repr__(self):
+        if self.func:
+            return f"Column({self.table!r}, {self.name!r}, {self.func!r})"
+        return f"Column({self.table!r}, {self.name!r})"
+
+class Join:
+    """Join `table`; edge is (fk_table, fk_col, pk_table, pk_col), or None for a CROSS JOIN."""
+
+    __slots__ = ("table", "edge")
+
+    def __init__(self, table, edge):
+        self.table = table
+        self.edge = edge
+
+    def __repr__(self):
+        return f"Join({self.table!r}, {self.edge!r})"
+
+class Query:
+    """
+    SELECT <select> FROM <from_table> <joins> WHERE <where> GROUP BY <group_by>
+    ORDER BY <order_by> LIMIT <limit>. order_by is a tuple of (Column, descending)
+    pairs; limit is an explicit row count ("top 10"), None otherwise.
+    parse_failures counts the condition fragments the parser skipped; it is
+    kept with a cached IR so the metric is counted on every request.
+    """
+
+    __slots__ = ("select", "from_table", "joins", "where", "group_by", "order_by", "limit",
+                 "parse_failures")
+
+    def __init__(self, select, from_table, joins=(), where=None, group_by=(), order_by=(), limit=None,
+                 parse_failures=0):
+        self.select = tuple(select)
+        self.from_table = from_table
+        self.joins = tuple(joins)
+        self.where = where
+        self.group_by = tuple(group_by)
+        self.order_by = tuple(order_by)
+        self.limit = limit
+        self.parse_failures = parse_failures
+
+    def tables(self):
+        return [self.from_table] + [j.table for j in self.joins]
+
+    def cross_joins(self):
+        """Number of tables joined with a CROSS JOIN fallback."""
+        return sum(1 for j in self.joins if j.edge is None)
+
+    def is_aggregate(self):
+        """True when the result is grouped or aggregated (one row per group)."""
+        return bool(self.group_by) or any(c.func for c in self.select)
+
+    def __repr__(self):
+        return (f"Query(select={list(self.select)!r}, from_table={self.from_table!r}, "
+                f"joins={list(self.joins)!r}, where={self.where!r}, group_by={list(self.group_by)!r}, "
+                f"order_by={list(self.order_by)!r}, limit={self.limit!r})")
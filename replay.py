@@ -0,0 +1,203 @@
+"""
+Replay captured questions (capture.py) through two versions of the
+translator and compare them: latency distribution per version and every
+query whose SQL changed.
+
+    python replay.py capture.log --baseline HEAD~1                # git revision vs. this tree
+    python replay.py capture.log --baseline ../old --candidate .  # two checkouts
+    python replay.py questions.txt --format text --baseline v1.2 --db shop.db --diffs diffs.jsonl
+
+Each version runs in its own worker process (so both can import their own
+texttosql module) and both run at the same time. Caches are switched off in
+the workers, so every question is translated from scratch; --repeat N keeps
+the fastest of N runs per question to damp scheduler noise.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ---- worker (runs inside the version under test) ----
+# This module imports nothing from the repository at the top level, so the
+# worker's first import of texttosql comes from the version under test.
+def _worker(root, db, repeat):
+    sys.path.insert(0, root)
+    import texttosql
+    for name in ("set_translation_cache", "set_query_cache"):
+        if hasattr(texttosql, name):
+            getattr(texttosql, name)(None)
+    schema = None
+    if db:
+        from schema import SQLiteSchemaProvider
+        schema = SQLiteSchemaProvider(db)
+    translate = (lambda q: texttosql.text_to_sql(q, schema)) if schema is not None else texttosql.text_to_sql
+    out = sys.stdout
+    for line in sys.stdin:
+        question = json.loads(line)
+        best, sql, error = float("inf"), None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                sql = translate(question)
+            except Exception as e:  # reported per query, like batch translation
+                error = f"{type(e).__name__}: {e}"
+            best = min(best, time.perf_counter() - start)
+        out.write(json.dumps({"sql": sql, "error": error, "us": round(best * 1e6, 1)}) + "\n")
+    out.flush()
+
+# ---- driver ----
+def export_revision(rev, dest):
+    """Extract git revision `rev` of this repository into `dest`."""
+    with tempfile.TemporaryFile() as archive:
+        subprocess.run(["git", "-C", HERE, "archive", "--format=tar", rev], stdout=archive, check=True)
+        archive.seek(0)
+        with tarfile.open(fileobj=archive) as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(dest, filter="data")
+            else:
+                tar.extractall(dest)
+    return dest
+
+def _resolve(version, tmp):
+    if os.path.isdir(version):
+        return os.path.abspath(version)
+    return export_revision(version, os.path.join(tmp, version.replace("/", "_")))
+
+def run_version(root, questions, db=None, repeat=1):
+    """[(sql, error, microseconds)] for every question, translated by the code in `root`."""
+    cmd = [sys.executable, os.path.join(HERE, "replay.py"), "--worker", root, "--repeat", str(repeat)]
+    if db:
+        cmd += ["--db", db]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=root,
+                            text=True, encoding="utf-8")
+
+    def feed():
+        for q in questions:
+            proc.stdin.write(json.dumps(q) + "\n")
+        proc.stdin.close()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    results = [json.loads(line) for line in proc.stdout]
+    feeder.join()
+    if proc.wait() != 0 or len(results) != len(questions):
+        raise RuntimeError(f"replay worker for {root} failed after {len(results)} of {len(questions)} questions")
+    return [(r["sql"], r["error"], r["us"]) for r in results]
+
+def percentiles(values, qs=(50, 90, 99)):
+    s = sorted(values)
+    if not s:
+        return {q: 0.0 for q in qs}
+    return {q: s[min(len(s) - 1, int(len(s) * q / 100))] for q in qs}
+
+def summarize(run):
+    """Latency distribution of one run, in microseconds."""
+    us = [r[2] for r in run]
+    out = {f"p{q}": v for q, v in percentiles(us).items()}
+    out["mean"] = sum(us) / len(us) if us else 0.0
+    out["max"] = max(us, default=0.0)
+    return out
+
+def compare(questions, base, cand):
+    """
+    Per-query differences of two runs over the same questions: every SQL diff,
+    and the median latency change of each distinct question (largest slowdown first).
+    """
+    diffs, timings = [], {}
+    for q, (b_sql, b_err, b_us), (c_sql, c_err, c_us) in zip(questions, base, cand):
+        if (b_sql, b_err) != (c_sql, c_err):
+            diffs.append({"question": q, "baseline": b_sql if b_err is None else b_err,
+                          "candidate": c_sql if c_err is None else c_err,
+                          "baseline_us": b_us, "candidate_us": c_us})
+        b, c = timings.setdefault(q, ([], []))
+        b.append(b_us)
+        c.append(c_us)
+    changes = []
+    for q, (b, c) in timings.items():
+        b_us, c_us = percentiles(b, (50,))[50], percentiles(c, (50,))[50]
+        changes.append((c_us - b_us, q, b_us, c_us))
+    changes.sort(reverse=True)
+    return diffs, changes
+
+def load_questions(path, fmt, field):
+    from batch import read_questions
+    from capture import read_capture
+    if fmt == "capture":
+        return [q for _, q, _ in read_capture(path) if q and q.strip()]
+    src = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        # malformed rows come back as BatchResult errors; they have nothing to replay
+        return [q for q in read_questions(src, fmt, field) if isinstance(q, str) and q.strip()]
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Replay captured questions through two translator versions.")
+    p.add_argument("input", nargs="?", help="capture log (rotated files are read too) or questions file")
+    p.add_argument("--format", choices=["capture", "jsonl", "csv", "text"], default="capture")
+    p.add_argument("--field", default="text", help="JSON key / CSV column holding the question")
+    p.add_argument("--baseline", help="directory or git revision of the current version")
+    p.add_argument("--candidate", default=HERE, help="directory or git revision of the new version (default: this tree)")
+    p.add_argument("--db", help="SQLite database to translate against instead of the built-in schema")
+    p.add_argument("--limit", type=int, help="replay only the first N questions")
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--show", type=int, default=20, help="SQL diffs to print")
+    p.add_argument("--diffs", help="write every SQL diff to this JSONL file")
+    p.add_argument("--worker", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker, args.db, args.repeat)
+        return
+    if not args.input or not args.baseline:
+        p.error("input and --baseline are required")
+
+    questions = load_questions(args.input, args.format, args.field)[:args.limit]
+    db = os.path.abspath(args.db) if args.db else None
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [_resolve(args.baseline, tmp), _resolve(args.candidate, tmp)]
+        runs = [None, None]
+
+        def go(i):
+            runs[i] = run_version(roots[i], questions, db, args.repeat)
+
+        threads = [threading.Thread(target=go, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    if None in runs:
+        sys.exit("a replay worker failed")
+
+    diffs, changes = compare(questions, *runs)
+    stats = [summarize(run) for run in runs]
+    print(f"{len(questions):,} questions replayed; {len(diffs):,} with different SQL")
+    print(f"\n{'latency (us)':<12}" + "".join(f"{k:>9}" for k in ("mean", "p50", "p90", "p99", "max")))
+    for label, st in zip(("baseline", "candidate"), stats):
+        print(f"{label:<12}" + "".join(f"{st[k]:>9.1f}" for k in ("mean", "p50", "p90", "p99", "max")))
+    print(f"{'shift':<12}" + "".join(
+        f"{(c[k] / b[k] - 1) * 100 if b[k] else 0.0:>+8.1f}%" for b, c in [stats]
+        for k in ("mean", "p50", "p90", "p99", "max")))
+
+    if changes and args.show:
+        print("\nlargest slowdowns, median per question (us):")
+        for delta, q, b_us, c_us in changes[:min(args.show, 5)]:
+            if delta > 0:
+                print(f"  {b_us:>9.1f} -> {c_us:>9.1f}  {q}")
+    for d in diffs[:args.show]:
+        print(f"\n? {d['question']}\n- {d['baseline']}\n+ {d['candidate']}")
+    if args.diffs:
+        with open(args.diffs, "w", encoding="utf-8") as f:
+            for d in diffs:
+                f.write(json.dumps(d, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,798 @@
+import hashlib
+import itertools
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+
+# --------------------------
+# Approximate name matching
+# --------------------------
+def _trigrams(word):
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class TrigramIndex:
+    """
+    Approximate lookup of words by trigram Dice similarity.
+
+    Only the rarest trigrams of the query are used to collect candidates
+    (prefix filtering: a word sharing none of them cannot reach the
+    threshold), and candidates are length-filtered before being scored, so
+    a lookup reads a few short posting lists rather than the vocabulary.
+    """
+
+    def __init__(self, words=(), threshold=0.6):
+        self.threshold = threshold
+        self._words = []
+        self._grams = []
+        self._postings = {}  # trigram -> [word id, ...]
+        self._ids = {}
+        for w in words:
+            self.add(w)
+
+    def add(self, word):
+        if word in self._ids:
+            return
+        wid = self._ids[word] = len(self._words)
+        grams = _trigrams(word)
+        self._words.append(word)
+        self._grams.append(grams)
+        for g in grams:
+            self._postings.setdefault(g, []).append(wid)
+
+    def __len__(self):
+        return len(self._words)
+
+    def lookup(self, word, limit=3, threshold=None):
+        """[(word, score), ...] best first, with score >= threshold."""
+        t = self.threshold if threshold is None else threshold
+        query = _trigrams(word)
+        a = len(query)
+        postings = self._postings
+        # Dice >= t needs at least ceil(t*a / (2-t)) shared trigrams
+        need = max(1, -int(-t * a // (2 - t)))
+        rare = sorted(query, key=lambda g: len(postings.get(g, ())))[:a - need + 1]
+        lo, hi = a * t / (2 - t), a * (2 - t) / t
+        grams = self._grams
+        seen = set()
+        scored = []
+        for g in rare:
+            for wid in postings.get(g, ()):
+                if wid in seen:
+                    continue
+                seen.add(wid)
+                b = len(grams[wid])
+                if b < lo or b > hi:
+                    continue
+                score = 2 * len(query & grams[wid]) / (a + b)
+                if score >= t:
+                    scored.append((score, self._words[wid]))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [(w, s) for s, w in scored[:limit]]
+
+def _edit_distance(a, b):
+    """Levenshtein distance that also counts an adjacent transposition as one edit."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+_PART_RE = re.compile(r"[a-z]+|[^a-z]+")
+
+class FuzzyNameIndex:
+    """
+    Approximate lookup of schema names, tolerant of typos.
+
+    Names are split into alphabetic parts ("customer_phone2" -> customer,
+    phone) and only the distinct parts go into a TrigramIndex. Schemas reuse
+    a limited vocabulary of words, so that index stays small as tables and
+    columns are added; a typo is corrected part by part and the result
+    checked against the full names. Parts match within one edit (two for
+    parts longer than five letters), counting a swap of neighbours as one.
+    """
+
+    _CANDIDATE_THRESHOLD = 0.3
+
+    def __init__(self, names=()):
+        self._names = set()
+        self._parts = TrigramIndex()
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        self._names.add(name)
+        for part in _PART_RE.findall(name):
+            if part.isalpha():
+                self._parts.add(part)
+
+    def lookup(self, word, limit=3):
+        """[(name, score), ...] best first; score is the mean similarity of the parts."""
+        pieces = _PART_RE.findall(word)
+        options = []  # per piece: [(text, score), ...]
+        for p in pieces:
+            if not p.isalpha() or p in self._parts._ids:
+                options.append([(p, 1.0)])
+                continue
+            # trigrams only shortlist candidates (a swap breaks up to three of
+            # them); edit distance decides
+            found = []
+            for cand, _ in self._parts.lookup(p, limit=10, threshold=self._CANDIDATE_THRESHOLD):
+                d = _edit_distance(p, cand)
+                if d <= (1 if len(p) <= 5 else 2):
+                    found.append((cand, 1 - d / max(len(p), len(cand))))
+            if not found:
+                return []
+            found.sort(key=lambda x: -x[1])
+            options.append(found[:3])
+        alpha = sum(1 for p in pieces if p.isalpha()) or 1
+        scored = []
+        for combo in itertools.product(*options):
+            name = "".join(text for text, _ in combo)
+            if name in self._names and name != word:
+                score = sum(sc for (text, sc), p in zip(combo, pieces) if p.isalpha()) / alpha
+                scored.append((score, name))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [(n, sc) for sc, n in scored[:limit]]
+
+# Generic abbreviations and synonyms; a pair only applies when the schema has
+# the target name. Per-schema additions go to SchemaSnapshot(synonyms=...).
+DEFAULT_SYNONYMS = {
+    "dept": "department",
+    "qty": "quantity",
+    "amt": "amount",
+    "phone": "phone_number",
+    "mobile": "phone_number",
+    "mail": "email",
+    "pay": "salary",
+    "wage": "salary",
+    "wages": "salary",
+    "staff": "employees",
+    "clients": "customers",
+}
+
+# tokens never corrected approximately: query verbs and filler
+_FUZZY_STOPWORDS = {
+    "show", "list", "find", "select", "fetch", "display", "give", "return", "where",
+    "with", "whose", "which", "that", "than", "from", "between", "after", "before",
+    "since", "until", "placed", "total", "number", "every", "everything", "please",
+    "records", "rows", "details", "have", "having", "their", "them", "more", "less",
+    "least", "most", "above", "below", "equal", "equals", "greater", "only",
+}
+_FUZZY_MIN_LEN = 4
+# no name is this long; longer "words" are pasted values or junk
+_FUZZY_MAX_LEN = 40
+# approximate lookups per scan; a question never has more typos than this,
+# and it keeps the cost of a long run of unknown words bounded
+_FUZZY_MAX_WORDS = 16
+
+# --------------------------
+# Schema name index
+# --------------------------
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str):
+    """Lower-cased word tokens; underscores stay inside a token (phone_number)."""
+    return _TOKEN_RE.findall(text.lower())
+
+class SchemaHits:
+    """Tables and columns mentioned in one piece of text (see SchemaIndex.scan)."""
+
+    def __init__(self, index, tables, column_entries, aliases=(), corrections=None):
+        self._index = index
+        self._tables = tables
+        self._column_entries = column_entries
+        self._aliases = aliases
+        # input word -> schema name it was resolved to by synonym, plural or typo matching
+        self.corrections = corrections or {}
+
+    def tables(self):
+        """Mentioned tables, in schema order."""
+        order = self._index._table_order
+        return sorted(self._tables, key=order.__getitem__)
+
+    def alias_tables(self):
+        """Tables mentioned only by singular name ("order" -> orders), in schema order."""
+        order = self._index._table_order
+        return sorted(self._aliases, key=order.__getitem__)
+
+    def column_table(self):
+        """
+        The table owning the most mentioned columns ("average salary per
+        department" -> employees), or None when there is no single best table.
+        """
+        counts = {}
+        for cols in self._column_entries:
+            for table in cols:
+                counts[table] = counts.get(table, 0) + 1
+        if not counts:
+            return None
+        ranked = sorted(counts.values(), reverse=True)
+        if len(ranked) > 1 and ranked[0] == ranked[1]:
+            return None
+        return max(counts, key=counts.__getitem__)
+
+    def fields(self, table: str):
+        """Mentioned columns of `table`, in the table's column order."""
+        positions = []
+        for cols in self._column_entries:
+            hit = cols.get(table)
+            if hit is not None:
+                positions.append(hit)
+        return [col for _, col in sorted(positions)]
+
+class SchemaIndex:
+    """
+    Inverted index from name tokens to tables and columns.
+
+    Built once per schema; scan() tokenizes the input a single time and
+    resolves every name through dict lookups, so the cost depends on the
+    input length rather than on the number of tables and columns.
+    Multi-token names are matched as n-grams of consecutive tokens.
+
+    Words that are not names are resolved, in order, through synonyms,
+    plural forms of column names and a FuzzyNameIndex over all names (typos);
+    the last step is skipped for words in value position ("city = delhi").
+    """
+
+    def __init__(self, tables, synonyms=None):
+        self.rebuild(tables, synonyms)
+
+    def rebuild(self, tables, synonyms=None):
+        """Re-index from a {table: [columns]} mapping, e.g. after a schema change."""
+        table_order = {}
+        aliases = {}
+        names = {}  # token tuple -> [table name or None, {table: (position, column)}]
+        for t_pos, (table, cols) in enumerate(tables.items()):
+            table_order[table] = t_pos
+            key = tuple(tokenize(table))
+            if key:
+                entry = names.setdefault(key, [None, {}])
+                if entry[0] is None:
+                    entry[0] = table
+                if len(key[-1]) > 1 and key[-1].endswith("s"):
+                    aliases.setdefault(key[:-1] + (key[-1][:-1],), table)
+            for c_pos, col in enumerate(cols):
+                key = tuple(tokenize(col))
+                if key:
+                    names.setdefault(key, [None, {}])[1].setdefault(table, (c_pos, col))
+        # word -> canonical single-token name: synonyms, then column plurals
+        variants = {}
+        merged = dict(DEFAULT_SYNONYMS)
+        merged.update({k.lower(): v for k, v in (synonyms or {}).items()})
+        for word, target in merged.items():
+            key, target_key = tuple(tokenize(word)), tuple(tokenize(target))
+            if len(key) == 1 and key not in names and (target_key in names or target_key in aliases):
+                variants[key[0]] = target_key
+        for key, (table, cols) in names.items():
+            if cols and len(key) == 1:
+                plural = (_plural(key[0]),)
+                if plural not in names and plural not in aliases:
+                    variants.setdefault(plural[0], key)
+        self._table_order = table_order
+        self._names = names
+        self._aliases = aliases
+        self._variants = variants
+        self._fuzzy = None
+        self._fuzzy_cache = {}
+        self._max_len = max((len(k) for k in (*names, *aliases)), default=1)
+        # first tokens of multi-token names, so n-grams are only built where they can match
+        self._multi_heads = {k[0] for k in (*names, *aliases) if len(k) > 1}
+
+    def scan(self, text: str) -> SchemaHits:
+        toks = tokenize(text)
+        names = self._names
+        keys = {(t,) for t in toks}
+        if self._multi_heads:
+            heads = self._multi_heads
+            max_len = self._max_len
+            for i, t in enumerate(toks):
+                if t in heads:
+                    for n in range(2, min(max_len, len(toks) - i) + 1):
+                        keys.add(tuple(toks[i:i + n]))
+        corrections = None
+        unknown = [t for t in toks if (t,) not in names and (t,) not in self._aliases]
+        if unknown:
+            corrections = self._correct(text, unknown)
+            keys.update(corrections.values())
+            corrections = {w: " ".join(k) for w, k in corrections.items()}
+        found_tables = []
+        column_entries = []
+        found_aliases = [self._aliases[k] for k in keys if k in self._aliases]
+        for key in keys:
+            entry = names.get(key)
+            if entry is None:
+                continue
+            table, cols = entry
+            if table is not None:
+                found_tables.append(table)
+            if cols:
+                column_entries.append(cols)
+        return SchemaHits(self, found_tables, column_entries, found_aliases, corrections)
+
+    def is_name(self, phrase):
+        """True when `phrase` names a table or column, directly or through a synonym or plural."""
+        key = tuple(tokenize(phrase))
+        return (key in self._names or key in self._aliases
+                or (len(key) == 1 and key[0] in self._variants))
+
+    def _correct(self, text, words):
+        """{word: name key} for words resolved by synonym, plural or approximate match."""
+        out = {}
+        variants = self._variants
+        value_words = None
+        budget = _FUZZY_MAX_WORDS
+        for w in dict.fromkeys(words):
+            key = variants.get(w)
+            if key is None:
+                if (budget <= 0 or not _FUZZY_MIN_LEN <= len(w) <= _FUZZY_MAX_LEN
+                        or w in _FUZZY_STOPWORDS or not w.isalpha()):
+                    continue
+                if value_words is None:
+                    value_words = _value_words(text)
+                if w in value_words:
+                    continue
+                budget -= 1
+                key = self._fuzzy_key(w)
+                if key is None:
+                    continue
+            out[w] = key
+        return out
+
+    def fuzzy(self):
+        """The typo index over all names; built on first use, as most inputs never need it."""
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyNameIndex(
+                " ".join(k) for k in (*self._names, *self._aliases) if len(k) == 1)
+        return self._fuzzy
+
+    def _fuzzy_key(self, word):
+        cache = self._fuzzy_cache
+        if word in cache:
+            return cache[word]
+        best = self.fuzzy().lookup(word, limit=1)
+        key = (best[0][0],) if best else None
+        if len(cache) < 65536:
+            cache[word] = key
+        return key
+
+def _plural(word):
+    if word.endswith("y") and len(word) > 1 and word[-2] not in "aeiou":
+        return word[:-1] + "ies"
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word + "es"
+    return word + "s"
+
+_VALUE_RE = re.compile(r"(?:[=<>(,]|\bin|\bbetween)\s*(\w+)")
+
+def _value_words(text):
+    """Words directly after an operator, which are values rather than names."""
+    return set(_VALUE_RE.findall(text.lower()))
+
+# --------------------------
+# Schema snapshots
+# --------------------------
+class SchemaSnapshot:
+    """
+    Immutable view of a schema: tables -> columns, column types and
+    foreign keys ((from_table, col) -> (to_table, to_col)).
+
+    `version` is a content hash, so two snapshots of the same schema compare
+    equal and anything derived from a snapshot can be cached per version.
+    """
+
+    def __init__(self, tables, foreign_keys=None, column_types=None, synonyms=None, version=None):
+        # `version` skips hashing when the content hash is already known
+        # (unpickling, restoring a precompiled provider); it must match the content
+        self.tables = MappingProxyType({t: tuple(cols) for t, cols in tables.items()})
+        column_types = column_types or {}
+        self.column_types = MappingProxyType({
+            t: MappingProxyType(dict(column_types.get(t, {}))) for t in self.tables
+        })
+        self.foreign_keys = MappingProxyType(dict(foreign_keys or {}))
+        # word -> table or column name, e.g. {"pay": "salary"}; see DEFAULT_SYNONYMS
+        self.synonyms = MappingProxyType(dict(synonyms or {}))
+        self.version = version or self._content_hash()
+        self._index = None
+        self._fk_graph = None
+
+    def _content_hash(self):
+        h = hashlib.sha1()
+        for t, cols in self.tables.items():
+            h.update(repr((t, cols, sorted(self.column_types[t].items()))).encode())
+        h.update(repr(sorted(self.foreign_keys.items())).encode())
+        if self.synonyms:
+            h.update(repr(sorted(self.synonyms.items())).encode())
+        return h.hexdigest()[:16]
+
+    @property
+    def index(self) -> SchemaIndex:
+        """Name index for this snapshot, built on first use."""
+        if self._index is None:
+            self._index = SchemaIndex(self.tables, self.synonyms)
+        return self._index
+
+    @property
+    def fk_graph(self) -> "ForeignKeyGraph":
+        """Join graph for this snapshot, built on first use."""
+        if self._fk_graph is None:
+            self._fk_graph = ForeignKeyGraph(self.tables, self.foreign_keys)
+        return self._fk_graph
+
+    def memo_caches(self):
+        """The memo dicts that keep growing with use (typo lookups, join plans), for memory accounting."""
+        return (self.index._fuzzy_cache, self.fk_graph._plans)
+
+    def adopt(self, index=None, fk_graph=None):
+        """Use prebuilt derived structures, e.g. loaded by precompiled.load()."""
+        if index is not None:
+            self._index = index
+        if fk_graph is not None:
+            self._fk_graph = fk_graph
+
+    def __reduce__(self):
+        # mapping proxies don't pickle; rebuild from plain dicts (derived indexes are rebuilt lazily)
+        return (SchemaSnapshot, (
+            {t: list(cols) for t, cols in self.tables.items()},
+            dict(self.foreign_keys),
+            {t: dict(types) for t, types in self.column_types.items()},
+            dict(self.synonyms),
+            self.version,
+        ))
+
+    def __eq__(self, other):
+        return isinstance(other, SchemaSnapshot) and other.version == self.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __repr__(self):
+        return f"SchemaSnapshot(version={self.version!r}, tables={len(self.tables)})"
+
+# --------------------------
+# Schema providers
+# --------------------------
+def _is_factory(connect):
+    # sqlite3 connections are callable too; a connection is anything with cursor()
+    return callable(connect) and not hasattr(connect, "cursor")
+
+class SchemaProvider:
+    """
+    Introspects a live database into SchemaSnapshot objects.
+
+    snapshot() is lazy: it returns the cached snapshot until `refresh_interval`
+    seconds have passed, then asks the catalog whether anything changed and
+    re-reads only the tables whose definition differs. Subclasses implement
+    the catalog queries.
+    """
+
+    def __init__(self, connect, refresh_interval=5.0, synonyms=None):
+        # connect: a DB-API connection (left open), or a zero-argument callable
+        # returning a fresh connection (closed again after each refresh)
+        self._connect = connect
+        self.refresh_interval = refresh_interval
+        self.synonyms = dict(synonyms or {})
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._catalog_version = None
+        self._signatures = {}
+        self._table_info = {}  # table -> (columns, {col: type}, {(table, col): (to_table, to_col)})
+
+    def snapshot(self, force=False) -> SchemaSnapshot:
+        snap = self._snapshot
+        if snap is not None and not force and time.monotonic() - self._checked_at < self.refresh_interval:
+            return snap
+        with self._lock:
+            if self._snapshot is None or force or time.monotonic() - self._checked_at >= self.refresh_interval:
+                self._refresh(force)
+            return self._snapshot
+
+    def _refresh(self, force):
+        owned = _is_factory(self._connect)
+        conn = self._connect() if owned else self._connect
+        cur = conn.cursor()
+        try:
+            version = self._read_catalog_version(cur)
+            if (self._snapshot is not None and not force
+                    and version is not None and version == self._catalog_version):
+                self._checked_at = time.monotonic()
+                return
+            signatures = self._read_signatures(cur)
+            info = {}
+            for table, sig in signatures.items():
+                if not force and self._signatures.get(table) == sig and table in self._table_info:
+                    info[table] = self._table_info[table]
+                else:
+                    info[table] = self._read_table(cur, table)
+        finally:
+            cur.close()
+            if owned:
+                conn.close()
+        self._catalog_version = version
+        self._signatures = signatures
+        self._table_info = info
+        snap = self._build_snapshot(info)
+        # keep the old object (and its built index) when nothing actually changed
+        if snap != self._snapshot:
+            self._snapshot = snap
+        self._checked_at = time.monotonic()
+
+    def _build_snapshot(self, info, version=None):
+        tables, types, fks = {}, {}, {}
+        for table, (cols, col_types, table_fks) in info.items():
+            tables[table] = cols
+            types[table] = col_types
+            fks.update(table_fks)
+        return SchemaSnapshot(tables, fks, types, self.synonyms, version)
+
+    def fingerprint(self):
+        """
+        (catalog version, digest of the table signatures): changes whenever the
+        schema does, and costs one or two catalog queries instead of a full read.
+        """
+        with self._lock:
+            owned = _is_factory(self._connect)
+            conn = self._connect() if owned else self._connect
+            cur = conn.cursor()
+            try:
+                version = self._read_catalog_version(cur)
+                signatures = self._read_signatures(cur)
+            finally:
+                cur.close()
+                if owned:
+                    conn.close()
+        return version, hashlib.sha1(repr(sorted(signatures.items())).encode()).hexdigest()
+
+    def export_state(self):
+        """Introspected catalog state, for restore_state() in another process."""
+        with self._lock:
+            if self._snapshot is None:
+                self._refresh(False)
+            return {"catalog_version": self._catalog_version, "signatures": dict(self._signatures),
+                    "table_info": dict(self._table_info), "version": self._snapshot.version}
+
+    def restore_state(self, state):
+        """Adopt state from export_state() as if it had just been read from the database."""
+        with self._lock:
+            self._catalog_version = state["catalog_version"]
+            self._signatures = dict(state["signatures"])
+            self._table_info = dict(state["table_info"])
+            self._snapshot = self._build_snapshot(self._table_info, state.get("version"))
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _read_catalog_version(self, cur):
+        """Cheap change counter for the whole catalog, or None if unavailable."""
+        return None
+
+    def _read_signatures(self, cur):
+        """{table: value that changes whenever the table's definition changes}"""
+        raise NotImplementedError
+
+    def _read_table(self, cur, table):
+        """(columns, {col: type}, {(table, col): (to_table, to_col)}) for one table"""
+        raise NotImplementedError
+
+class SQLiteSchemaProvider(SchemaProvider):
+    """Schema provider for sqlite3 connections (or a database file path)."""
+
+    def __init__(self, connect, refresh_interval=5.0, synonyms=None):
+        if isinstance(connect, str):
+            path = connect
+            connect = lambda: sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        super().__init__(connect, refresh_interval, synonyms)
+
+    def _read_catalog_version(self, cur):
+        # bumped by SQLite on every schema change
+        return cur.execute("PRAGMA schema_version").fetchone()[0]
+
+    def _read_signatures(self, cur):
+        rows = cur.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        ).fetchall()
+        return {name: sql for name, sql in rows}
+
+    def _read_table(self, cur, table):
+        quoted = '"' + table.replace('"', '""') + '"'
+        cols = cur.execute(f"PRAGMA table_info({quoted})").fetchall()
+        fk_rows = cur.execute(f"PRAGMA foreign_key_list({quoted})").fetchall()
+        columns = tuple(c[1] for c in cols)
+        types = {c[1]: c[2] for c in cols}
+        fks = {}
+        parent_keys = {}
+        for row in fk_rows:
+            seq, to_table, from_col, to_col = row[1], row[2], row[3], row[4]
+            if to_col is None:
+                # a NULL target column means the referenced table's primary key
+                if to_table not in parent_keys:
+                    parent_keys[to_table] = self._primary_key(cur, to_table)
+                key = parent_keys[to_table]
+                to_col = key[seq] if seq < len(key) else "rowid"
+            fks[(table, from_col)] = (to_table, to_col)
+        return columns, types, fks
+
+    @staticmethod
+    def _primary_key(cur, table):
+        quoted = '"' + table.replace('"', '""') + '"'
+        cols = cur.execute(f"PRAGMA table_info({quoted})").fetchall()
+        return [c[1] for c in sorted((c for c in cols if c[5]), key=lambda c: c[5])]
+
+class InformationSchemaProvider(SchemaProvider):
+    """
+    Schema provider for DB-API connections exposing INFORMATION_SCHEMA
+    with constraint_column_usage (PostgreSQL, SQL Server, ...). There is no
+    portable catalog version, so each refresh reads the columns and foreign
+    keys of `schema_name` and rebuilds only the tables whose columns or
+    foreign keys changed.
+    """
+
+    def __init__(self, connect, schema_name="public", refresh_interval=30.0, synonyms=None):
+        super().__init__(connect, refresh_interval, synonyms)
+        self.schema_name = schema_name
+        self._columns = {}
+        self._fks = {}
+
+    def _schema_literal(self):
+        # inlined rather than bound: DB-API drivers disagree on the parameter style
+        return "'" + self.schema_name.replace("'", "''") + "'"
+
+    def _read_signatures(self, cur):
+        cur.execute(
+            "SELECT table_name, column_name, data_type, ordinal_position "
+            "FROM information_schema.columns "
+            f"WHERE table_schema = {self._schema_literal()}"
+        )
+        columns = {}
+        for table, col, dtype, pos in cur.fetchall():
+            columns.setdefault(table, []).append((pos, col, dtype))
+        for cols in columns.values():
+            cols.sort()
+        fks = self._read_foreign_keys(cur)
+        self._columns = columns
+        self._fks = fks
+        # a foreign key added or dropped on existing columns changes the signature too
+        return {t: hashlib.sha1(repr((cols, sorted(fks.get(t, {}).items()))).encode()).hexdigest()
+                for t, cols in columns.items()}
+
+    def _read_table(self, cur, table):
+        cols = self._columns.get(table, [])
+        columns = tuple(c for _, c, _ in cols)
+        types = {c: dtype for _, c, dtype in cols}
+        return columns, types, self._fks.get(table, {})
+
+    def _read_foreign_keys(self, cur):
+        cur.execute(
+            "SELECT kcu.table_name, kcu.column_name, ccu.table_name, ccu.column_name "
+            "FROM information_schema.table_constraints tc "
+            "JOIN information_schema.key_column_usage kcu "
+            "  ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema "
+            "JOIN information_schema.constraint_column_usage ccu "
+            "  ON tc.constraint_name = ccu.constraint_name AND tc.constraint_schema = ccu.constraint_schema "
+            f"WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = {self._schema_literal()}"
+        )
+        fks = {}
+        for from_table, from_col, to_table, to_col in cur.fetchall():
+            fks.setdefault(from_table, {})[(from_table, from_col)] = (to_table, to_col)
+        return fks
+
+# --------------------------
+# Foreign-key graph & join planning
+# --------------------------
+class ForeignKeyGraph:
+    """
+    Undirected adjacency index over foreign keys, used to plan joins.
+
+    Edges come from declared foreign keys plus the naming convention
+    `<table>_id` / `<singular>_id` -> `<table>.id` where nothing is declared.
+    Each edge keeps its FK orientation so ON clauses read fk_side = pk_side.
+    """
+
+    MAX_PLANS = 4096
+
+    def __init__(self, tables, foreign_keys):
+        adj = {t: [] for t in tables}
+        declared = set()
+
+        def add(f_table, f_col, t_table, t_col):
+            if f_table == t_table or f_table not in adj or t_table not in adj:
+                return  # self references never help connect two tables
+            edge = (f_table, f_col, t_table, t_col)
+            adj[f_table].append((t_table, edge))
+            adj[t_table].append((f_table, edge))
+
+        for (f_table, f_col), (t_table, t_col) in foreign_keys.items():
+            declared.add((f_table, f_col))
+            add(f_table, f_col, t_table, t_col)
+        # column name -> tables having it, so the naming convention costs one
+        # pass over the columns instead of one per target table
+        holders = {}
+        for source, source_cols in tables.items():
+            for col in source_cols:
+                if col.endswith("_id"):
+                    holders.setdefault(col, []).append(source)
+        for target, cols in tables.items():
+            if "id" not in cols:
+                continue
+            names = [f"{target}_id"]
+            if target.endswith("s"):
+                names.append(f"{target[:-1]}_id")
+            for col in names:
+                for source in holders.get(col, ()):
+                    if (source, col) not in declared:
+                        add(source, col, target, "id")
+        self._adj = adj
+        self._plans = {}
+
+    def neighbors(self, table):
+        return [n for n, _ in self._adj.get(table, ())]
+
+    def plan(self, tables):
+        """
+        Plan joins connecting `tables` (in order) with as few extra tables as
+        possible: each table not yet joined is reached by the shortest FK path
+        from everything joined so far, pulling in bridge tables on the way.
+
+        Returns [(table, edge or None), ...]; the first entry and any table
+        that cannot be reached have edge None (a CROSS JOIN). Plans are
+        memoized per table tuple; the graph itself is per schema version.
+        """
+        key = tuple(tables)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plan(key)
+            if len(self._plans) >= self.MAX_PLANS:
+                self._plans.clear()
+            self._plans[key] = plan
+        return plan
+
+    def _plan(self, tables):
+        if not tables:
+            return ()
+        joined = {tables[0]}
+        steps = [(tables[0], None)]
+        for target in tables[1:]:
+            if target in joined:
+                continue
+            path = self._shortest_path(joined, target)
+            if path is None:
+                joined.add(target)
+                steps.append((target, None))
+                continue
+            for table, edge in path:
+                joined.add(table)
+                steps.append((table, edge))
+        return tuple(steps)
+
+    def _shortest_path(self, sources, target):
+        """BFS from all joined tables to target; [(table, edge), ...] excluding the start."""
+        adj = self._adj
+        if target not in adj:
+            return None
+        prev = {s: None for s in sources}
+        queue = deque(sources)
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                break
+            for nxt, edge in adj.get(node, ()):
+                if nxt not in prev:
+                    prev[nxt] = (node, edge)
+                    queue.append(nxt)
+        if target not in prev:
+            return None
+        path = []
+        node = target
+        while prev[node] is not None:
+            parent, edge = prev[node]
+            path.append((node, edge))
+            node = parent
+        path.reverse()
+        return path
@@ -1,214 +1,379 @@
-import streamlit as st
-import time
-from texttosql import text_to_sql
-
-# ---------------- Page Config ----------------
-st.set_page_config(
-    page_title="Text-to-SQL Generator",
-    layout="wide",
-)
-
-# ---------------- Session State ----------------
-st.session_state.setdefault("sql", "")
-st.session_state.setdefault("query", "")
-st.session_state.setdefault("history", [])
-st.session_state.setdefault("dark_mode", True)
-
-# ---------------- Sidebar ----------------
-st.sidebar.title("⚙️ Settings")
-st.sidebar.toggle("🌙 Dark Mode", key="dark_mode")
-
-# ---------------- Theme ----------------
-if st.session_state.dark_mode:
-    bg = "#0b1220"
-    card = "#111827"
-    header = "#1f2937"
-    text = "#e5e7eb"
-    subtext = "#9ca3af"
-else:
-    bg = "#f8fafc"
-    card = "#ffffff"
-    header = "#e5e7eb"
-    text = "#0f172a"
-    subtext = "#475569"
-
-# ---------------- CSS (FINAL CLEAN FIX) ----------------
-st.markdown(f"""
-<style>
-html, body {{
-    margin: 0;
-    padding: 0;
-    overflow-x: hidden;
-    background-color: {bg};
-}}
-
-.block-container {{
-    max-width: 100vw !important;
-    padding: 1.5rem 1.2rem !important;
-    margin: 0 auto !important;
-    overflow-x: hidden;
-}}
-
-/* ✅ REMOVE EMPTY CARD GHOST ELEMENTS */
-.card:empty {{
-    display: none !important;
-}}
-
-/* Title (UNCHANGED & SAFE) */
-.app-title-wrapper {{
-    width: 100%;
-    text-align: center;
-    margin-top: 0.5rem;
-    margin-bottom: 1.5rem;
-    position: relative;
-    z-index: 5;
-}}
-
-.title {{
-    font-size: 32px;
-    font-weight: 700;
-    color: {text};
-}}
-
-.subtitle {{
-    color: {subtext};
-    margin-top: 6px;
-}}
-
-/* Cards */
-.card {{
-    background: {card};
-    border-radius: 14px;
-    padding: 16px;
-    box-shadow: 0 10px 24px rgba(0,0,0,0.15);
-    width: 100%;
-    box-sizing: border-box;
-}}
-
-.card-header {{
-    background: {header};
-    padding: 10px 14px;
-    border-radius: 10px;
-    font-weight: 600;
-    color: {text};
-    margin-bottom: 12px;
-}}
-
-textarea {{
-    font-size: 14px !important;
-}}
-
-/* Mobile */
-@media (max-width: 900px) {{
-    .title {{
-        font-size: 24px;
-    }}
-
-    div[data-testid="column"] {{
-        width: 100% !important;
-        max-width: 100% !important;
-        flex: 1 1 100% !important;
-    }}
-}}
-</style>
-""", unsafe_allow_html=True)
-
-# ---------------- TITLE ----------------
-st.markdown("""
-<div class="app-title-wrapper">
-    <div class="title">🧠 Text-to-SQL Generator</div>
-    <div class="subtitle">Convert Natural Language into SQL Instantly</div>
-</div>
-""", unsafe_allow_html=True)
-
-# ---------------- Layout ----------------
-col1, col2 = st.columns(2, gap="large")
-
-# ---------------- Example Handler ----------------
-def load_example():
-    st.session_state.query = st.session_state.example
-
-# ---------------- LEFT ----------------
-with col1:
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    st.markdown("<div class='card-header'>📝 Natural Language Query</div>", unsafe_allow_html=True)
-
-    st.selectbox(
-        "Example Queries",
-        [
-            "",
-            "Select all employees",
-            "Show employees with salary greater than 50000",
-            "Find total number of employees",
-            "Show orders placed after date 2023-01-01"
-            
-        ],
-        key="example",
-        on_change=load_example
-    )
-
-    with st.form("query_form"):
-        query = st.text_area(
-            "Enter Query",
-            value=st.session_state.query,
-            placeholder="Type your query in plain English...",
-            height=120
-        )
-        submit = st.form_submit_button("⚡ Generate SQL", use_container_width=True)
-
-    if submit:
-        if query.strip():
-            with st.spinner("🧠 Generating SQL..."):
-                time.sleep(0.6)
-                sql = text_to_sql(query)
-                st.session_state.sql = sql
-                st.session_state.query = query
-                st.session_state.history.insert(0, {"query": query, "sql": sql})
-            st.success("SQL generated successfully!")
-        else:
-            st.warning("Please enter a query")
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ---------------- RIGHT ----------------
-with col2:
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    st.markdown("<div class='card-header'>✅ Generated SQL</div>", unsafe_allow_html=True)
-
-    if st.session_state.sql:
-        st.text_area(
-            "Generated SQL (Read Only)",
-            value=st.session_state.sql,
-            height=160,
-            disabled=True
-        )
-
-        st.download_button(
-            "📥 Download SQL",
-            st.session_state.sql,
-            file_name="query.sql",
-            mime="text/sql",
-            use_container_width=True
-        )
-    else:
-        st.info("Generated SQL will appear here")
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# ---------------- SIDEBAR HISTORY ----------------
-st.sidebar.markdown("## 🕒 SQL History")
-
-if st.session_state.history:
-    for i, item in enumerate(st.session_state.history):
-        if st.sidebar.button(item["query"], key=f"h{i}"):
-            st.session_state.sql = item["sql"]
-            st.session_state.query = item["query"]
-            st.rerun()
-else:
-    st.sidebar.info("No history yet")
-
-if st.sidebar.button("🗑️ Clear History", use_container_width=True):
-    st.session_state.history.clear()
-    st.session_state.sql = ""
-    st.session_state.query = ""
-    st.rerun()
+import streamlit as st
+import os
+import time
+import uuid
+from texttosql import text_to_sql, set_value_index, TranslationLimitError
+from history import HistoryStore
+from schema import SQLiteSchemaProvider
+from values import ValueIndexer
+from executor import QueryExecutor, ExecutionError
+from advisor import IndexAdvisor
+import precompiled
+from capture import CaptureLog
+from live import LivePreview
+
+try:  # optional: per-keystroke input (pip install streamlit-keyup)
+    from st_keyup import st_keyup
+except ImportError:
+    st_keyup = None
+
+HISTORY_PAGE_SIZE = 20
+RESULT_PAGE_SIZE = 50
+LIVE_DEBOUNCE_MS = 150
+
+@st.cache_resource
+def get_history_store():
+    # one store per server process, persisted across restarts; entries are kept per session
+    return HistoryStore(os.environ.get("TEXT_TO_SQL_HISTORY", "history.db"), capacity=1000)
+
+history = get_history_store()
+
+@st.cache_resource
+def get_database():
+    # optional: translate against and run queries on a local SQLite file
+    path = os.environ.get("TEXT_TO_SQL_DB")
+    provider = SQLiteSchemaProvider(path) if path else None
+    if os.environ.get("TEXT_TO_SQL_PRECOMPILED"):
+        precompiled.load(os.environ["TEXT_TO_SQL_PRECOMPILED"], provider)
+    if not path:
+        return None, None
+    if os.environ.get("TEXT_TO_SQL_VALUE_INDEX") == "1":
+        set_value_index(ValueIndexer(path, provider,
+                                     max_bytes=int(os.environ.get("TEXT_TO_SQL_VALUE_INDEX_MB", 4)) << 20))
+    timeout = float(os.environ.get("TEXT_TO_SQL_TIMEOUT", 5))
+    return provider, QueryExecutor(path, timeout=timeout)
+
+schema_provider, executor = get_database()
+
+@st.cache_resource
+def get_capture_log():
+    # optional: sampled log of submitted questions for replay.py
+    return CaptureLog.from_env()
+
+capture = get_capture_log()
+
+# ---------------- Page Config ----------------
+st.set_page_config(
+    page_title="Text-to-SQL Generator",
+    layout="wide",
+)
+
+# ---------------- Session State ----------------
+st.session_state.setdefault("sql", "")
+st.session_state.setdefault("query", "")
+st.session_state.setdefault("history_page", 0)
+st.session_state.setdefault("dark_mode", True)
+st.session_state.setdefault("simulate_delay", False)
+st.session_state.setdefault("run_query", False)
+st.session_state.setdefault("result_page", 0)
+st.session_state.setdefault("live_preview", False)
+# scopes the shared history store to this browser session
+st.session_state.setdefault("session_id", uuid.uuid4().hex)
+session_id = st.session_state.session_id
+
+# ---------------- Sidebar ----------------
+st.sidebar.title("⚙️ Settings")
+st.sidebar.toggle("🌙 Dark Mode", key="dark_mode")
+st.sidebar.toggle("⏳ Simulated Delay", key="simulate_delay",
+                  help="Pause briefly before showing the result (demo effect)")
+st.sidebar.toggle("⚡ Live Preview", key="live_preview",
+                  help="Translate while typing" if st_keyup is not None else
+                  "Translate on every Enter (pip install streamlit-keyup to translate while typing)")
+if executor is not None:
+    st.sidebar.toggle("▶️ Run Query", key="run_query",
+                      help=f"Run the SQL read-only and show {RESULT_PAGE_SIZE} rows per page")
+
+# ---------------- Theme ----------------
+if st.session_state.dark_mode:
+    bg = "#0b1220"
+    card = "#111827"
+    header = "#1f2937"
+    text = "#e5e7eb"
+    subtext = "#9ca3af"
+else:
+    bg = "#f8fafc"
+    card = "#ffffff"
+    header = "#e5e7eb"
+    text = "#0f172a"
+    subtext = "#475569"
+
+# ---------------- CSS (FINAL CLEAN FIX) ----------------
+st.markdown(f"""
+<style>
+html, body {{
+    margin: 0;
+    padding: 0;
+    overflow-x: hidden;
+    background-color: {bg};
+}}
+
+.block-container {{
+    max-width: 100vw !important;
+    padding: 1.5rem 1.2rem !important;
+    margin: 0 auto !important;
+    overflow-x: hidden;
+}}
+
+/* ✅ REMOVE EMPTY CARD GHOST ELEMENTS */
+.card:empty {{
+    display: none !important;
+}}
+
+/* Title (UNCHANGED & SAFE) */
+.app-title-wrapper {{
+    width: 100%;
+    text-align: center;
+    margin-top: 0.5rem;
+    margin-bottom: 1.5rem;
+    position: relative;
+    z-index: 5;
+}}
+
+.title {{
+    font-size: 32px;
+    font-weight: 700;
+    color: {text};
+}}
+
+.subtitle {{
+    color: {subtext};
+    margin-top: 6px;
+}}
+
+/* Cards */
+.card {{
+    background: {card};
+    border-radius: 14px;
+    padding: 16px;
+    box-shadow: 0 10px 24px rgba(0,0,0,0.15);
+    width: 100%;
+    box-sizing: border-box;
+}}
+
+.card-header {{
+    background: {header};
+    padding: 10px 14px;
+    border-radius: 10px;
+    font-weight: 600;
+    color: {text};
+    margin-bottom: 12px;
+}}
+
+textarea {{
+    font-size: 14px !important;
+}}
+
+/* Mobile */
+@media (max-width: 900px) {{
+    .title {{
+        font-size: 24px;
+    }}
+
+    div[data-testid="column"] {{
+        width: 100% !important;
+        max-width: 100% !important;
+        flex: 1 1 100% !important;
+    }}
+}}
+</style>
+""", unsafe_allow_html=True)
+
+# ---------------- TITLE ----------------
+st.markdown("""
+<div class="app-title-wrapper">
+    <div class="title">🧠 Text-to-SQL Generator</div>
+    <div class="subtitle">Convert Natural Language into SQL Instantly</div>
+</div>
+""", unsafe_allow_html=True)
+
+# ---------------- Layout ----------------
+col1, col2 = st.columns(2, gap="large")
+
+# ---------------- Example Handler ----------------
+def load_example():
+    st.session_state.query = st.session_state.example
+
+# ---------------- LEFT ----------------
+with col1:
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("<div class='card-header'>📝 Natural Language Query</div>", unsafe_allow_html=True)
+
+    st.selectbox(
+        "Example Queries",
+        [
+            "",
+            "Select all employees",
+            "Show employees with salary greater than 50000",
+            "Find total number of employees",
+            "Show orders placed after date 2023-01-01"
+            
+        ],
+        key="example",
+        on_change=load_example
+    )
+
+    if st.session_state.live_preview:
+        # one incremental translator per browser session: reuses work from earlier keystrokes
+        if "live" not in st.session_state:
+            st.session_state.live = LivePreview(schema_provider)
+        if st_keyup is not None:
+            query = st_keyup("Enter Query", value=st.session_state.query,
+                             debounce=LIVE_DEBOUNCE_MS, key="live_query")
+        else:
+            query = st.text_input("Enter Query", value=st.session_state.query, key="live_query")
+        query = query or ""
+        if query.strip():
+            preview = st.session_state.live.update(query)
+            if preview.error:
+                st.error(preview.error)
+            else:
+                st.session_state.sql = preview.sql
+                st.session_state.query = query
+                st.caption(f"Translated in {preview.us:,.0f} µs"
+                           + (f" (reused: {preview.reused})" if preview.reused else ""))
+        if st.button("💾 Save to History", use_container_width=True) and query.strip() and st.session_state.sql:
+            if capture is not None:
+                capture.record(query, "streamlit")
+            history.add(session_id, query, st.session_state.sql)
+            st.session_state.history_page = 0
+            st.session_state.result_page = 0
+        submit = False
+    else:
+        with st.form("query_form"):
+            query = st.text_area(
+                "Enter Query",
+                value=st.session_state.query,
+                placeholder="Type your query in plain English...",
+                height=120
+            )
+            submit = st.form_submit_button("⚡ Generate SQL", use_container_width=True)
+
+    if submit:
+        if query.strip():
+            if capture is not None:
+                capture.record(query, "streamlit")
+            try:
+                with st.spinner("🧠 Generating SQL..."):
+                    if st.session_state.simulate_delay:
+                        time.sleep(0.6)
+                    sql = text_to_sql(query, schema_provider)
+                    st.session_state.sql = sql
+                    st.session_state.query = query
+                    history.add(session_id, query, sql)
+                    st.session_state.history_page = 0
+                    st.session_state.result_page = 0
+            except TranslationLimitError as e:
+                st.error(str(e))
+            else:
+                st.success("SQL generated successfully!")
+        else:
+            st.warning("Please enter a query")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# ---------------- RIGHT ----------------
+with col2:
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("<div class='card-header'>✅ Generated SQL</div>", unsafe_allow_html=True)
+
+    if st.session_state.sql:
+        st.text_area(
+            "Generated SQL (Read Only)",
+            value=st.session_state.sql,
+            height=160,
+            disabled=True
+        )
+
+        st.download_button(
+            "📥 Download SQL",
+            st.session_state.sql,
+            file_name="query.sql",
+            mime="text/sql",
+            use_container_width=True
+        )
+    else:
+        st.info("Generated SQL will appear here")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# ---------------- RESULTS ----------------
+if executor is not None and st.session_state.run_query and st.session_state.sql:
+    try:
+        # only this page is read from the database, never the whole result
+        result = executor.page(st.session_state.sql, st.session_state.result_page, RESULT_PAGE_SIZE)
+    except ExecutionError as e:
+        st.error(f"Query failed: {e}")
+    else:
+        st.caption(f"Page {result.page + 1} · {len(result.rows)} rows · {result.elapsed_ms:.1f} ms")
+        st.dataframe([dict(zip(result.columns, row)) for row in result.rows], use_container_width=True)
+        prev_col, _, next_col = st.columns([1, 4, 1])
+        if prev_col.button("◀ Previous", disabled=result.page == 0, key="result_prev"):
+            st.session_state.result_page -= 1
+            st.rerun()
+        if next_col.button("Next ▶", disabled=not result.has_more, key="result_next"):
+            st.session_state.result_page += 1
+            st.rerun()
+
+# ---------------- INDEX ADVISOR ----------------
+with st.expander("🧭 Index Advisor"):
+    st.caption("Explains recent queries from the history and suggests indexes for full table scans.")
+    window = st.slider("Recent queries to analyze", 10, 1000, 200, step=10)
+    if st.button("Analyze", key="advisor_run"):
+        advisor = IndexAdvisor(schema_provider, db_path=os.environ.get("TEXT_TO_SQL_DB"), window=window)
+        for item in reversed(history.page(session_id, 0, window)):
+            advisor.observe(item["query"])
+        scans = advisor.full_scans()
+        if scans:
+            st.markdown("**Full table scans:** " + ", ".join(f"{t} ({n})" for t, n in scans.items()))
+        recs = advisor.recommend(top=10)
+        if recs:
+            st.dataframe(
+                [{"table": r.table, "columns": ", ".join(r.columns), "fixes": r.improved,
+                  "benefit": r.benefit} for r in recs],
+                use_container_width=True,
+            )
+            st.code("\n".join(r.statement for r in recs), language="sql")
+        else:
+            st.info("No index recommendations for these queries")
+
+# ---------------- SIDEBAR HISTORY ----------------
+st.sidebar.markdown("## 🕒 SQL History")
+
+search = st.sidebar.text_input("🔍 Search history", key="history_search")
+if search.strip():
+    items = history.search(session_id, search, limit=HISTORY_PAGE_SIZE)
+    pages = 1
+else:
+    total = history.count(session_id)
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+    st.session_state.history_page = min(st.session_state.history_page, pages - 1)
+    items = history.page(session_id, st.session_state.history_page, HISTORY_PAGE_SIZE)
+
+if items:
+    for item in items:
+        if st.sidebar.button(item["query"], key=f"h{item['id']}"):
+            st.session_state.sql = item["sql"]
+            st.session_state.query = item["query"]
+            st.session_state.result_page = 0
+            st.rerun()
+elif search.strip():
+    st.sidebar.info("No matching queries")
+else:
+    st.sidebar.info("No history yet")
+
+if pages > 1:
+    prev_col, page_col, next_col = st.sidebar.columns([1, 2, 1])
+    if prev_col.button("◀", disabled=st.session_state.history_page == 0):
+        st.session_state.history_page -= 1
+        st.rerun()
+    page_col.caption(f"Page {st.session_state.history_page + 1} of {pages}")
+    if next_col.button("▶", disabled=st.session_state.history_page >= pages - 1):
+        st.session_state.history_page += 1
+        st.rerun()
+
+if st.sidebar.button("🗑️ Clear History", use_container_width=True):
+    history.clear(session_id)
+    st.session_state.history_page = 0
+    st.session_state.sql = ""
+    st.session_state.query = ""
+    st.rerun()
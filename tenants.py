@@ -0,0 +1,219 @@
+"""
+Per-tenant translators with a memory cap.
+
+    registry = TranslatorRegistry(sqlite_loader("/srv/tenants/{tenant}.db"), max_bytes=512 << 20)
+    sql = registry.get("acme").translate("Show customers where city is delhi")
+
+A Translator is compiled on a tenant's first request and kept until the
+estimated size of all compiled translators exceeds `max_bytes`; the least
+recently used ones are evicted first. A translator's memo caches (typo
+lookups, join plans) keep growing after it is compiled, so they are measured
+again before every eviction check. Looking up a compiled translator takes
+no lock (a dict read and one attribute store), so concurrent requests for
+warm tenants never wait on each other; only compiles and evictions lock.
+"""
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+
+from schema import SchemaProvider, SQLiteSchemaProvider
+from texttosql import Translator
+
+_TENANT_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,127}")
+
+def sqlite_loader(pattern, **provider_options):
+    """
+    Loader for one SQLite file per tenant, e.g. "/srv/tenants/{tenant}.db".
+    Tenant names are restricted to letters, digits, "_", "-" and "." so they
+    cannot escape the directory; unknown tenants raise KeyError.
+    """
+    def load(tenant):
+        if not _TENANT_RE.fullmatch(tenant) or ".." in tenant:
+            raise ValueError(f"invalid tenant name {tenant!r}")
+        path = pattern.format(tenant=tenant)
+        if not os.path.exists(path):
+            raise KeyError(tenant)
+        return SQLiteSchemaProvider(path, **provider_options)
+    return load
+
+def _deep_size(obj, seen=None):
+    """Approximate bytes held by `obj` and everything it references (each object counted once)."""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, threading.Thread)):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif not isinstance(o, (str, bytes, int, float, bool, re.Pattern)) and o is not None:
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for cls in type(o).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    value = getattr(o, name, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+def _measure(translator):
+    """(bytes without the memo caches, bytes of the memo caches, memo entries)"""
+    caches = translator.schema.memo_caches()
+    base = _deep_size((translator.schema, translator.phrase_rules), {id(c) for c in caches})
+    return base, _deep_size(caches), sum(map(len, caches))
+
+class _Entry:
+    __slots__ = ("translator", "source", "base", "size", "memo_entries", "last_used", "checked_at")
+
+    def __init__(self, translator, source, last_used, measured=None):
+        self.translator = translator
+        self.source = source  # the provider, re-checked every `refresh` seconds
+        self.base, memo, self.memo_entries = measured or _measure(translator)
+        self.size = self.base + memo
+        self.last_used = last_used
+        self.checked_at = time.monotonic()
+
+    def remeasure(self):
+        """Measure the memo caches again if they changed; returns the change in size."""
+        caches = self.translator.schema.memo_caches()
+        entries = sum(map(len, caches))
+        if entries == self.memo_entries:
+            return 0
+        try:
+            memo = _deep_size(caches)
+        except RuntimeError:  # a cache changed size while it was walked; try again next time
+            return 0
+        old = self.size
+        self.memo_entries = entries
+        self.size = self.base + memo
+        return self.size - old
+
+class TranslatorRegistry:
+    """
+    Lazily compiled Translators keyed by tenant, evicted least-recently-used
+    once their estimated total size passes `max_bytes`.
+
+    `loader(tenant)` returns the tenant's schema: a SchemaSnapshot or a
+    SchemaProvider (KeyError for unknown tenants). For providers, the catalog is
+    re-checked at most every `refresh` seconds and the translator swapped when
+    the schema changed; None never re-checks (call invalidate() after a
+    migration). Other keyword arguments are passed to Translator, e.g.
+    dialect="postgres" or default_limit=500; values= (a ValueIndex or
+    ValueIndexer) is off unless given.
+    """
+
+    def __init__(self, loader, max_bytes=256 << 20, refresh=None, **translator_options):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        # the module-level value index describes another database's data
+        translator_options.setdefault("values", None)
+        self.translator_options = translator_options
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}
+        self._bytes = 0
+        self._clock = itertools.count()
+        self._lock = threading.Lock()
+        self._compiling = {}  # tenant -> lock held while it compiles
+
+    def get(self, tenant):
+        """The tenant's Translator, compiling it on first use."""
+        entry = self._entries.get(tenant)
+        if entry is not None:
+            entry.last_used = next(self._clock)
+            if self.refresh is None or time.monotonic() - entry.checked_at < self.refresh:
+                return entry.translator
+        return self._load(tenant, entry)
+
+    def translate(self, tenant, text, dialect=None):
+        return self.get(tenant).translate(text, dialect)
+
+    def _load(self, tenant, stale):
+        with self._lock:
+            lock = self._compiling.setdefault(tenant, threading.Lock())
+        # one compile per tenant; other tenants keep being served meanwhile
+        try:
+            with lock:
+                entry = self._entries.get(tenant)
+                if entry is not None and entry is not stale:
+                    return entry.translator
+                if stale is not None and isinstance(stale.source, SchemaProvider):
+                    entry = self._recheck(stale)
+                else:
+                    entry = self._compile(tenant)
+                with self._lock:
+                    old = self._entries.get(tenant)
+                    if old is not None:
+                        self._bytes -= old.size
+                    self._entries[tenant] = entry
+                    self._bytes += entry.size
+                    self._evict(keep=tenant)
+        finally:
+            # also when the loader fails: tenant names come from clients and must not pile up here
+            with self._lock:
+                if self._compiling.get(tenant) is lock:
+                    del self._compiling[tenant]
+        return entry.translator
+
+    def _compile(self, tenant):
+        source = self.loader(tenant)
+        translator = Translator(source, **self.translator_options)
+        # build the lazy indexes now, so the size estimate is complete and
+        # the first typo does not pay for them
+        translator.schema.index.fuzzy()
+        translator.schema.fk_graph
+        self.misses += 1
+        return _Entry(translator, source if isinstance(source, SchemaProvider) else None, next(self._clock))
+
+    def _recheck(self, stale):
+        snapshot = stale.source.snapshot()
+        if snapshot is stale.translator.schema:
+            entry = _Entry(stale.translator, stale.source, stale.last_used,
+                           (stale.base, stale.size - stale.base, stale.memo_entries))
+        else:
+            translator = stale.translator.with_schema(snapshot)
+            snapshot.index.fuzzy()
+            snapshot.fk_graph
+            entry = _Entry(translator, stale.source, stale.last_used)
+        return entry
+
+    def _evict(self, keep):
+        # called with self._lock held; a full scan is fine next to a compile
+        for entry in self._entries.values():
+            self._bytes += entry.remeasure()
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            tenant = min((t for t in self._entries if t != keep),
+                         key=lambda t: self._entries[t].last_used)
+            self._bytes -= self._entries.pop(tenant).size
+            self.evictions += 1
+
+    def invalidate(self, tenant=None):
+        """Drop one tenant's translator (or all of them); the next request recompiles."""
+        with self._lock:
+            if tenant is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(tenant, None)
+                if entry is not None:
+                    self._bytes -= entry.size
+
+    def __contains__(self, tenant):
+        return tenant in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"translators": len(self._entries), "bytes": self._bytes,
+                "max_bytes": self.max_bytes, "misses": self.misses, "evictions": self.evictions}
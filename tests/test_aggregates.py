@@ -0,0 +1,41 @@
+import pytest
+
+from texttosql import Translator, text_to_sql
+
+@pytest.mark.parametrize("question, expected", [
+    ("Find total number of employees", "SELECT COUNT(*) FROM employees;"),
+    ("average salary per department", "SELECT department, AVG(salary) FROM employees GROUP BY department;"),
+    ("count of orders per status", "SELECT status, COUNT(*) FROM orders GROUP BY status;"),
+    ("max salary per department", "SELECT department, MAX(salary) FROM employees GROUP BY department;"),
+    ("total amount of orders where status = pending",
+     "SELECT SUM(amount) FROM orders WHERE status = 'pending';"),
+])
+def test_aggregates_and_grouping(question, expected):
+    assert text_to_sql(question) == expected
+
+@pytest.mark.parametrize("question, expected", [
+    ("top 10 products by price", "SELECT * FROM products ORDER BY price DESC LIMIT 10;"),
+    ("bottom 3 employees by salary", "SELECT * FROM employees ORDER BY salary LIMIT 3;"),
+    ("latest 5 orders", "SELECT * FROM orders ORDER BY order_date DESC LIMIT 5;"),
+    ("products sorted by price desc", "SELECT * FROM products ORDER BY price DESC LIMIT 1000;"),
+])
+def test_ordering_and_top_n(question, expected):
+    assert text_to_sql(question) == expected
+
+def test_sort_and_group_phrases_are_not_conditions():
+    assert "WHERE" not in text_to_sql("products sorted by price desc")
+    assert "WHERE" not in text_to_sql("sum of amount by status sorted by amount desc")
+    sql = text_to_sql("count of orders per status where amount > 100")
+    assert "WHERE amount > 100 GROUP BY status" in sql
+
+def test_aggregate_phrase_is_not_a_condition():
+    assert text_to_sql("show maximum salary of employees") == "SELECT MAX(salary) FROM employees;"
+
+def test_aggregate_query_only_sorts_on_grouped_or_aggregated_columns():
+    assert "ORDER BY" not in text_to_sql("count of orders sorted by amount")
+
+def test_default_limit_applies_to_row_queries_only():
+    t = Translator(default_limit=50)
+    assert t.translate("show all students") == "SELECT * FROM students LIMIT 50;"
+    assert t.translate("count students") == "SELECT COUNT(*) FROM students;"
+    assert Translator(default_limit=0).translate("show all students") == "SELECT * FROM students;"
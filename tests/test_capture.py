@@ -0,0 +1,40 @@
+import os
+import time
+
+import pytest
+
+from capture import CaptureLog, read_capture
+
+def test_records_are_written_and_read_back(tmp_path):
+    log = CaptureLog(str(tmp_path / "capture-{pid}.log"), sample_rate=1.0, flush_interval=0.01)
+    log.record("show all students", "web")
+    log.close()
+    assert [(q, src) for _, q, src in read_capture(log.path)] == [("show all students", "web")]
+
+def test_nothing_is_opened_before_the_first_record(tmp_path):
+    log = CaptureLog(str(tmp_path / "capture-{pid}.log"), sample_rate=1.0)
+    assert log.path is None and not os.listdir(tmp_path)
+    log.close()
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_its_own_writer_and_file(tmp_path):
+    log = CaptureLog(str(tmp_path / "capture-{pid}.log"), sample_rate=1.0, flush_interval=0.01)
+    log.record("parent")
+    pid = os.fork()
+    if pid == 0:  # child: report through the exit status only
+        ok = False
+        try:
+            for i in range(10):
+                log.record(f"child {i}")
+            deadline = time.monotonic() + 5
+            while log.written < 10 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            ok = log.written == 10 and log.path.endswith(f"-{os.getpid()}.log")
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    log.close()
+    assert os.waitstatus_to_exitcode(status) == 0
+    child_log = str(tmp_path / f"capture-{pid}.log")
+    assert [q for _, q, _ in read_capture(child_log)] == [f"child {i}" for i in range(10)]
+    assert [q for _, q, _ in read_capture(log.path)] == ["parent"]
@@ -0,0 +1,55 @@
+import pytest
+
+from conditions import parse_conditions
+from dialects import get_dialect
+from texttosql import text_to_sql
+
+COLUMNS = {"age", "city", "salary", "status", "amount", "department"}
+
+_sqlite = get_dialect("sqlite")
+
+def where(text, columns=COLUMNS):
+    """The rendered condition for `text`, or None when nothing was parsed."""
+    tree, _ = parse_conditions(text, columns, {"orders": (), "customers": ()}, default_date_col="order_date")
+    return _sqlite.condition(tree) if tree is not None else None
+
+@pytest.mark.parametrize("text, expected", [
+    ("age > 20 and (city = delhi or city = pune)", "age > 20 AND (city = 'delhi' OR city = 'pune')"),
+    ("salary not between 10 and 20 and city in (delhi, pune)",
+     "salary NOT BETWEEN 10 AND 20 AND city IN ('delhi', 'pune')"),
+    ("not status = closed", "NOT (status = 'closed')"),
+    ("after 2023-01-01", "order_date > '2023-01-01'"),
+    ("age = > 25", "age > 25"),  # "is greater than" after normalization
+])
+def test_parses(text, expected):
+    assert where(text) == expected
+
+def test_implied_equality_with_literal_and_word():
+    assert where("age 25") == "age = 25"
+    assert where("status pending") == "status = 'pending'"
+
+def test_implied_equality_word_must_end_the_segment():
+    assert where("city of customers") is None
+
+def test_unknown_words_are_not_columns():
+    assert where("placed in 2023") is None
+    assert where("live in mumbai") is None
+    assert where("cost > 10") is None
+
+def test_nesting_limit_counts_failure():
+    tree, parser = parse_conditions("not " * 100 + "age > 1", COLUMNS)
+    assert parser.failures == 1
+    assert tree is not None
+
+@pytest.mark.parametrize("question, expected", [
+    ("Get orders with status pending", "WHERE status = 'pending'"),
+    ("show customer with city delhi", "WHERE city = 'delhi'"),
+    ("show employees with department sales", "WHERE department = 'sales'"),
+    ("Show customers with age greater than 25 and city equals delhi", "WHERE age > 25 AND city = 'delhi'"),
+])
+def test_questions_keep_their_filters(question, expected):
+    assert expected in text_to_sql(question)
+
+@pytest.mark.parametrize("question", ["orders placed in 2023", "show customers who live in mumbai"])
+def test_questions_without_conditions_have_no_where(question):
+    assert "WHERE" not in text_to_sql(question)
@@ -0,0 +1,39 @@
+import sqlite3
+
+from history import HistoryStore
+
+def test_sessions_do_not_see_each_other(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.db"))
+    store.add("a", "show orders", "SELECT * FROM orders;")
+    store.add("b", "show customers", "SELECT * FROM customers;")
+    assert [e["query"] for e in store.page("a")] == ["show orders"]
+    assert store.count("b") == 1
+    assert store.search("a", "customers") == []
+    assert [e["query"] for e in store.search("b", "cust")] == ["show customers"]
+
+def test_clear_only_touches_one_session(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.db"))
+    store.add("a", "show orders", "SELECT * FROM orders;")
+    store.add("b", "show customers", "SELECT * FROM customers;")
+    store.clear("a")
+    assert store.count("a") == 0 and store.count("b") == 1
+
+def test_capacity_is_per_session(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.db"), capacity=3)
+    for i in range(5):
+        store.add("a", f"question {i}", "SELECT 1;")
+    store.add("b", "other", "SELECT 2;")
+    assert [e["query"] for e in store.page("a")] == ["question 4", "question 3", "question 2"]
+    assert store.count("b") == 1
+
+def test_file_from_before_sessions_is_migrated(tmp_path):
+    path = str(tmp_path / "h.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                 " query TEXT NOT NULL, sql TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.execute("INSERT INTO history (query, sql, created_at) VALUES ('old', 'SELECT 1;', 0)")
+    conn.commit()
+    conn.close()
+    store = HistoryStore(path)
+    store.add("a", "new", "SELECT 2;")
+    assert [e["query"] for e in store.page("a")] == ["new"]
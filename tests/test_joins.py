@@ -0,0 +1,59 @@
+from schema import ForeignKeyGraph, SchemaSnapshot
+from texttosql import infer_join_clause, resolve_schema, text_to_sql
+
+SHOP = SchemaSnapshot(
+    {
+        "customers": ["id", "name", "city"],
+        "orders": ["id", "customer_id", "product_id", "amount"],
+        "products": ["id", "name", "price"],
+        "suppliers": ["id", "name"],
+        "employees": ["id", "name", "manager_id"],
+    },
+    {
+        ("orders", "customer_id"): ("customers", "id"),
+        ("orders", "product_id"): ("products", "id"),
+        ("employees", "manager_id"): ("employees", "id"),
+    },
+)
+
+def test_customers_and_products_join_through_orders():
+    assert infer_join_clause(["customers", "products"], SHOP) == (
+        "customers JOIN orders ON orders.customer_id = customers.id "
+        "JOIN products ON orders.product_id = products.id")
+
+def test_multi_hop_plan_pulls_in_the_bridge_table():
+    plan = SHOP.fk_graph.plan(["products", "customers"])
+    assert [table for table, _ in plan] == ["products", "orders", "customers"]
+    assert plan[1][1] == ("orders", "product_id", "products", "id")
+    assert plan[2][1] == ("orders", "customer_id", "customers", "id")
+
+def test_unreachable_table_falls_back_to_cross_join():
+    assert infer_join_clause(["customers", "suppliers"], SHOP) == "customers, suppliers"
+    plan = SHOP.fk_graph.plan(["customers", "suppliers"])
+    assert plan[1] == ("suppliers", None)
+
+def test_self_referencing_fk_is_ignored():
+    graph = SHOP.fk_graph
+    assert graph.neighbors("employees") == []
+    assert graph.plan(["employees", "customers"])[1] == ("customers", None)
+
+def test_naming_convention_adds_undeclared_edges():
+    graph = ForeignKeyGraph({"customers": ["id"], "orders": ["id", "customer_id"]}, {})
+    assert graph.plan(["customers", "orders"])[1] == ("orders", ("orders", "customer_id", "customers", "id"))
+
+def test_plans_are_memoized_per_table_tuple():
+    graph = ForeignKeyGraph(SHOP.tables, SHOP.foreign_keys)
+    first = graph.plan(["customers", "products"])
+    assert graph.plan(("customers", "products")) is first
+    assert graph.plan(["products", "customers"]) is not first
+    assert len(graph._plans) == 2
+
+def test_graph_is_per_schema_version():
+    assert SHOP.fk_graph is SHOP.fk_graph
+    assert resolve_schema().fk_graph is not SHOP.fk_graph
+
+def test_text_to_sql_joins_through_bridge_table():
+    sql = text_to_sql("customers and products", SHOP)
+    assert "JOIN orders ON orders.customer_id = customers.id" in sql
+    assert "JOIN products ON orders.product_id = products.id" in sql
+    assert "," not in sql.split(" FROM ")[1]
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+import metrics
+from api import build_response
+from texttosql import Translator, TranslationLimitError, parse_single_condition
+
+def _translator(max_chars=None, max_fragments=None, time_budget_ms=None):
+    return Translator(limits=(max_chars, max_fragments, time_budget_ms), cache=None, query_cache=None)
+
+def test_long_input_is_rejected_before_any_work():
+    t = _translator(max_chars=50)
+    assert t.translate("show all students")
+    with pytest.raises(TranslationLimitError) as e:
+        t.translate("show all students " + "x" * 50)
+    assert e.value.code == "input_too_long" and e.value.limit == 50
+    assert e.value.as_dict()["code"] == "input_too_long"
+
+def test_too_many_condition_fragments():
+    question = "show employees where " + " and ".join(f"salary > {i}" for i in range(10))
+    assert "WHERE" in _translator(max_fragments=10).translate(question)
+    with pytest.raises(TranslationLimitError) as e:
+        _translator(max_fragments=9).translate(question)
+    assert e.value.code == "too_many_conditions"
+
+def test_time_budget_stops_at_a_stage_boundary():
+    with pytest.raises(TranslationLimitError) as e:
+        _translator(time_budget_ms=1e-9).translate("show employees where salary > 10")
+    assert e.value.code == "time_budget_exceeded"
+
+def test_every_entry_point_is_guarded():
+    t = _translator(max_chars=10)
+    for call in (t.translate, t.translate_params, t.parse):
+        with pytest.raises(TranslationLimitError):
+            call("show all students please")
+
+def test_rejections_are_counted():
+    metrics.registry.reset()
+    with pytest.raises(TranslationLimitError):
+        _translator(max_chars=5).translate("show all students")
+    assert metrics.registry.snapshot()["counters"]["texttosql_rejected_total"] == 1
+
+def test_batch_reports_the_code_per_item():
+    results = _translator(max_chars=20).translate_batch(["show all students", "show all students " * 3])
+    assert results[0].error is None and results[1].code == "input_too_long"
+    body = build_response(results, False, "v1", 1.0)
+    assert "code" not in body["results"][0] and body["results"][1]["code"] == "input_too_long"
+
+def test_long_word_is_linear_in_legacy_parser():
+    start = time.perf_counter()
+    parse_single_condition("a" * 40000)
+    assert time.perf_counter() - start < 1.0
+
+def test_deep_nesting_does_not_recurse_without_bound():
+    question = "show employees where " + "(" * 500 + "salary > 1" + ")" * 500
+    assert "salary > 1" in _translator().translate(question)
+    assert "salary > 1" in _translator().translate("show employees where " + "not " * 500 + "salary > 1")
@@ -0,0 +1,60 @@
+import pytest
+
+from live import LivePreview
+from texttosql import Translator
+
+QUESTIONS = [
+    "Show customers with age greater than 25 and city equals delhi",
+    "Get orders where amount > 2000 and status = pending or status = shipped",
+    "average salary per department where salary between 10 and 20",
+    "show name of customers and products where amount > 100",
+]
+
+def _typed(question):
+    """Every prefix of `question`, as typed, then backspaced halfway and retyped."""
+    prefixes = [question[:i] for i in range(1, len(question) + 1)]
+    half = len(prefixes) // 2
+    return prefixes + prefixes[half:-1][::-1] + prefixes[half:]
+
+@pytest.mark.parametrize("question", QUESTIONS)
+def test_every_keystroke_matches_a_full_translation(question):
+    preview = LivePreview()
+    full = Translator(cache=None, query_cache=None)
+    for text in _typed(question):
+        assert preview.update(text).sql == full.translate(text), text
+
+def test_case_or_trailing_space_edit_reuses_the_last_result():
+    preview = LivePreview()
+    first = preview.update("show all students")
+    again = preview.update("Show all students ")
+    assert again.reused == "unchanged" and again.sql == first.sql
+
+def test_backspacing_reuses_the_session_history():
+    preview = LivePreview()
+    preview.update("show employees where salary > 10")
+    preview.update("show employees where salary > 100")
+    p = preview.update("show employees where salary > 10")
+    assert p.reused == "history" and p.sql.endswith("WHERE salary > 10 LIMIT 1000;")
+    assert preview.reused == 1 and preview.updates == 3
+
+def test_history_is_bounded():
+    preview = LivePreview(history=2)
+    for n in range(5):
+        preview.update(f"show employees where salary > {n}")
+    assert len(preview._history) == 2
+
+def test_condition_fragments_are_remembered_per_table():
+    preview = LivePreview()
+    preview.update("show employees where salary > 10 and department = sales")
+    ((columns, _, fragments),) = preview._fragments.values()
+    assert "salary" in columns and len(fragments) >= 2
+
+def test_limit_errors_are_reported_not_raised():
+    preview = LivePreview(limits=(10, None, None))
+    p = preview.update("show all students please")
+    assert p.sql is None and "limit" in p.error
+    assert preview.update("students").error is None
+
+def test_partial_questions_stay_out_of_shared_caches():
+    preview = LivePreview()
+    assert preview.translator._cache is None and preview.translator._query_cache is None
@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from executor import QueryExecutor
+from texttosql import Translator, text_to_sql_params
+
+def test_values_and_limit_become_placeholders():
+    p = text_to_sql_params("Show employees with salary >= 50000 and department equals sales")
+    assert p.sql == "SELECT salary, department FROM employees WHERE salary >= ? AND department = ? LIMIT ?;"
+    assert p.params == [50000, "sales", 1000]
+
+def test_between_and_in_bind_every_value():
+    assert text_to_sql_params("salary between 10 and 20 of employees").params == [10, 20, 1000]
+    p = text_to_sql_params("customers with city in (delhi, pune)")
+    assert "IN (?, ?)" in p.sql and p.params == ["delhi", "pune", 1000]
+
+def test_named_style():
+    p = text_to_sql_params("show employees with department equals sales", style="named")
+    assert ":p1" in p.sql and p.params == {"p1": "sales", "p2": 1000}
+
+def test_unknown_style_is_rejected():
+    with pytest.raises(ValueError):
+        text_to_sql_params("show all students", style="format")
+
+def test_fingerprint_is_the_query_shape():
+    a = text_to_sql_params("Show employees with salary >= 50000 and department equals sales")
+    b = text_to_sql_params("Show employees with salary >= 70000 and department equals hr")
+    c = text_to_sql_params("Show employees with salary <= 50000 and department equals sales")
+    assert a.fingerprint == b.fingerprint != c.fingerprint
+    assert a.params != b.params
+
+def test_fingerprint_depends_on_dialect_and_style():
+    t = Translator()
+    prints = {t.translate_params("show all students", dialect=d).fingerprint for d in ("sqlite", "postgres")}
+    prints.add(t.translate_params("show all students", style="named").fingerprint)
+    assert len(prints) == 3
+
+def test_quotes_in_values_stay_in_the_parameters():
+    p = text_to_sql_params("show employees with department = \"o'brien\"")
+    assert "o'brien" not in p.sql and p.params[0] == "o'brien"
+
+@pytest.mark.parametrize("style", ["qmark", "named"])
+def test_executes_with_the_same_rows_as_inlined_sql(tmp_path, style):
+    path = str(tmp_path / "shop.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE employees (name TEXT, salary INTEGER, department TEXT)")
+    conn.executemany("INSERT INTO employees VALUES (?, ?, ?)",
+                     [("a", 60000, "sales"), ("b", 40000, "sales"), ("c", 90000, "hr")])
+    conn.commit()
+    conn.close()
+    question = "Show employees with salary >= 50000 and department equals sales"
+    p = text_to_sql_params(question, style=style)
+    executor = QueryExecutor(path)
+    assert executor.page(p.sql, params=p.params).rows == [(60000, "sales")]
+    assert [rows for _, rows in executor.stream(p.sql, params=p.params)] == [[(60000, "sales")]]
@@ -0,0 +1,61 @@
+import sqlite3
+
+from schema import InformationSchemaProvider, SQLiteSchemaProvider
+
+def _catalog():
+    """A SQLite connection with a hand-filled information_schema, standing in for PostgreSQL."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("ATTACH ':memory:' AS information_schema")
+    conn.executescript("""
+        CREATE TABLE information_schema.columns (
+            table_schema, table_name, column_name, data_type, ordinal_position);
+        CREATE TABLE information_schema.table_constraints (
+            constraint_schema, constraint_name, table_schema, table_name, constraint_type);
+        CREATE TABLE information_schema.key_column_usage (
+            constraint_name, table_schema, table_name, column_name);
+        CREATE TABLE information_schema.constraint_column_usage (
+            constraint_schema, constraint_name, table_name, column_name);
+        INSERT INTO information_schema.columns VALUES
+            ('public', 'customers', 'id', 'integer', 1),
+            ('public', 'customers', 'name', 'text', 2),
+            ('public', 'orders', 'id', 'integer', 1),
+            ('public', 'orders', 'buyer', 'integer', 2),
+            ('other', 'secrets', 'id', 'integer', 1);
+    """)
+    return conn
+
+def _add_fk(conn):
+    conn.executescript("""
+        INSERT INTO information_schema.table_constraints
+            VALUES ('public', 'orders_buyer_fk', 'public', 'orders', 'FOREIGN KEY');
+        INSERT INTO information_schema.key_column_usage VALUES ('orders_buyer_fk', 'public', 'orders', 'buyer');
+        INSERT INTO information_schema.constraint_column_usage
+            VALUES ('public', 'orders_buyer_fk', 'customers', 'id');
+    """)
+
+def test_information_schema_reads_one_schema():
+    provider = InformationSchemaProvider(_catalog(), refresh_interval=0)
+    snap = provider.snapshot()
+    assert set(snap.tables) == {"customers", "orders"}
+    assert snap.tables["orders"] == ("id", "buyer")
+
+def test_information_schema_sees_a_new_foreign_key_on_existing_columns():
+    conn = _catalog()
+    provider = InformationSchemaProvider(conn, refresh_interval=0)
+    before = provider.snapshot()
+    assert before.foreign_keys == {}
+    _add_fk(conn)
+    after = provider.snapshot()
+    assert after.version != before.version
+    assert after.foreign_keys == {("orders", "buyer"): ("customers", "id")}
+
+def test_sqlite_fk_without_target_column_uses_the_parent_primary_key(tmp_path):
+    path = str(tmp_path / "shop.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (code TEXT PRIMARY KEY, name TEXT);
+        CREATE TABLE orders (id INTEGER PRIMARY KEY, customer TEXT REFERENCES customers);
+    """)
+    conn.close()
+    snap = SQLiteSchemaProvider(path).snapshot()
+    assert snap.foreign_keys == {("orders", "customer"): ("customers", "code")}
@@ -0,0 +1,48 @@
+import pytest
+
+from schema import SchemaSnapshot
+from tenants import TranslatorRegistry
+
+TENANTS = {
+    "acme": SchemaSnapshot({"customers": ["id", "name", "city"], "orders": ["id", "customer_id", "amount"]}),
+    "globex": SchemaSnapshot({"employees": ["id", "name", "salary"]}),
+}
+
+def loader(tenant):
+    return TENANTS[tenant]
+
+def test_each_tenant_gets_its_own_schema():
+    registry = TranslatorRegistry(loader)
+    assert "FROM customers" in registry.translate("acme", "show customers")
+    assert "FROM employees" in registry.translate("globex", "show employees")
+    assert registry.get("acme") is registry.get("acme")
+
+def test_unknown_tenants_do_not_accumulate():
+    registry = TranslatorRegistry(loader)
+    for i in range(100):
+        with pytest.raises(KeyError):
+            registry.get(f"bogus-{i}")
+    assert registry._compiling == {}
+    assert len(registry) == 0
+
+def test_memo_cache_growth_is_counted_before_eviction():
+    registry = TranslatorRegistry(loader)
+    translator = registry.get("acme")
+    before = registry.stats()["bytes"]
+    for i in range(200):
+        translator.translate(f"show custmers number{i}")
+        translator.schema.index._fuzzy_key(f"word{i}")
+    registry.get("globex")  # a compile re-measures the others before evicting
+    after_acme = registry._entries["acme"].size
+    assert after_acme > before
+    assert registry.stats()["bytes"] == sum(e.size for e in registry._entries.values())
+
+def test_least_recently_used_tenant_is_evicted():
+    sizes = TranslatorRegistry(loader)
+    sizes.get("acme")
+    one = sizes.stats()["bytes"]
+    registry = TranslatorRegistry(loader, max_bytes=one + 1)
+    registry.get("acme")
+    registry.get("globex")
+    assert "acme" not in registry and "globex" in registry
+    assert registry.evictions == 1
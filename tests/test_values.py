@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from schema import SQLiteSchemaProvider
+from texttosql import Translator
+from values import ValueIndex, ValueIndexer
+
+CITIES = ["Delhi", "Pune", "New Delhi"]
+
+@pytest.fixture
+def shop(tmp_path):
+    path = str(tmp_path / "shop.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, city TEXT);
+        CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, status TEXT, amount REAL);
+    """)
+    conn.executemany("INSERT INTO customers (name, city) VALUES (?, ?)",
+                     [(f"name {i}", CITIES[i % 3]) for i in range(30)])
+    conn.executemany("INSERT INTO orders (customer_id, status, amount) VALUES (?, ?, ?)",
+                     [(i, ("pending", "shipped")[i % 2], i) for i in range(30)])
+    conn.commit()
+    conn.close()
+    return path
+
+def test_lookup_is_case_insensitive_and_keeps_the_stored_spelling():
+    index = ValueIndex({("customers", "city"): ["Delhi", "New Delhi"]})
+    assert index.lookup("DELHI") == [("customers", "city", "Delhi")]
+    assert index.lookup("mumbai") == []
+
+def test_find_prefers_the_longest_phrase():
+    index = ValueIndex({("customers", "city"): ["Delhi", "New Delhi"]})
+    assert [p for p, _ in index.find("customers in new delhi or delhi")] == ["new delhi", "delhi"]
+
+def test_stopwords_and_numbers_are_never_values():
+    index = ValueIndex({("t", "c"): ["show", "All", "2023", "ok"]})
+    assert len(index) == 1 and index.lookup("ok")
+
+def test_version_follows_content():
+    a = ValueIndex({("t", "c"): ["x", "y"]})
+    assert a.version == ValueIndex({("t", "c"): ["y", "x"]}).version
+    assert a.version != ValueIndex({("t", "c"): ["x", "z"]}).version
+
+def test_indexer_keeps_only_low_cardinality_text_columns(shop):
+    index = ValueIndexer(shop, SQLiteSchemaProvider(shop)).snapshot()
+    assert index.columns == (("customers", "city"), ("orders", "status"))
+
+def test_bare_values_filter_their_column(shop):
+    provider = SQLiteSchemaProvider(shop)
+    t = Translator(provider, values=ValueIndexer(shop, provider), cache=None, query_cache=None)
+    assert "WHERE city = 'Delhi'" in t.translate("customers in delhi")
+    assert "WHERE city = 'New Delhi'" in t.translate("customers in new delhi")
+    assert "WHERE status IN ('shipped', 'pending')" in t.translate("shipped or pending orders")
+
+def test_value_of_several_columns_is_left_alone():
+    index = ValueIndex({("customers", "city"): ["Pune"], ("customers", "state"): ["Pune"]})
+    assert len(index.lookup("pune")) == 2
+
+def test_accepts_an_open_connection(shop):
+    conn = sqlite3.connect(shop)
+    indexer = ValueIndexer(conn, SQLiteSchemaProvider(shop))
+    assert len(indexer.snapshot()) == 5 and indexer.last_error is None
+    conn.execute("SELECT 1")  # not closed by the indexer
+
+def test_unchanged_tables_keep_the_same_index(shop):
+    indexer = ValueIndexer(shop, SQLiteSchemaProvider(shop), refresh_interval=0)
+    first = indexer.snapshot()
+    assert indexer.snapshot() is first
+    conn = sqlite3.connect(shop)
+    conn.execute("INSERT INTO orders (customer_id, status, amount) VALUES (1, 'cancelled', 1)")
+    conn.commit()
+    conn.close()
+    assert indexer.snapshot().lookup("cancelled") == [("orders", "status", "cancelled")]
+
+def test_without_rowid_tables_are_sampled(tmp_path):
+    path = str(tmp_path / "kv.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tickets (code TEXT PRIMARY KEY, status TEXT) WITHOUT ROWID")
+    conn.executemany("INSERT INTO tickets VALUES (?, ?)", [(f"t{i}", ("open", "closed")[i % 2]) for i in range(20)])
+    conn.commit()
+    conn.close()
+    indexer = ValueIndexer(path, SQLiteSchemaProvider(path))
+    assert indexer.snapshot().lookup("open") and indexer.last_error is None
+
+def test_failed_refresh_keeps_the_last_index(shop):
+    conn = sqlite3.connect(shop)
+    indexer = ValueIndexer(lambda: conn, SQLiteSchemaProvider(shop), refresh_interval=0)
+    first = indexer.snapshot()
+    conn.close()
+    assert indexer.snapshot(force=True) is first
+    assert indexer.errors == 1 and indexer.last_error is not None
+
+def test_memory_budget_keeps_the_lowest_cardinality_columns(shop):
+    indexer = ValueIndexer(shop, SQLiteSchemaProvider(shop), max_bytes=300)
+    index = indexer.snapshot()
+    assert index.columns == (("orders", "status"),)
+    assert indexer.skipped == (("customers", "city"),)
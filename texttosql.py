@@ -1,9 +1,23 @@
+import itertools
+import os
 import re
+import time
+from collections import deque, namedtuple
+
+from schema import SchemaSnapshot
+from metrics import registry as metrics
+from conditions import BoolOp, ConditionParser, Pred, parse_fragments, tokenize
+from query import Column, Join, Query
+from dialects import get_dialect
+from cache import MemoryBackend
+from values import ValueIndex
 
 # --------------------------
 # Schema & FK definitions
 # --------------------------
-# Adjust these to match your real DB schema if needed.
+# Built-in demo schema, used when text_to_sql() is not given a schema.
+# To compile against a real database pass a SchemaSnapshot or a
+# schema.SQLiteSchemaProvider / InformationSchemaProvider as `schema=`.
 tables = {
     "students":       ["id", "name", "age", "score", "class"],
     "employees":      ["id", "name", "age", "salary", "email", "department", "manager_id"],
@@ -17,45 +31,133 @@ foreign_keys = {
     ("orders", "customer_id"): ("customers", "id"),
     ("orders", "product_id"): ("products", "id"),
     ("employees", "manager_id"): ("employees", "id"),
-    ("products", "category"): ("categories", "name")  # example if categories table exists
 }
 
 # --------------------------
 # Utilities & Normalization
 # --------------------------
+# Phrase -> operator rewrite rules applied by normalize_text.
+# Phrases are matched on word boundaries; longer phrases win over shorter ones.
+PHRASE_RULES = [
+    ("greater than", ">"),
+    ("more than", ">"),
+    ("above", ">"),
+    ("less than", "<"),
+    ("below", "<"),
+    ("at least", ">="),
+    ("minimum", ">="),
+    ("at most", "<="),
+    ("maximum", "<="),
+    ("equals", "="),
+    ("is", "="),
+]
+
+def _trie_regex(phrases):
+    """
+    Build a regex source for a set of literal phrases by folding them into a
+    character trie, so shared prefixes are only tried once per position.
+    """
+    trie = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        end = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # greedy optional keeps the longest phrase first when a shorter one also ends here
+        return f"(?:{body})?" if end else body
+
+    return emit(trie)
+
+class PhraseRewriter:
+    """
+    Rewrites phrases to operators in a single left-to-right pass.
+    Rules are compiled once into one trie-shaped pattern; adding synonyms
+    recompiles the pattern, so per-call cost does not depend on how the
+    rules were registered.
+    """
+
+    def __init__(self, rules=()):
+        self._rules = {}
+        self._pattern = None
+        self.add_rules(rules)
+
+    def add_rules(self, rules):
+        """Add or override (phrase, replacement) pairs and recompile."""
+        for phrase, repl in rules:
+            phrase = " ".join(phrase.lower().split())
+            if phrase:
+                self._rules[phrase] = repl
+        self._compile()
+
+    def _compile(self):
+        if not self._rules:
+            self._pattern = None
+            return
+        # phrases written with one space also match runs of whitespace in the input
+        src = _trie_regex(self._rules).replace(r"\ ", r"\s+")
+        self._pattern = re.compile(r"\b(?:" + src + r")\b")
+
+    @property
+    def rules(self):
+        return dict(self._rules)
+
+    def rewrite(self, t: str) -> str:
+        if self._pattern is None:
+            return t
+        rules = self._rules
+        return self._pattern.sub(lambda m: rules[" ".join(m.group(0).split())], t)
+
+_phrase_rewriter = PhraseRewriter(PHRASE_RULES)
+
+def add_phrase_rules(rules):
+    """Register extra phrase -> operator synonyms, e.g. [("exceeds", ">")]."""
+    _phrase_rewriter.add_rules(rules)
+    _reset_default_translator()
+
 def normalize_text(t: str) -> str:
     t = t.lower().strip()
     # common phrasing -> operator normalization
-    t = re.sub(r"\bgreater than\b", ">", t)
-    t = re.sub(r"\bmore than\b", ">", t)
-    t = re.sub(r"\babove\b", ">", t)
-    t = re.sub(r"\bless than\b", "<", t)
-    t = re.sub(r"\bbelow\b", "<", t)
-    t = re.sub(r"\bat least\b", ">=", t)
-    t = re.sub(r"\bminimum\b", ">=", t)
-    t = re.sub(r"\bat most\b", "<=", t)
-    t = re.sub(r"\bmaximum\b", "<=", t)
-    t = re.sub(r"\bequals\b", "=", t)
-    t = re.sub(r"\bis\b", "=", t)
-    return t
-
-def find_tables(text: str):
-    found = []
-    for t in tables:
-        if re.search(r"\b" + re.escape(t) + r"\b", text):
-            found.append(t)
-    return found
+    return _phrase_rewriter.rewrite(t)
 
-def detect_fields_in_text(text: str, table: str):
-    found = []
-    for f in tables.get(table, []):
-        if re.search(r"\b" + re.escape(f) + r"\b", text):
-            found.append(f)
-    return found
+# --------------------------
+# Schema selection
+# --------------------------
+# Snapshot of `tables` / `foreign_keys`; call rebuild_schema_index() after editing them.
+_default_schema = SchemaSnapshot(tables, foreign_keys)
+
+def rebuild_schema_index():
+    """Re-snapshot (and re-index) the module-level `tables` and `foreign_keys`."""
+    global _default_schema
+    _default_schema = SchemaSnapshot(tables, foreign_keys)
+    _reset_default_translator()
+    return _default_schema
+
+def resolve_schema(schema=None) -> SchemaSnapshot:
+    """Accepts None (built-in schema), a SchemaSnapshot or a SchemaProvider."""
+    if schema is None:
+        return _default_schema
+    if isinstance(schema, SchemaSnapshot):
+        return schema
+    return schema.snapshot()
+
+def find_tables(text: str, schema=None):
+    return resolve_schema(schema).index.scan(text).tables()
+
+def detect_fields_in_text(text: str, table: str, schema=None):
+    return resolve_schema(schema).index.scan(text).fields(table)
 
 # --------------------------
-# Condition parsing
+# Condition parsing (fragment-based)
 # --------------------------
+# Superseded in text_to_sql by conditions.parse_conditions (single tokenize +
+# recursive-descent pass); kept for existing callers.
 def split_conditions(cond_text: str):
     """
     Splits condition text into tokens and connectors.
@@ -89,8 +191,10 @@ def parse_single_condition(cond: str, default_date_col=None):
     """
     cond = cond.strip()
 
+    # (?<!\w) lets a column match start only at a word boundary; without it a
+    # long word is retried from every offset, which is quadratic in its length.
     # BETWEEN pattern: "<col> between <low> and <high>"
-    m_between = re.search(r"(\w+)\s+between\s+(['\"]?[\w\-:@\.]+['\"]?)\s+and\s+(['\"]?[\w\-:@\.]+['\"]?)", cond, flags=re.IGNORECASE)
+    m_between = re.search(r"(?<!\w)(\w+)\s+between\s+(['\"]?[\w\-:@\.]+['\"]?)\s+and\s+(['\"]?[\w\-:@\.]+['\"]?)", cond, flags=re.IGNORECASE)
     if m_between:
         col, low, high = m_between.groups()
         low = _quote_if_string(low)
@@ -98,7 +202,7 @@ def parse_single_condition(cond: str, default_date_col=None):
         return f"{col} BETWEEN {low} AND {high}"
 
     # comparison operator pattern: col (>=|<=|=|>|<) value
-    m_comp = re.search(r"(\w+)\s*(>=|<=|=|>|<)\s*(['\"]?[\w\-:@\.]+['\"]?)$", cond)
+    m_comp = re.search(r"(?<!\w)(\w+)\s*(>=|<=|=|>|<)\s*(['\"]?[\w\-:@\.]+['\"]?)$", cond)
     if m_comp:
         col, op, val = m_comp.groups()
         val = _quote_if_string(val)
@@ -122,7 +226,7 @@ def parse_single_condition(cond: str, default_date_col=None):
         return f"{default_date_col or 'order_date'} = '{date_val}'"
 
     # natural form: "<field> equals <value>" (after normalization this could be "field = value")
-    m_simple = re.search(r"(\w+)\s*=\s*(['\"]?[\w\-:@\.]+['\"]?)", cond)
+    m_simple = re.search(r"(?<!\w)(\w+)\s*=\s*(['\"]?[\w\-:@\.]+['\"]?)", cond)
     if m_simple:
         col, val = m_simple.groups()
         val = _quote_if_string(val)
@@ -151,189 +255,694 @@ def _quote_if_string(token: str):
     # otherwise quote
     return f"'{t}'"
 
+# --------------------------
+# Aggregates, grouping & ordering
+# --------------------------
+_AGGREGATES = {
+    "count": "COUNT", "sum": "SUM", "total": "SUM",
+    "average": "AVG", "avg": "AVG", "mean": "AVG",
+    "max": "MAX", "highest": "MAX", "largest": "MAX", "biggest": "MAX",
+    "min": "MIN", "lowest": "MIN", "smallest": "MIN",
+    # "maximum" / "minimum" are already rewritten to operators by PHRASE_RULES;
+    # an operator followed by a column instead of a value is the aggregate
+    "<=": "MAX", ">=": "MIN",
+}
+_AGG_SRC = "|".join(sorted(map(re.escape, _AGGREGATES), key=len, reverse=True))
+_AGG_RE = re.compile(r"(?<![\w<>=!])(" + _AGG_SRC + r")\s+(?:of\s+)?(?:the\s+)?([\w.]+)")
+_COUNT_RE = re.compile(r"\b(?:how many|number of|count of|count)\b")
+_ORDER_RE = re.compile(r"\b(?:sorted|sort|ordered|order|ranked|rank)\s+by\s+(?:(" + _AGG_SRC + r")\s+(?:of\s+)?)?"
+                       r"([\w.]+)(?:\s+(asc|ascending|desc|descending)\b)?")
+# a value right after "<= col" / ">= col": "minimum age 30" is the condition age >= 30
+_OP_VALUE_RE = re.compile(r"""\s+(?:'[^']*'|"[^"]*"|-?\d[\w\-:.]*)""")
+_BY_RE = re.compile(r"\bby\s+(?:(" + _AGG_SRC + r")\s+(?:of\s+)?)?([\w.]+)")
+_GROUP_RE = re.compile(r"\b(?:per|for each|each|for every|every)\s+([\w.]+)")
+_TOP_RE = re.compile(r"\b(top|first|bottom|latest|newest|last|most recent|oldest|earliest)\s+(\d+)\b")
+# "top 5 ... by x" sorts on x; "latest 5" / "oldest 5" sort on the default date column
+_TOP_DESC = {"top": True, "bottom": False}
+_RECENT_DESC = {"latest": True, "newest": True, "last": True, "most recent": True,
+                "oldest": False, "earliest": False}
+
+# edits: (start, end, replacement) applied to the question before condition parsing,
+# so aggregate, sort and grouping phrases ("<= salary", "by price desc") are not
+# read as conditions; sorted, without overlaps
+Shape = namedtuple("Shape", "aggregates group_by order_by limit consumed edits")
+
+def _shape_column(word, func, mentioned_tables, schema, qualify):
+    """Column for `word` in one of `mentioned_tables` (None if it is not a column)."""
+    word = word.rstrip(".")
+    if "." in word:
+        table, name = word.split(".", 1)
+        tables = [table] if table in mentioned_tables else []
+    else:
+        tables, name = mentioned_tables, word
+    for t in tables:
+        if name in schema.tables[t]:
+            return Column(t if qualify else None, name, func)
+    return None
+
+def _detect_shape(norm, mentioned_tables, schema, qualify):
+    """
+    Aggregates ("number of", "average salary"), grouping ("per department"),
+    ordering ("sorted by price desc", "top 10 ... by price") and top-N limits.
+    `consumed` holds columns that were only mentioned to sort on, so they are
+    not also added to the select list.
+    """
+    col = lambda word, func=None: _shape_column(word, func, mentioned_tables, schema, qualify)
+    aggregates, group_by, order_by, consumed, edits = [], [], [], set(), []
+    limit = None
+
+    if _COUNT_RE.search(norm):
+        aggregates.append(Column(None, "*", "COUNT"))
+    for m in _AGG_RE.finditer(norm):
+        c = col(m.group(2), _AGGREGATES[m.group(1)])
+        if c is None:
+            continue
+        if m.group(1) in ("<=", ">=") and _OP_VALUE_RE.match(norm, m.end()):
+            # "minimum age 30": a condition on the column, written operator first
+            edits.append((m.start(), m.end(), f"{m.group(2)} {m.group(1)}"))
+            continue
+        edits.append((m.start(), m.end(), " "))
+        if c not in aggregates:
+            aggregates.append(c)
+
+    top = _TOP_RE.search(norm)
+    if top:
+        limit = int(top.group(2))
+
+    # explicit "sorted by x [desc]"
+    skip = []
+    for m in _ORDER_RE.finditer(norm):
+        c = col(m.group(2), _AGGREGATES.get(m.group(1)))
+        if c is not None:
+            order_by.append((c, (m.group(3) or "").startswith("desc")))
+            skip.append(m.span())
+            edits.append((m.start(), m.end(), " "))
+
+    # remaining "by x": the ranking key of "top N", otherwise a grouping
+    for m in _BY_RE.finditer(norm):
+        if any(a <= m.start() < b for a, b in skip):
+            continue
+        c = col(m.group(2), _AGGREGATES.get(m.group(1)))
+        if c is None:
+            continue
+        if top and top.group(1) in _TOP_DESC and not order_by:
+            order_by.append((c, _TOP_DESC[top.group(1)]))
+        elif c.func is None and c not in group_by:
+            group_by.append(c)
+        else:
+            continue
+        edits.append((m.start(), m.end(), " "))
+    for m in _GROUP_RE.finditer(norm):
+        c = col(m.group(1))
+        if c is not None and c not in group_by:
+            group_by.append(c)
+            edits.append((m.start(), m.end(), " "))
+
+    if top and top.group(1) in _RECENT_DESC and not order_by:
+        date_col = _default_date_column(schema, mentioned_tables)
+        if date_col:
+            order_by.append((col(date_col), _RECENT_DESC[top.group(1)]))
+
+    for c, _ in order_by:
+        # only drop the sort key from the select list when it is not mentioned elsewhere
+        if c.func is None and len(re.findall(r"\b" + re.escape(c.name) + r"\b", norm)) == 1:
+            consumed.add(c)
+    # a sort phrase can contain an aggregate phrase: keep the outer edit
+    kept = []
+    for edit in sorted(edits, key=lambda e: (e[0], -e[1])):
+        if not kept or edit[0] >= kept[-1][1]:
+            kept.append(edit)
+    return Shape(aggregates, group_by, order_by, limit, consumed, kept)
+
 # --------------------------
 # JOIN inference
 # --------------------------
-def infer_join_clause(selected_tables):
+def infer_join_clause(selected_tables, schema=None, dialect="sqlite"):
     """
-    Given a list of tables involved in the query, return:
-    - from_clause (string)
-    - list of tables (ordered)
-    Basic strategy:
+    Given a list of tables involved in the query, return the FROM clause.
+    Strategy:
       - Start with the first table
-      - Try to join to subsequent tables using known foreign_keys
-      - If no mapping, perform CROSS JOIN
+      - Reach every other table through the shortest foreign-key path from
+        the tables joined so far, adding bridge tables where needed
+        (e.g. customers + products join through orders)
+      - Only tables with no FK path at all fall back to a CROSS JOIN
     """
     if not selected_tables:
         return None
-
-    used = [selected_tables[0]]
-    from_clause = selected_tables[0]
-    for t in selected_tables[1:]:
-        joined = False
-        # try to find fk in either direction
-        for (f_table, f_col), (t_table, t_col) in foreign_keys.items():
-            # exact match direction
-            if f_table == used[-1] and t_table == t:
-                from_clause += f" JOIN {t} ON {f_table}.{f_col} = {t}.{t_col}"
-                joined = True
-                break
-            # reverse
-            if f_table == t and t_table == used[-1]:
-                from_clause += f" JOIN {t} ON {t}.{f_col} = {used[-1]}.{t_col}"
-                joined = True
-                break
-        if not joined:
-            # fallback: try common column "id" vs "<table>_id"
-            possible_fk = f"{t}_id"
-            if possible_fk in tables[used[-1]]:
-                from_clause += f" JOIN {t} ON {used[-1]}.{possible_fk} = {t}.id"
-                joined = True
-        if not joined:
-            # fallback to CROSS JOIN
-            from_clause += f", {t}"
-        used.append(t)
-    return from_clause
+    first, joins = _plan_joins(selected_tables, resolve_schema(schema))
+    query = Query((), first, joins)
+    if query.cross_joins():
+        metrics.inc("texttosql_cross_join_total", query.cross_joins())
+    return get_dialect(dialect).from_clause(query)
+
+def _plan_joins(selected_tables, schema):
+    """(first table, [Join, ...]) for the FK plan over `selected_tables`."""
+    plan = schema.fk_graph.plan(selected_tables)
+    # tables without an FK path get edge None: a CROSS JOIN fallback
+    return plan[0][0], [Join(table, edge) for table, edge in plan[1:]]
 
 # --------------------------
 # Main text -> SQL builder
 # --------------------------
-def text_to_sql(text: str):
-    if not text or not text.strip():
-        return "Empty input."
+metrics.counter("texttosql_requests_total", "Questions passed to text_to_sql.")
+metrics.counter("texttosql_no_table_total", "Translations that returned 'Could not detect table.'.")
+metrics.counter("texttosql_parse_failures_total", "Condition fragments that could not be parsed.")
+metrics.counter("texttosql_cross_join_total", "Tables joined with a CROSS JOIN fallback.")
+metrics.counter("texttosql_rejected_total", "Questions rejected by an input limit or the time budget.")
 
-    raw = text.strip()
-    norm = normalize_text(raw)
+NO_TABLE = "Could not detect table."
 
-    # detect mention of multiple tables
-    mentioned_tables = find_tables(norm)
+# Row cap for queries that would otherwise return a whole table; see set_default_limit().
+# Aggregates and explicit "top N" questions are not capped.
+default_limit = int(os.environ.get("TEXT_TO_SQL_DEFAULT_LIMIT", "1000")) or None
 
-    # If more than one table mentioned, we will attempt JOIN; otherwise default to single table
-    if mentioned_tables:
-        primary_table = mentioned_tables[0]
-    else:
-        # if no table found, try to infer from common keywords
-        # naive fallback: if 'order' or 'orders' in text -> orders etc.
-        if re.search(r"\border\b|\borders\b", norm):
-            primary_table = "orders"
-            mentioned_tables = ["orders"]
-        elif re.search(r"\bproduct\b|\bproducts\b", norm):
-            primary_table = "products"
-            mentioned_tables = ["products"]
-        elif re.search(r"\bcustomer\b|\bcustomers\b", norm):
-            primary_table = "customers"
-            mentioned_tables = ["customers"]
-        elif re.search(r"\bstudent\b|\bstudents\b", norm):
-            primary_table = "students"
-            mentioned_tables = ["students"]
-        elif re.search(r"\bemployee\b|\bemployees\b", norm):
-            primary_table = "employees"
-            mentioned_tables = ["employees"]
+_UNSET = object()
+
+# Guards against hostile input; see set_input_limits(). None disables a limit.
+InputLimits = namedtuple("InputLimits", "max_chars max_fragments time_budget_ms")
+
+def _env_limit(name, default, kind=int):
+    value = kind(os.environ.get(name, default))
+    return value if value > 0 else None
+
+input_limits = InputLimits(
+    max_chars=_env_limit("TEXT_TO_SQL_MAX_CHARS", 2000),
+    max_fragments=_env_limit("TEXT_TO_SQL_MAX_FRAGMENTS", 64),
+    time_budget_ms=_env_limit("TEXT_TO_SQL_TIME_BUDGET_MS", 250, float),
+)
+
+class TranslationLimitError(ValueError):
+    """
+    A question rejected by an input limit or the time budget. `code` is
+    "input_too_long", "too_many_conditions" or "time_budget_exceeded";
+    as_dict() is the form returned by the JSON API.
+    """
+
+    def __init__(self, code, message, limit):
+        super().__init__(message)
+        self.code = code
+        self.limit = limit
+
+    def as_dict(self):
+        return {"code": self.code, "message": str(self), "limit": self.limit}
+
+def _check_deadline(deadline, limits, stage):
+    if deadline is not None and time.perf_counter() > deadline:
+        metrics.inc("texttosql_rejected_total")
+        raise TranslationLimitError("time_budget_exceeded",
+                                    f"translation exceeded {limits.time_budget_ms:g} ms during {stage}",
+                                    limits.time_budget_ms)
+
+# Optional cache.TranslationCache consulted by text_to_sql; see set_translation_cache().
+_translation_cache = None
+
+# Parsed Query IR per (schema version, normalized text), shared by every dialect.
+# The IR is immutable once built, so entries are handed out without copying.
+_query_cache = MemoryBackend(maxsize=4096)
+
+# Optional values.ValueIndex (or ValueIndexer) for bare values; see set_value_index().
+_value_index = None
+
+def set_value_index(index):
+    """
+    Install (or with None, remove) the column value index used by text_to_sql,
+    so bare values filter their column: "customers in delhi" -> city = 'Delhi'.
+    A ValueIndexer is re-checked on its own refresh interval. The index is
+    used whatever schema= is passed; give Translator(values=...) its own.
+    """
+    global _value_index
+    _value_index = index
+    _reset_default_translator()
+
+def _resolve_values(values):
+    if values is None or isinstance(values, ValueIndex):
+        return values
+    return values.snapshot()
+
+def set_translation_cache(cache):
+    """Install (or with None, remove) the cache used by text_to_sql."""
+    global _translation_cache
+    _translation_cache = cache
+    _reset_default_translator()
+
+def set_query_cache(backend):
+    """Install (or with None, disable) the in-process store for parsed Query IR."""
+    global _query_cache
+    _query_cache = backend
+    _reset_default_translator()
+
+def set_default_limit(n):
+    """LIMIT added to non-aggregate queries without a top-N; None or 0 turns it off."""
+    global default_limit
+    default_limit = int(n) if n else None
+    _reset_default_translator()
+
+def set_input_limits(max_chars=_UNSET, max_fragments=_UNSET, time_budget_ms=_UNSET):
+    """
+    Change the input limits used by text_to_sql (None disables one): the
+    longest accepted question, the most AND/OR/NOT/comma separated condition
+    fragments, and the time a translation may take before it is abandoned.
+    """
+    global input_limits
+    changes = {k: v for k, v in (("max_chars", max_chars), ("max_fragments", max_fragments),
+                                 ("time_budget_ms", time_budget_ms)) if v is not _UNSET}
+    input_limits = input_limits._replace(**changes)
+    _reset_default_translator()
+
+def _default_date_column(schema, mentioned_tables):
+    """Column used for bare dates ("orders after 2023-01-01"): the first date-like column."""
+    for t in mentioned_tables:
+        types = schema.column_types[t]
+        for c in schema.tables[t]:
+            if c.endswith("date") or any(k in types.get(c, "").upper() for k in ("DATE", "TIME")):
+                return c
+    return None
+
+class Translator:
+    """
+    Translates questions against one schema.
+
+    Everything a translation reads is fixed at construction: a SchemaSnapshot
+    (a provider is snapshotted once), a private copy of the phrase rules, the
+    default dialect and LIMIT, the input limits, the caches and the value index
+    (a ValueIndexer is asked for its current index on each translation). Instances are immutable, so one
+    can serve any number of threads without locking; build a new one (or use
+    with_schema()) to change anything. Settings left unset are taken from the
+    module-level defaults (set_default_limit(), set_translation_cache(), ...).
+    """
+
+    __slots__ = ("schema", "dialect", "default_limit", "limits", "values", "_rewriter", "_cache",
+                 "_query_cache")
+
+    def __init__(self, schema=None, dialect="sqlite", default_limit=_UNSET, phrase_rules=(),
+                 cache=_UNSET, query_cache=_UNSET, limits=_UNSET, values=_UNSET):
+        rewriter = PhraseRewriter(_phrase_rewriter.rules.items())
+        if phrase_rules:
+            rewriter.add_rules(phrase_rules)
+        init = object.__setattr__
+        init(self, "schema", resolve_schema(schema))
+        init(self, "dialect", get_dialect(dialect))
+        init(self, "default_limit", globals()["default_limit"] if default_limit is _UNSET else default_limit)
+        init(self, "limits", input_limits if limits is _UNSET else InputLimits(*limits))
+        init(self, "values", _value_index if values is _UNSET else values)
+        init(self, "_rewriter", rewriter)
+        init(self, "_cache", _translation_cache if cache is _UNSET else cache)
+        init(self, "_query_cache", _query_cache if query_cache is _UNSET else query_cache)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Translator is immutable; build a new one or use with_schema()")
+
+    def with_schema(self, schema):
+        """A translator for `schema` sharing this one's rules, caches and settings."""
+        clone = object.__new__(Translator)
+        for name in Translator.__slots__:
+            object.__setattr__(clone, name, getattr(self, name))
+        object.__setattr__(clone, "schema", resolve_schema(schema))
+        return clone
+
+    @property
+    def phrase_rules(self):
+        return self._rewriter.rules
+
+    def normalize(self, text: str) -> str:
+        return self._rewriter.rewrite(text.lower().strip())
+
+    def translate(self, text: str, dialect=None):
+        """Translate one question to SQL for `dialect` (default: the translator's)."""
+        if not text or not text.strip():
+            return "Empty input."
+
+        timer = metrics.timer()
+        metrics.inc("texttosql_requests_total")
+        deadline = self._admit(text)
+        dialect = self.dialect if dialect is None else get_dialect(dialect)
+        norm = self.normalize(text)
+        timer.mark("normalize")
+        values = _resolve_values(self.values)
+        compute = lambda: self._render(self._query_for(norm, timer, deadline, values), dialect, timer)
+        cache = self._cache
+        if cache is None:
+            sql = compute()
         else:
-            return "Could not detect table."
+            # sqlite without a default limit keeps the unqualified key of older cache files
+            variant = None if dialect.name == "sqlite" else dialect.name
+            if self.default_limit:
+                variant = f"{dialect.name}:limit={self.default_limit}"
+            if values is not None:
+                variant = f"{variant or dialect.name}:values={values.version}"
+            sql = cache.get_or_compute(self.schema.version, norm, compute, variant)
+        timer.finish()
+        return sql
+
+    def translate_batch(self, texts):
+        """[BatchResult, ...] for `texts`, in order and in-process; errors are captured per item."""
+        return _translate_chunk(texts, translator=self)
+
+    def translate_dialects(self, text: str, dialects=("sqlite", "postgres", "mysql")):
+        """{dialect: sql} for one question: a single parse, one render per dialect."""
+        if not text or not text.strip():
+            return {d: "Empty input." for d in dialects}
+        metrics.inc("texttosql_requests_total")
+        query = self.parse(text)
+        return {d: self._render(query, get_dialect(d)) for d in dialects}
+
+    def translate_params(self, text: str, dialect=None, style="qmark"):
+        """
+        dialects.ParameterizedSQL(sql, params, fingerprint) for one question, with
+        values bound as "qmark" (?) or "named" (:p1) parameters instead of inlined;
+        None for empty input or when no table was found.
+        """
+        if not text or not text.strip():
+            return None
+        timer = metrics.timer()
+        metrics.inc("texttosql_requests_total")
+        deadline = self._admit(text)
+        dialect = self.dialect if dialect is None else get_dialect(dialect)
+        norm = self.normalize(text)
+        timer.mark("normalize")
+        query = self._query_for(norm, timer, deadline, _resolve_values(self.values))
+        if query is None:
+            return None
+        out = dialect.parameterize(query, style, self.default_limit)
+        timer.mark("render")
+        timer.finish()
+        return out
+
+    def translate_incremental(self, text: str, fragments, dialect=None):
+        """
+        translate() for callers that retranslate while a question is typed:
+        `fragments` is a dict kept for one editing session, holding parsed
+        condition fragments, so an edit only re-parses the conditions it
+        touched. Bypasses the translation cache; the IR cache is still used.
+        """
+        if not text or not text.strip():
+            return "Empty input."
+        timer = metrics.timer()
+        metrics.inc("texttosql_requests_total")
+        deadline = self._admit(text)
+        dialect = self.dialect if dialect is None else get_dialect(dialect)
+        norm = self.normalize(text)
+        timer.mark("normalize")
+        query = self._query_for(norm, timer, deadline, _resolve_values(self.values), fragments)
+        sql = self._render(query, dialect, timer)
+        timer.finish()
+        return sql
+
+    def parse(self, text: str):
+        """The dialect-independent query.Query for `text`, or None if no table was found."""
+        deadline = self._admit(text)
+        return self._query_for(self.normalize(text), metrics.timer(), deadline, _resolve_values(self.values))
+
+    def _admit(self, text):
+        """Reject over-long input; returns the deadline for this translation (or None)."""
+        limits = self.limits
+        if limits.max_chars is not None and len(text) > limits.max_chars:
+            metrics.inc("texttosql_rejected_total")
+            raise TranslationLimitError("input_too_long",
+                                        f"question is {len(text)} characters; the limit is {limits.max_chars}",
+                                        limits.max_chars)
+        if limits.time_budget_ms is None:
+            return None
+        return time.perf_counter() + limits.time_budget_ms / 1000
+
+    def _render(self, query, dialect, timer=None):
+        if query is None:
+            return NO_TABLE
+        sql = dialect.render(query, self.default_limit)
+        if timer is not None:
+            timer.mark("render")
+        return sql
+
+    def _query_for(self, norm: str, timer, deadline=None, values=None, fragments=None):
+        schema = self.schema
+        cache = self._query_cache
+        if cache is None:
+            query = _build_query(norm, schema, timer, self.limits, deadline, values, fragments)
+        else:
+            key = (schema.version, norm) if values is None else (schema.version, values.version, norm)
+            query = cache.get(key)
+            if query is None:
+                query = _build_query(norm, schema, timer, self.limits, deadline, values, fragments)
+                if query is not None:
+                    cache.set(key, query)
+        # counted here, not while building, so cache hits count too
+        if query is not None:
+            if query.parse_failures:
+                metrics.inc("texttosql_parse_failures_total", query.parse_failures)
+            cross = query.cross_joins()
+            if cross:
+                metrics.inc("texttosql_cross_join_total", cross)
+        return query
+
+# --------------------------
+# Module-level API
+# --------------------------
+# Compatibility shims over a Translator built from the module-level settings;
+# it is rebuilt after any of them changes.
+_default_translator = None
+# id(snapshot) -> _default_translator.with_schema(snapshot), for callers passing schema=
+_schema_translators = {}
+
+def _reset_default_translator():
+    global _default_translator
+    _default_translator = None
+    _schema_translators.clear()
+
+def _translator(schema=None):
+    global _default_translator
+    translator = _default_translator
+    if translator is None:
+        translator = _default_translator = Translator()
+    if schema is None:
+        return translator
+    schema = resolve_schema(schema)
+    clone = _schema_translators.get(id(schema))
+    if clone is None or clone.schema is not schema:
+        if len(_schema_translators) >= 64:
+            _schema_translators.clear()
+        clone = _schema_translators[id(schema)] = translator.with_schema(schema)
+    return clone
+
+def text_to_sql(text: str, schema=None, dialect="sqlite"):
+    """Translate one question to SQL for `dialect` ("sqlite", "postgres" or "mysql")."""
+    return _translator(schema).translate(text, dialect)
+
+def text_to_sql_dialects(text: str, dialects=("sqlite", "postgres", "mysql"), schema=None):
+    """{dialect: sql} for one question: a single parse, one render per dialect."""
+    return _translator(schema).translate_dialects(text, dialects)
+
+def text_to_sql_params(text: str, schema=None, dialect="sqlite", style="qmark"):
+    """Translator.translate_params() for the module-level settings."""
+    return _translator(schema).translate_params(text, dialect, style)
+
+def parse_query(text: str, schema=None):
+    """The dialect-independent query.Query for `text`, or None if no table was found."""
+    return _translator(schema).parse(text)
+
+# condition tokens that start a new fragment, counted against max_fragments
+_FRAGMENT_KINDS = {"AND", "OR", "NOT", "COMMA"}
+
+def _build_query(norm: str, schema: SchemaSnapshot, timer, limits=None, deadline=None, values=None,
+                 fragment_cache=None):
+    # detect mention of multiple tables (one scan serves table and field detection)
+    hits = schema.index.scan(norm)
+    raw = norm
+    mentioned_tables = hits.tables()
+    if hits.corrections:
+        # "salaries" -> salary, "emplyees" -> employees, so conditions see schema names
+        corr = hits.corrections
+        norm = re.sub(r"\b(?:" + "|".join(map(re.escape, corr)) + r")\b", lambda m: corr[m.group(0)], norm)
+
+    # If more than one table mentioned, we will attempt JOIN; otherwise default to single table
+    if not mentioned_tables:
+        # if no table found, fall back to singular mentions: 'order' -> orders etc.
+        mentioned_tables = hits.alias_tables()[:1]
+        if not mentioned_tables and hits.column_table() is not None:
+            # columns only ("average salary per department"): the table that has them
+            mentioned_tables = [hits.column_table()]
+        if not mentioned_tables:
+            metrics.inc("texttosql_no_table_total")
+            return None
+    timer.mark("table_detection")
+    _check_deadline(deadline, limits, "table detection")
+
+    # disambiguate same field across tables: use table.field if multiple tables present
+    qualify = len(mentioned_tables) > 1
+    shape = _detect_shape(norm, mentioned_tables, schema, qualify)
 
     # detect fields
-    select_fields = []
+    select = []
+    if shape.aggregates or shape.group_by:
+        # one row per group: the grouping columns and the aggregates, nothing else
+        select = list(shape.group_by) + (list(shape.aggregates) or [Column(None, "*", "COUNT")])
     # if user asked 'all' or 'show all'
-    if re.search(r"\b(all|everything|show all|list all|get all)\b", norm):
-        select_fields = ["*"]
-    else:
-        # try to extract fields for each mentioned table
+    elif not re.search(r"\b(all|everything|show all|list all|get all)\b", norm):
         for tbl in mentioned_tables:
-            found = detect_fields_in_text(norm, tbl)
-            for f in found:
-                # disambiguate same field across tables: use table.field if multiple tables present
-                if len(mentioned_tables) > 1:
-                    select_fields.append(f"{tbl}.{f}")
-                else:
-                    select_fields.append(f)
-        # if no field detected, keep '*'
-        if not select_fields:
-            select_fields = ["*"]
+            for f in hits.fields(tbl):
+                col = Column(tbl if qualify else None, f)
+                if col not in shape.consumed:
+                    select.append(col)
+    # if no field detected, keep '*'
+    if not select:
+        select = [Column(None, "*")]
+    timer.mark("field_detection")
 
     # infer join / from clause
-    from_clause = None
     if len(mentioned_tables) > 1:
-        from_clause = infer_join_clause(mentioned_tables)
+        from_table, joins = _plan_joins(mentioned_tables, schema)
     else:
-        from_clause = mentioned_tables[0]
+        from_table, joins = mentioned_tables[0], ()
+    timer.mark("join_inference")
+    _check_deadline(deadline, limits, "join inference")
 
     # extract condition part: prefer after 'where' or 'with', else whole input
-    cond_part_match = re.search(r"(?:where|with)\s+(.+)", norm)
-    cond_text = cond_part_match.group(1) if cond_part_match else norm
-
-    # but remove leading phrases like "show", "list", "get", "show all", table names, select fields
-    cond_text = re.sub(r"^(show|get|list|find)\b", "", cond_text).strip()
-    # also strip table name occurrences at start
-    cond_text = re.sub(r"^(" + "|".join(re.escape(t) for t in mentioned_tables) + r")\b", "", cond_text).strip()
-
-    # Now split into condition fragments
-    conds, connectors = split_conditions(cond_text)
-
-    sql_conditions = []
-    for c in conds:
-        parsed = parse_single_condition(c, default_date_col="order_date")
-        if parsed:
-            sql_conditions.append(parsed)
-        else:
-            # try to parse fragments that mention a table.field: e.g. "customers city equals delhi"
-            # remove table words and try again
-            c2 = c
-            for t in mentioned_tables:
-                c2 = re.sub(r"\b" + re.escape(t) + r"\b", "", c2).strip()
-            parsed2 = parse_single_condition(c2, default_date_col="order_date")
-            if parsed2:
-                sql_conditions.append(parsed2)
-            else:
-                # ignore if cannot parse
-                pass
-
-    # Build WHERE clause joining conditions with connectors
-    where_clause = ""
-    if sql_conditions:
-        # If connectors list shorter than needed, assume AND between remaining
-        final_conditions = []
-        idx_cond = 0
-        idx_conn = 0
-        final_conditions.append(sql_conditions[idx_cond])
-        idx_cond += 1
-        while idx_cond < len(sql_conditions):
-            conn = "AND"
-            if idx_conn < len(connectors):
-                # support NOT specially
-                if connectors[idx_conn] == "NOT":
-                    # invert next condition by wrapping in NOT(...)
-                    next_cond = sql_conditions[idx_cond]
-                    final_conditions[-1] = final_conditions[-1]  # keep previous
-                    final_conditions.append(f"NOT ({next_cond})")
-                    idx_cond += 1
-                    idx_conn += 1
-                    continue
-                conn = connectors[idx_conn]
-            final_conditions.append(sql_conditions[idx_cond])
-            final_conditions.insert(len(final_conditions)-1, conn)  # insert connector before new cond
-            idx_cond += 1
-            idx_conn += 1
-
-        # The insertion above created a mixed structure; rebuild properly:
-        # Simpler: join with connectors in order; if fewer connectors, use AND
-        parts = []
-        for i, sc in enumerate(sql_conditions):
-            parts.append(sc)
-            if i < len(sql_conditions) - 1:
-                if i < len(connectors):
-                    parts.append(connectors[i])
-                else:
-                    parts.append("AND")
-        where_clause = " ".join(parts)
-
-    # Final SQL
-    select_part = ", ".join(select_fields)
-    sql = f"SELECT {select_part} FROM {from_clause}"
-    if where_clause:
-        sql += f" WHERE {where_clause}"
-    sql += ";"
-    return sql
+    cond_source = norm
+    for start, end, repl in reversed(shape.edits):
+        cond_source = cond_source[:start] + repl + cond_source[end:]
+    cond_part_match = re.search(r"(?:where|with)\s+(.+)", cond_source)
+    cond_text = cond_part_match.group(1) if cond_part_match else cond_source
+
+    # one tokenize + recursive-descent pass; verbs, table names and filler are skipped as noise
+    tokens = tokenize(cond_text)
+    if limits is not None and limits.max_fragments is not None:
+        fragments = 1 + sum(1 for kind, _ in tokens if kind in _FRAGMENT_KINDS)
+        if fragments > limits.max_fragments:
+            metrics.inc("texttosql_rejected_total")
+            raise TranslationLimitError("too_many_conditions",
+                                        f"{fragments} condition fragments; the limit is {limits.max_fragments}",
+                                        limits.max_fragments)
+    if fragment_cache is None:
+        columns = {c for t in mentioned_tables for c in schema.tables[t]}
+        parser = ConditionParser(tokens, columns, schema.tables,
+                                 default_date_col=_default_date_column(schema, mentioned_tables))
+        tree, failures = parser.parse(), parser.failures
+    else:
+        # columns, date column and fragments from earlier versions of this question, per set of tables
+        ctx = fragment_cache.get(tuple(mentioned_tables))
+        if ctx is None:
+            ctx = fragment_cache[tuple(mentioned_tables)] = (
+                {c for t in mentioned_tables for c in schema.tables[t]},
+                _default_date_column(schema, mentioned_tables), {})
+        columns, date_col, parsed = ctx
+        tree, failures = parse_fragments(tokens, columns, schema.tables, date_col, parsed)
+    timer.mark("condition_parse")
+    _check_deadline(deadline, limits, "condition parsing")
+
+    if values is not None:
+        # before typo correction, so a value is never read as a misspelt name
+        preds = _value_filters(raw, values, schema, mentioned_tables, qualify, tree)
+        if preds:
+            items = list(tree.items) if isinstance(tree, BoolOp) and tree.op == "AND" else [tree]
+            items = [i for i in items if i is not None] + preds
+            tree = items[0] if len(items) == 1 else BoolOp("AND", items)
+        timer.mark("value_filters")
+
+    return Query(select, from_table, joins, tree, shape.group_by, shape.order_by, shape.limit, failures)
+
+def _constrained(node, columns, words):
+    """Collect the columns and value words already used by a condition tree."""
+    if isinstance(node, Pred):
+        columns.add(node.column.rsplit(".", 1)[-1])
+        words.update(v.strip("'\"").lower() for v in node.values)
+    elif isinstance(node, BoolOp):
+        for item in node.items:
+            _constrained(item, columns, words)
+    elif node is not None:
+        _constrained(node.item, columns, words)
+
+def _value_filters(norm, values, schema, mentioned_tables, qualify, tree):
+    """
+    Predicates for bare values of indexed columns ("pending orders" ->
+    status = 'pending'). Values already in a condition, values that are also
+    schema names, columns that already have a condition and values claimed by
+    more than one column of the mentioned tables are left alone.
+    """
+    columns, words = set(), set()
+    _constrained(tree, columns, words)
+    by_column = {}
+    for phrase, hits in values.find(norm):
+        if phrase in words or schema.index.is_name(phrase):
+            continue
+        hits = [h for h in hits if h[0] in mentioned_tables and h[1] not in columns
+                and h[1] in schema.tables[h[0]]]
+        if len(hits) != 1:
+            continue
+        table, col, value = hits[0]
+        by_column.setdefault((table, col), []).append("'" + value + "'")
+    preds = []
+    for (table, col), vals in by_column.items():
+        name = f"{table}.{col}" if qualify else col
+        vals = list(dict.fromkeys(vals))
+        preds.append(Pred(name, "=", vals) if len(vals) == 1 else Pred(name, "IN", vals))
+    return preds
+
+# --------------------------
+# Batch translation
+# --------------------------
+# code is set for structured errors, e.g. TranslationLimitError.code
+BatchResult = namedtuple("BatchResult", "text sql error code", defaults=(None,))
+
+_batch_schema = None
+
+def _batch_init(schema):
+    global _batch_schema
+    _batch_schema = schema
+
+def _translate_chunk(texts, schema=None, translator=None):
+    translate = (translator or _translator(schema or _batch_schema)).translate
+    out = []
+    for text in texts:
+        if isinstance(text, BatchResult):  # a row the reader already rejected
+            out.append(text)
+            continue
+        try:
+            out.append(BatchResult(text, translate(text), None))
+        except TranslationLimitError as e:
+            out.append(BatchResult(text, None, str(e), e.code))
+        except Exception as e:  # one bad input must not abort the batch
+            out.append(BatchResult(text, None, f"{type(e).__name__}: {e}"))
+    return out
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def text_to_sql_batch(texts, schema=None, workers=None, chunksize=256):
+    """
+    Translate any iterable of questions, yielding BatchResult(text, sql, error)
+    lazily and in input order. Exceptions are captured per item in `error`;
+    BatchResult items in `texts` (rows an input reader could not parse) are
+    passed through unchanged.
+
+    workers=1 translates in-process; otherwise a pool of `workers` processes
+    (default: CPU count) handles `chunksize` items per task. At most two
+    chunks per worker are in flight, so memory stays constant for
+    arbitrarily long inputs.
+    """
+    schema = resolve_schema(schema)
+    chunks = _chunked(texts, chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _translate_chunk(chunk, schema)
+        return
+
+    # imported here: the process pool machinery is slow to import and only batch jobs need it
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_batch_init, initargs=(schema,)) as pool:
+        window = 2 * workers
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_translate_chunk, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 # --------------------------
 # Quick interactive loop & example tests
@@ -0,0 +1,273 @@
+"""
+Column value index: which column a bare value in a question belongs to, so
+"customers in delhi" or "pending orders" get a filter (city = 'Delhi',
+status = 'pending') instead of returning the whole table.
+
+    from texttosql import set_value_index
+    set_value_index(ValueIndexer("shop.db", SQLiteSchemaProvider("shop.db")))
+
+Only low-cardinality text columns are indexed (city, status, department,
+category, ...). Each text column is sampled (on SQLite rowid tables, the
+newest `sample_rows` rows) and kept when it has at most `max_distinct` distinct
+values that repeat (at most `max_ratio` distinct values per sampled row),
+which leaves out names, e-mails and free text. Values live in one sorted
+array of lower-cased keys with a parallel array of column ids, looked up by
+bisection; the lowest-cardinality columns are kept first until the index
+would pass `max_bytes`.
+"""
+import bisect
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+
+from conditions import KEYWORDS
+from dialects import get_dialect
+from schema import SchemaProvider, _is_factory, tokenize
+
+# never treated as values, whatever the data says
+STOPWORDS = KEYWORDS | {
+    "a", "an", "the", "is", "are", "of", "for", "with", "where", "by", "per", "to",
+    "all", "any", "none", "show", "list", "get", "find", "top", "me",
+}
+
+_TEXT_TYPES = ("CHAR", "TEXT", "CLOB", "STRING", "ENUM")
+
+def _entry_bytes(key, value):
+    # key + stored spelling (shared when equal) + two tuple slots + one array slot
+    size = sys.getsizeof(key) + 2 * 8 + 4
+    if value != key:
+        size += sys.getsizeof(value)
+    return size
+
+# --------------------------
+# Index
+# --------------------------
+class ValueIndex:
+    """
+    Immutable value -> column map built from {(table, column): [value, ...]}.
+    `version` is a content hash, so caches can key on it like on
+    SchemaSnapshot.version; `nbytes` is the estimated memory use.
+    """
+
+    __slots__ = ("columns", "max_words", "version", "nbytes", "_keys", "_ids", "_values", "_heads")
+
+    def __init__(self, column_values):
+        columns = sorted(column_values)
+        rows = {}
+        for cid, col in enumerate(columns):
+            for value in column_values[col]:
+                key = " ".join(tokenize(value))
+                if (key and key not in STOPWORDS and not key.replace(" ", "").isdigit()
+                        and (key, cid) not in rows):
+                    rows[(key, cid)] = key if value == key else value
+        ordered = sorted(rows)
+        self.columns = tuple(columns)
+        self._keys = tuple(k for k, _ in ordered)
+        self._ids = array("I", (cid for _, cid in ordered))
+        self._values = tuple(rows[r] for r in ordered)
+        self.max_words = max((k.count(" ") + 1 for k in self._keys), default=0)
+        # first word of every key: most words of a question start no value and are skipped here
+        self._heads = frozenset(k.split(" ", 1)[0] for k in self._keys)
+        self.nbytes = (sum(_entry_bytes(k, v) for k, v in zip(self._keys, self._values))
+                       + sys.getsizeof(self._heads))
+        h = hashlib.sha1(repr(self.columns).encode())
+        for k, cid, v in zip(self._keys, self._ids, self._values):
+            h.update(f"{k}\0{cid}\0{v}\n".encode())
+        self.version = h.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, phrase):
+        """[(table, column, stored value), ...] for a value phrase, matched case-insensitively."""
+        return self._hits(" ".join(tokenize(phrase)))
+
+    def _hits(self, key):
+        keys = self._keys
+        lo = bisect.bisect_left(keys, key)
+        if lo == len(keys) or keys[lo] != key:
+            return []
+        hi = bisect.bisect_right(keys, key, lo)
+        return [self.columns[self._ids[i]] + (self._values[i],) for i in range(lo, hi)]
+
+    def find(self, text):
+        """
+        Yield (phrase, [(table, column, value), ...]) for every value in `text`,
+        left to right; longer phrases win ("new delhi" over "delhi").
+        """
+        toks = tokenize(text)
+        heads = self._heads
+        i, n = 0, len(toks)
+        while i < n:
+            if toks[i] in heads:
+                for width in range(min(self.max_words, n - i), 0, -1):
+                    phrase = " ".join(toks[i:i + width]) if width > 1 else toks[i]
+                    hits = self._hits(phrase)
+                    if hits:
+                        yield phrase, hits
+                        i += width
+                        break
+                else:
+                    i += 1
+            else:
+                i += 1
+
+    def __repr__(self):
+        return f"ValueIndex(version={self.version!r}, columns={len(self.columns)}, values={len(self)})"
+
+# --------------------------
+# Building from a live database
+# --------------------------
+class ValueIndexer:
+    """
+    Samples a database into ValueIndex objects. snapshot() returns the
+    current index and re-checks the database at most every
+    `refresh_interval` seconds; only tables whose row count or columns changed
+    are sampled again, and the same index object is kept when nothing did.
+    Every `full_refresh` seconds all tables are sampled again, which picks up
+    values changed by UPDATE (the row count does not see those).
+
+    A failed refresh (locked file, dropped table, ...) never fails a
+    translation: the last index is kept, or an empty one before the first
+    success, and the error is kept in `last_error` until the next attempt.
+
+    `connect` is a DB-API connection, a zero-argument callable returning one,
+    or a SQLite file path; `schema` a SchemaSnapshot or SchemaProvider naming
+    the tables to sample. `dialect` is used to quote identifiers.
+    """
+
+    def __init__(self, connect, schema, dialect="sqlite", max_distinct=100, max_ratio=0.5,
+                 sample_rows=50000, max_bytes=4 << 20, refresh_interval=300.0, full_refresh=3600.0):
+        if isinstance(connect, str):
+            path = connect
+            connect = lambda: sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self._connect = connect
+        self.schema = schema
+        self.dialect = get_dialect(dialect)
+        self.max_distinct = max_distinct
+        self.max_ratio = max_ratio
+        self.sample_rows = sample_rows
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self.full_refresh = full_refresh
+        self.skipped = ()  # (table, column) left out by the memory budget
+        self.errors = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._index = None
+        self._checked_at = 0.0
+        self._resampled_at = time.monotonic()
+        self._tables = {}  # table -> (signature, {(table, column): (distinct values)})
+
+    def snapshot(self, force=False) -> ValueIndex:
+        index = self._index
+        if index is not None and not force and time.monotonic() - self._checked_at < self.refresh_interval:
+            return index
+        with self._lock:
+            if self._index is None or force or time.monotonic() - self._checked_at >= self.refresh_interval:
+                try:
+                    self._refresh(force)
+                    self.last_error = None
+                except Exception as e:  # any driver's error: keep serving what we have
+                    self.errors += 1
+                    self.last_error = e
+                    if self._index is None:
+                        self._index = ValueIndex({})
+                    self._checked_at = time.monotonic()  # retry after the next interval, not per call
+            return self._index
+
+    def _refresh(self, force):
+        if self.full_refresh is not None and time.monotonic() - self._resampled_at >= self.full_refresh:
+            force = True
+        schema = self.schema.snapshot() if isinstance(self.schema, SchemaProvider) else self.schema
+        owned = _is_factory(self._connect)
+        conn = self._connect() if owned else self._connect
+        cur = conn.cursor()
+        changed = False
+        try:
+            tables = {}
+            for table in schema.tables:
+                columns = self._text_columns(schema, table)
+                if not columns:
+                    continue
+                signature = (columns, self._row_count(cur, table))
+                old = self._tables.get(table)
+                if old is not None and old[0] == signature and not force:
+                    tables[table] = old
+                    continue
+                sampled = {}
+                newest_first = self._has_rowid(cur, table)
+                for col in columns:
+                    values = self._sample(cur, table, col, newest_first)
+                    if values:
+                        sampled[(table, col)] = values
+                tables[table] = (signature, sampled)
+                changed = True
+        finally:
+            cur.close()
+            if owned:
+                conn.close()
+        changed = changed or tables.keys() != self._tables.keys()
+        self._tables = tables
+        if changed or self._index is None:
+            self._index = self._build()
+        self._checked_at = time.monotonic()
+        if force:
+            self._resampled_at = self._checked_at
+
+    def _build(self):
+        # lowest-cardinality columns first: they are the cheapest and the most selective hints
+        candidates = sorted((len(vals), col, vals) for _, sampled in self._tables.values()
+                            for col, vals in sampled.items())
+        kept, skipped, total = {}, [], 0
+        for _, col, vals in candidates:
+            size = sum(_entry_bytes(v.lower(), v) for v in vals)
+            if total + size > self.max_bytes:
+                skipped.append(col)
+                continue
+            kept[col] = vals
+            total += size
+        self.skipped = tuple(skipped)
+        return ValueIndex(kept)
+
+    def _text_columns(self, schema, table):
+        types = schema.column_types[table]
+        out = []
+        for col in schema.tables[table]:
+            t = types.get(col, "").upper()
+            # untyped SQLite columns may hold text too; dates and ids never make useful values
+            if (not t or any(k in t for k in _TEXT_TYPES)) and not (
+                    col == "id" or col.endswith(("_id", "date")) or "DATE" in t or "TIME" in t):
+                out.append(col)
+        return tuple(out)
+
+    def _row_count(self, cur, table):
+        cur.execute(f"SELECT COUNT(*) FROM {self.dialect.ident(table)}")
+        return cur.fetchone()[0]
+
+    def _has_rowid(self, cur, table):
+        """True for SQLite tables with a rowid (not WITHOUT ROWID tables, not other databases)."""
+        if self.dialect.name != "sqlite":
+            return False
+        try:
+            cur.execute(f"SELECT rowid FROM {self.dialect.ident(table)} LIMIT 0")
+            cur.fetchall()
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _sample(self, cur, table, col, newest_first=False):
+        """The column's distinct text values, most frequent first; () when there are too many."""
+        c, t = self.dialect.ident(col), self.dialect.ident(table)
+        # the newest rows where there is a rowid, so values that just started appearing are picked up
+        order = " ORDER BY rowid DESC" if newest_first else ""
+        cur.execute(f"SELECT {c}, COUNT(*) FROM (SELECT {c} FROM {t}{order} LIMIT {int(self.sample_rows)}) s "
+                    f"WHERE {c} IS NOT NULL GROUP BY {c} ORDER BY 2 DESC LIMIT {int(self.max_distinct) + 1}")
+        counts = [(v, n) for v, n in cur.fetchall() if isinstance(v, str)]
+        sampled = sum(n for _, n in counts)
+        if not counts or len(counts) > self.max_distinct or len(counts) > sampled * self.max_ratio:
+            return ()
+        return tuple(v for v, _ in counts)